@@ -2,12 +2,10 @@
 import os
 # from bridge import Bridge
 from bridgeClean import Bridge
-import json
+from bridgeStream import stream_games
 
 seats = ['N','E','S','W']
 
-games = []
-
 TARGET = {'Vulnerable', 'Dealer', 'Deal', 'Declarer', 'Contract', 'Result', 'Score', 'Auction', 'Play'}
 
 # all denominations in order
@@ -21,43 +19,13 @@ VALID_AUCTION_ACTIONS = set(
     + BIDS               # all valid level+denom bids
 )
 
-# Load in games from parsed pbn file
+# Stream games from parsed pbn files, one game at a time
 input_dir = 'parsed-games'
 
-for filename in os.listdir(input_dir):
-    # if filename != 'parsed-Esoito01.jsonl':
-    #     continue
-
-    if not filename.endswith('.jsonl'):
-        continue
-
-    filepath = os.path.join(input_dir, filename)
-    file_games = []
-    with open(filepath, 'r') as file:
-        current_game = None
-
-        for line in file:
-            line = line.strip()
-            if not line:
-                continue
-
-            obj = json.loads(line)
-
-            if obj.get('type') == 'game':
-                if current_game:
-                    file_games.append(current_game)
-                current_game = {}
-
-            elif obj.get('type') == 'tag' and current_game is not None:
-                name = obj.get('name')
-                if name in TARGET:
-                    current_game[name] = obj
-
-        if current_game:
-            file_games.append(current_game)
-    games.append((filename, file_games))
+filenames = [filename for filename in os.listdir(input_dir) if filename.endswith('.jsonl')]
+# filenames = ['parsed-Esoito01.jsonl']
 
-print(f"total files loaded: {len(games)}")
+print(f"total files loaded: {len(filenames)}")
 
 declarers = []
 actual_declarers = []
@@ -67,9 +35,9 @@ results = []
 actual_results = []
 scores = []
 actual_scores = []
-for file_name, file_games in games:
+for file_name in filenames:
     print('filename: ', file_name)
-    for gameIndex, game in enumerate(file_games):
+    for gameIndex, game in enumerate(stream_games(os.path.join(input_dir, file_name), TARGET)):
         # {"name":"Auction", "player":"N", value:"1D"}
         # {"name":"Play", "player":"W", value"H3"}
         print('game', gameIndex)
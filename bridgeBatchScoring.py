@@ -0,0 +1,151 @@
+"""
+Vectorized duplicate scoring for arrays of contracts and results.
+
+score_many looks every outcome up in the same score lattice that backs
+ScoreCalculator, so a million hypothetical results cost one NumPy gather
+instead of a million ScoreCalculator objects.
+
+Usage:
+    python bridgeBatchScoring.py [--data-dir=parsed-games]
+
+Running the module checks score_many on every possible outcome against
+ScoreCalculator's step-by-step arithmetic (which does not use the
+lattice), then on every board in the corpus against ScoreCalculator.pbn_score,
+the same arithmetic and the board's PBN Score tag where it has one.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from bridgeClaudev2 import SCORE_TABLE, ScoreCalculator
+from bridgeEncoding import DENOM_ID, DENOMS, RISK_ID, RISKS, SEAT_ID, SEATS
+
+VULNERABILITIES = ['None', 'NS', 'EW', 'All']
+VUL_ID = {v: i for i, v in enumerate(VULNERABILITIES)}
+
+# [level 0-7, strain, risk, vul, made]; level 0 (passed out) scores 0
+SCORE_LATTICE = np.concatenate([
+    np.zeros((1, 5, 3, 2, 14), dtype=np.int32),
+    np.array(SCORE_TABLE, dtype=np.int32).reshape(7, 5, 3, 2, 14),
+])
+
+
+def _codes(values, lookup, name, size):
+    """Integer codes for an array of ints or of strings found in lookup"""
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'UO':
+        uniques, inverse = np.unique(arr.astype(str), return_inverse=True)
+        try:
+            mapped = np.array([lookup[u] for u in uniques], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Invalid {name}: {e.args[0]}")
+        arr = mapped[inverse].reshape(arr.shape)
+    arr = arr.astype(np.intp, copy=False)
+    if arr.size and (arr.min() < 0 or arr.max() >= size):
+        raise ValueError(f"{name} out of range")
+    return arr
+
+
+def score_many(level, strain, risk, declarer, made, vulnerable, pbn=False):
+    """NS-perspective duplicate scores for arrays of outcomes.
+
+    Each argument is an array (or scalar) broadcast against the others:
+    level 0-7 (0 = passed out), strain 0-4 or 'C'..'NT', risk 0-2 or
+    '', 'X', 'XX', declarer 0-3 or 'N'..'W', made 0-13 and vulnerable
+    0-3 or 'None', 'NS', 'EW', 'All'. With pbn=True the result is an
+    array of PBN "NS n" strings instead of ints.
+    """
+    level = _codes(level, {}, 'level', 8)
+    strain = _codes(strain, DENOM_ID, 'strain', 5)
+    risk = _codes(risk, RISK_ID, 'risk', 3)
+    side = _codes(declarer, SEAT_ID, 'declarer', 4) & 1
+    made = _codes(made, {}, 'made', 14)
+    vul = _codes(vulnerable, VUL_ID, 'vulnerable', 4)
+
+    # Declarer is vulnerable if their side (1 = NS, 2 = EW) or All is
+    side_vul = ((vul == 3) | (vul == side + 1)).astype(np.intp)
+    pts = SCORE_LATTICE[level, strain, risk, side_vul, made]
+    ns = np.where(side == 0, pts, -pts)
+
+    if pbn:
+        return np.char.add('NS ', ns.astype(str))
+    return ns
+
+
+def verify_score_many():
+    """Check score_many on every contract, declarer, result and vulnerability, raises ValueError on mismatch"""
+    grid = np.array(np.meshgrid(range(1, 8), range(5), range(3), range(4), range(14), range(4),
+                                indexing='ij')).reshape(6, -1)
+    expected = []
+    for level, strain, risk, declarer, made, vul in grid.T:
+        contract = {'level': int(level), 'denomination': DENOMS[strain], 'risk': RISKS[risk]}
+        calc = ScoreCalculator(contract, SEATS[declarer], int(made), VULNERABILITIES[vul])
+        side, pts = calc._arithmetic_score()
+        expected.append(pts if side == 'NS' else -pts)
+    actual = score_many(*grid)
+    bad = np.flatnonzero(actual != np.array(expected))
+    if bad.size:
+        raise ValueError(f"score_many gives {actual[bad[0]]} for {grid[:, bad[0]].tolist()}, "
+                         f"expected {expected[bad[0]]}")
+    if score_many(0, 'NT', '', 'N', 0, 'All') != 0:
+        raise ValueError("Passed-out board does not score 0")
+    if score_many(4, 'S', 'X', 'W', 7, 'EW', pbn=True) != 'NS 800':
+        raise ValueError("4SX-3 vulnerable by West does not score NS 800")
+    return True
+
+
+def verify_against_corpus(data_dir: str = 'parsed-games') -> int:
+    """Check score_many on every board, returns the board count.
+
+    Each batch score must equal ScoreCalculator.pbn_score, its table-free
+    _arithmetic_score and the PBN Score tag when the board has one.
+    Raises ValueError on the first kind of mismatch found.
+    """
+    from bridgeTestsClaude import BridgeGameValidator
+
+    validator = BridgeGameValidator(data_dir=data_dir)
+    rows, expected = [], []
+    for file_path in sorted(Path(data_dir).glob('*.jsonl')):
+        for game in validator.load_games_from_file(file_path):
+            if 'Contract' not in game or 'Result' not in game:
+                continue
+            contract = game['Contract']
+            declarer = game.get('Declarer', {}).get('value', '')
+            made = int(game['Result']['value'] or 0)  # empty when passed out
+            vulnerable = game['Vulnerable']['value']
+            calc = ScoreCalculator(contract, declarer, made, vulnerable)
+            side, pts = calc._arithmetic_score()
+            rows.append((contract.get('level', 0), contract.get('denomination') or 'NT',
+                         contract.get('risk', ''), declarer or 'N', made, vulnerable))
+            expected.append({'ScoreCalculator': calc.pbn_score(),
+                             'arithmetic': f"NS {pts if side == 'NS' else -pts}",
+                             'Score tag': game.get('Score', {}).get('value') or None})
+
+    batch = score_many(*zip(*rows), pbn=True)
+    for source in ('ScoreCalculator', 'arithmetic', 'Score tag'):
+        mismatches = [(row, exp[source], got) for row, exp, got in zip(rows, expected, batch)
+                      if exp[source] is not None and exp[source] != got]
+        if mismatches:
+            raise ValueError(f"{len(mismatches)} batch scores differ from the {source}, first: {mismatches[0]}")
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check batch scoring against ScoreCalculator on the corpus')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    args = parser.parse_args()
+
+    try:
+        verify_score_many()
+        count = verify_against_corpus(args.data_dir)
+    except Exception as e:
+        print(f"Batch scoring check failed: {e}")
+        sys.exit(1)
+    print(f"Batch scores match ScoreCalculator and the Score tags on {count} boards")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""
+Benchmarks for the engine's hot paths, replayed over the parsed-games corpus.
+
+Every board is loaded once and turned into the inputs of each case: the
+calls of its auction, its tricks with the hands held when they started,
+its Deal action, its final contract and the ordered action list that
+Bridge replays. Each case prepares fresh inputs untimed and times passes
+over all boards with the garbage collector off, after a number of warmup
+passes. A timed sample adds up passes until it reaches MIN_SAMPLE_SECONDS,
+and samples are taken in rounds across the cases so each case's samples
+span the whole run.
+Throughput is reported per unit (boards, calls, cards, ...) as the mean
+over repeats with a 95% confidence interval, and as the best repeat.
+
+Results can be saved as a JSON baseline; --compare reruns the cases and
+exits with status 1 if a case's throughput fell more than --threshold
+below the baseline. A drop only counts when the best repeat and the
+whole 95% interval on the change are both beyond the threshold, so noise
+does not fail the gate. --profile replays the boards once more with a
+BridgeProfile and prints where the replay time went.
+
+Usage:
+    python bridgeBenchmark.py [--data-dir=parsed-games] [--filter=PATTERN] [--cases=NAME,...]
+                              [--repeats=10] [--warmup=2] [--save=FILE] [--compare=FILE] [--threshold=0.1]
+                              [--profile]
+"""
+
+import gc
+import io
+import sys
+import json
+import time
+import math
+import platform
+import argparse
+import statistics
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bridgeClaudev2 import Auction, Bridge, BridgeProfile, ScoreCalculator, Trick
+from bridgeEncoding import CALL_ID, SEATS
+from bridgeStream import stream_corpus
+
+BENCHMARK_VERSION = 1
+MIN_SAMPLE_SECONDS = 0.1  # each timed sample adds up passes until it reaches this long
+GAME_TAGS = ['Vulnerable', 'Dealer', 'Deal', 'Auction', 'Play']
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086]  # two-sided, by degrees of freedom
+
+
+@dataclass
+class BoardInputs:
+    """What each case needs from one board, taken from a successful replay"""
+    actions: List[Dict]
+    dealer: str
+    deal: Dict
+    calls: List[Tuple[str, str]]
+    tricks: List[Tuple[Optional[str], str, List[Tuple[str, str]], Dict[str, List[str]]]]  # trump, leader, plays, hands
+    contract: Optional[Tuple[Dict, str, int, str]] = None  # ScoreCalculator arguments once play is complete
+
+
+@dataclass
+class Case:
+    """A timed operation: setup builds fresh inputs, run consumes them"""
+    name: str
+    setup: Callable[[List[BoardInputs]], object]
+    run: Callable[[object], None]
+    units: Callable[[List[BoardInputs]], Dict[str, int]]  # first unit is the one compared against baselines
+
+
+@dataclass
+class CaseResult:
+    name: str
+    units: Dict[str, int]
+    seconds: List[float] = field(default_factory=list)
+
+    def rates(self, unit: Optional[str] = None) -> List[float]:
+        count = self.units[unit or next(iter(self.units))]
+        return [count / s if s > 0 else float('inf') for s in self.seconds]
+
+    def rate(self, unit: Optional[str] = None) -> Tuple[float, float]:
+        """Mean throughput and the half-width of its 95% confidence interval"""
+        rates = self.rates(unit)
+        if len(rates) < 2:
+            return rates[0], 0.0
+        t = T_95[len(rates) - 2] if len(rates) - 1 <= len(T_95) else 1.96
+        return statistics.mean(rates), t * statistics.stdev(rates) / math.sqrt(len(rates))
+
+    def best(self, unit: Optional[str] = None) -> float:
+        """Throughput of the fastest repeat; noise only ever slows a pass down"""
+        return max(self.rates(unit))
+
+    def to_dict(self) -> Dict:
+        mean, ci = self.rate()
+        return {'units': self.units, 'seconds': self.seconds, 'rate': mean, 'ci': ci, 'best': self.best()}
+
+
+def _replay(game: Dict) -> Optional[BoardInputs]:
+    """Replay one game, recording the inputs of every case; None if the setup actions fail"""
+    auction = game['Auction']
+    seat = SEATS.index(auction['value'])
+    calls = []
+    for token in auction['tokens']:
+        if token in CALL_ID:
+            calls.append((SEATS[seat], token))
+            seat = (seat + 1) % 4
+
+    actions = [game['Vulnerable'], game['Dealer'], game['Deal']]
+    try:
+        bridge = Bridge(list(actions))
+    except Exception:
+        return None
+    inputs = BoardInputs(actions, game['Dealer']['value'], game['Deal'], calls, [])
+    hands = {p: list(h) for p, h in bridge.hands.items()}
+
+    def simulate(action):
+        bridge.simulate(action)
+        actions.append(action)
+
+    try:
+        for player, call in calls:
+            simulate({'name': 'Auction', 'player': player, 'value': call})
+        if bridge.current_phase == 'Play' and 'Play' in game:
+            seat = SEATS.index(game['Play']['value'])
+            tokens = [t for t in game['Play']['tokens'] if t != '*']
+            for start in range(0, len(tokens) - 3, 4):
+                by_player = {SEATS[(seat + i) % 4]: card for i, card in enumerate(tokens[start:start + 4])}
+                trick = bridge.current_trick
+                before = {p: list(h) for p, h in hands.items()}
+                plays = []
+                for _ in range(4):
+                    player = trick.next_player()
+                    simulate({'name': 'Play', 'player': player, 'value': by_player[player]})
+                    plays.append((player, by_player[player]))
+                    hands[player].remove(by_player[player])
+                inputs.tricks.append((trick.trump, trick.leader, plays, before))
+    except Exception:
+        pass  # keep what replayed cleanly
+    if bridge.scores and bridge.results:
+        inputs.contract = (bridge.contracts[-1], bridge.declarers[-1], bridge.results[-1], bridge.vulnerable)
+    return inputs
+
+
+def load_boards(data_dir: str = 'parsed-games', file_filter: Optional[str] = None) -> List[BoardInputs]:
+    """Inputs for every board in the corpus that has the setup tags and an auction"""
+    boards = []
+    with redirect_stdout(io.StringIO()):  # the engine prints each action it rejects
+        for _, _, game in stream_corpus(data_dir, GAME_TAGS, file_filter):
+            if all(tag in game for tag in GAME_TAGS[:4]):
+                inputs = _replay(game)
+                if inputs is not None:
+                    boards.append(inputs)
+    return boards
+
+
+def _add_calls(auctions):
+    for dealer, calls in auctions:
+        auction = Auction(dealer)
+        for player, call in calls:
+            auction.add_call(player, call)
+
+
+def _add_cards(tricks):
+    for trump, leader, plays, hands in tricks:
+        trick = Trick(trump=trump, leader=leader)
+        for player, card in plays:
+            trick.add_card(player, card, hands)
+
+
+def _completed_tricks(boards):
+    tricks = []
+    for trump, leader, plays, hands in (t for b in boards for t in b.tricks):
+        trick = Trick(trump=trump, leader=leader)
+        for player, card in plays:
+            trick.add_card(player, card, {p: list(h) for p, h in hands.items()})
+        tricks.append(trick)
+    return tricks
+
+
+def _winners(tricks):
+    for trick in tricks:
+        trick.winner()
+
+
+def _deal_state(boards):
+    bridge = Bridge(boards[0].actions[:2])
+    return bridge, [b.deal for b in boards]
+
+
+def _deal(state):
+    bridge, deals = state
+    for deal in deals:
+        bridge.handle_deal_action(deal)
+    bridge.deals.clear()
+
+
+def _score(contracts):
+    for contract in contracts:
+        ScoreCalculator(*contract).score()
+
+
+def _replay_boards(action_lists):
+    for actions in action_lists:
+        Bridge(actions)
+
+
+CASES = [
+    Case('Auction.add_call',
+         lambda boards: [(b.dealer, b.calls) for b in boards],
+         _add_calls,
+         lambda boards: {'calls': sum(len(b.calls) for b in boards)}),
+    Case('Trick.add_card',
+         lambda boards: [(trump, leader, plays, {p: list(h) for p, h in hands.items()})
+                         for b in boards for trump, leader, plays, hands in b.tricks],
+         _add_cards,
+         lambda boards: {'cards': 4 * sum(len(b.tricks) for b in boards)}),
+    Case('Trick.winner',
+         _completed_tricks,
+         _winners,
+         lambda boards: {'tricks': sum(len(b.tricks) for b in boards)}),
+    Case('Bridge.handle_deal_action',
+         _deal_state,
+         _deal,
+         lambda boards: {'deals': len(boards)}),
+    Case('ScoreCalculator.score',
+         lambda boards: [b.contract for b in boards if b.contract],
+         _score,
+         lambda boards: {'scores': sum(1 for b in boards if b.contract)}),
+    Case('Bridge replay',
+         lambda boards: [b.actions for b in boards],
+         _replay_boards,
+         lambda boards: {'boards': len(boards), 'calls': sum(len(b.calls) for b in boards),
+                         'cards': 4 * sum(len(b.tricks) for b in boards)}),
+]
+CASE_NAMES = [case.name for case in CASES]
+
+
+def _time_passes(case: Case, boards: List[BoardInputs], passes: int) -> float:
+    """Mean seconds per pass, each pass on fresh inputs prepared untimed just before it"""
+    total = 0.0
+    enabled = gc.isenabled()
+    for _ in range(passes):
+        state = case.setup(boards)
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            case.run(state)
+            total += time.perf_counter() - start
+        finally:
+            if enabled:
+                gc.enable()
+    return total / passes
+
+
+def _passes_per_sample(case: Case, boards: List[BoardInputs], warmup: int) -> int:
+    """Run warmup untimed passes and size a sample to add up to MIN_SAMPLE_SECONDS"""
+    per_pass = None
+    for _ in range(warmup):
+        per_pass = _time_passes(case, boards, 1)
+    if per_pass is None:
+        per_pass = _time_passes(case, boards, 1)
+    return max(1, math.ceil(MIN_SAMPLE_SECONDS / per_pass)) if per_pass > 0 else 1
+
+
+def run_case(case: Case, boards: List[BoardInputs], repeats: int = 10, warmup: int = 2) -> CaseResult:
+    """Time repeats samples of a case over all boards, after warmup untimed passes.
+
+    A sample times enough passes to add up to MIN_SAMPLE_SECONDS (the
+    pass count is sized from the warmup), so scheduler jitter does not
+    dominate the cases that take a millisecond per pass.
+    """
+    return run_cases([case], boards, repeats, warmup)[0]
+
+
+def run_cases(cases: List[Case], boards: List[BoardInputs], repeats: int = 10, warmup: int = 2) -> List[CaseResult]:
+    """Time several cases as run_case does, taking their samples in rounds.
+
+    Each round times one sample of every case, so a case's samples are
+    spread over the whole run. A machine that speeds up or slows down
+    part way through then widens every case's interval instead of
+    biasing whichever cases happened to run at that moment.
+    """
+    if repeats < 1 or warmup < 0:
+        raise ValueError("repeats must be at least 1 and warmup at least 0")
+    results = [CaseResult(case.name, case.units(boards)) for case in cases]
+    passes = [_passes_per_sample(case, boards, warmup) for case in cases]
+    for _ in range(repeats):
+        for case, result, count in zip(cases, results, passes):
+            result.seconds.append(_time_passes(case, boards, count))
+    return results
+
+
+def run_benchmarks(boards: List[BoardInputs], names: Optional[List[str]] = None,
+                   repeats: int = 10, warmup: int = 2) -> List[CaseResult]:
+    if not boards:
+        raise ValueError("No boards to benchmark")
+    unknown = set(names or []) - set(CASE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown cases: {', '.join(sorted(unknown))}")
+    return run_cases([case for case in CASES if not names or case.name in names], boards, repeats, warmup)
+
+
+def profile_replay(boards: List[BoardInputs]) -> BridgeProfile:
+    """Per-action and per-phase time of one replay of every board"""
+    profile = BridgeProfile()
+    for board in boards:
+        Bridge(board.actions, profile=profile)
+    return profile
+
+
+def to_baseline(results: List[CaseResult], boards: int, repeats: int, warmup: int) -> Dict:
+    return {'version': BENCHMARK_VERSION, 'python': platform.python_version(), 'machine': platform.machine(),
+            'boards': boards, 'repeats': repeats, 'warmup': warmup,
+            'cases': {r.name: r.to_dict() for r in results}}
+
+
+def change_interval(result: CaseResult, base: CaseResult) -> Tuple[float, float]:
+    """95% interval on the relative change in mean throughput from base to result.
+
+    The half-width combines both runs' intervals, so a baseline saved
+    from a noisy run widens the interval too.
+    """
+    base_rate, base_ci = base.rate()
+    rate, ci = result.rate()
+    if not base_rate:
+        return float('inf'), float('inf')
+    half = math.hypot(ci, base_ci)
+    return (rate - base_rate - half) / base_rate, (rate - base_rate + half) / base_rate
+
+
+def compare(results: List[CaseResult], baseline: Dict, threshold: float = 0.1) -> List[str]:
+    """Names of cases that are slower than the baseline by more than threshold.
+
+    A case only counts as regressed when its best repeat and even the
+    upper end of the 95% interval on its change are drops of more than
+    threshold, so run-to-run noise does not fail the gate; with few
+    repeats the interval is wide and nothing is flagged.
+    """
+    regressions = []
+    for result in results:
+        saved = baseline.get('cases', {}).get(result.name)
+        if saved is None:
+            print(f"{result.name:28} not in baseline")
+            continue
+        base = CaseResult(result.name, saved['units'], saved['seconds'])
+        low, high = change_interval(result, base)
+        best = result.best() / base.best() - 1
+        regressed = high < -threshold and best < -threshold
+        print(f"{result.name:28} {base.best():12,.0f} -> {result.best():12,.0f} /s  "
+              f"{best:+7.1%}  (mean {low:+.1%} to {high:+.1%})"
+              f"{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(result.name)
+    return regressions
+
+
+def verify_benchmark_stats():
+    """Check the rate interval and the regression gate on made-up timings, raises ValueError on mismatch"""
+    # 100 boards in 1, 2 and 4 s: rates 100, 50 and 25/s, mean 58.33, sd 38.19, t(2) = 4.303
+    mean, ci = CaseResult('case', {'boards': 100}, [1.0, 2.0, 4.0]).rate()
+    if abs(mean - 175 / 3) > 1e-9 or abs(ci - 94.872) > 1e-3:
+        raise ValueError(f"Rate {mean:.3f} +/- {ci:.3f}, expected 58.333 +/- 94.872")
+
+    seconds = [1.00, 1.01, 0.99, 1.00, 1.02]
+    base = CaseResult('steady', {'boards': 1000}, seconds)
+    baseline = json.loads(json.dumps(to_baseline([base, CaseResult('noisy', {'boards': 1000}, seconds)], 1000, 5, 0)))
+    results = [CaseResult('steady', {'boards': 1000}, [s * 1.5 for s in seconds]),
+               CaseResult('noisy', {'boards': 1000}, [1.0, 3.0]),  # as slow on average, but two far-apart repeats
+               CaseResult('new', {'boards': 1000}, seconds)]
+    with redirect_stdout(io.StringIO()):
+        regressions = compare(results, baseline)
+        unchanged = compare([base], baseline)
+    if regressions != ['steady'] or unchanged:
+        raise ValueError(f"Regression gate flagged {regressions} and {unchanged}, expected ['steady'] and []")
+    return True
+
+
+def print_results(results: List[CaseResult]):
+    print(f"{'CASE':28} {'RATE':>14} {'95% CI':>12} {'BEST':>14}  UNIT")
+    for result in results:
+        for i, unit in enumerate(result.units):
+            mean, ci = result.rate(unit)
+            print(f"{result.name if i == 0 else '':28} {mean:14,.0f} {ci:12,.0f} {result.best(unit):14,.0f}  {unit}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark engine hot paths over the parsed-games corpus')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--filter', help='Only load files whose name contains this')
+    parser.add_argument('--cases', help=f"Comma-separated cases to run (default: all of {', '.join(CASE_NAMES)})")
+    parser.add_argument('--repeats', type=int, default=10, help='Timed passes per case')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed passes before timing')
+    parser.add_argument('--save', help='Write the results to this JSON baseline file')
+    parser.add_argument('--compare', help='Baseline file to compare against; exits 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed throughput drop (0.1 = 10%%)')
+    parser.add_argument('--profile', action='store_true', help='Also print a per-action profile of one replay')
+    args = parser.parse_args()
+
+    if not Path(args.data_dir).exists():
+        print(f"Data directory not found: {args.data_dir}")
+        sys.exit(1)
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not read baseline {args.compare}: {e}")
+            sys.exit(1)
+
+    boards = load_boards(args.data_dir, args.filter)
+    names = [name.strip() for name in args.cases.split(',')] if args.cases else None
+    try:
+        results = run_benchmarks(boards, names, args.repeats, args.warmup)
+    except ValueError as e:
+        print(f"Benchmark failed: {e}")
+        sys.exit(1)
+    print(f"{len(boards)} boards, {args.repeats} repeats after {args.warmup} warmup\n")
+    print_results(results)
+    if args.profile:
+        print(f"\nReplay profile:\n{profile_replay(boards).report()}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump(to_baseline(results, len(boards), args.repeats, args.warmup), file, indent=2)
+        print(f"\nBaseline written to {args.save}")
+    if baseline is not None:
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} cases regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Random access to single boards in parsed-games files.
+
+An index holds the byte range of every game in a JSONL file together
+with its Board, Room and Event tags. It is built by mapping the file and
+searching for game markers, so no line is decoded except the three key
+tags, and is kept in a sidecar file (<name>.jsonl.idx) that is rebuilt
+whenever the source file's size or modification time changes. Reading a
+board then decodes only that game's lines.
+
+Usage:
+    python bridgeBoardIndex.py FILE [--board=14] [--room=Closed] [--game=N] [--data-dir=parsed-games]
+
+FILE is a path or a parsed-games file id (65937 for parsed-65937.jsonl).
+"""
+
+import os
+import sys
+import json
+import mmap
+import argparse
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from bridgeStream import GAME_PREFIX, TAG_PREFIX, parse_games, stream_games
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+KEY_TAGS = ['Board', 'Room', 'Event']
+
+
+@dataclass
+class IndexEntry:
+    """Byte range and key tags of one game"""
+    game: int
+    start: int
+    end: int
+    board: Optional[str] = None
+    room: Optional[str] = None
+    event: Optional[str] = None
+
+
+def _key_tags(data: mmap.mmap, start: int, end: int) -> Dict[str, str]:
+    """Values of the key tags between start and end, read from their lines only"""
+    values = {}
+    for name in KEY_TAGS:
+        pos = data.find(f'\n{TAG_PREFIX}{name}"'.encode(), start, end)
+        if pos < 0:
+            continue
+        line_end = data.find(b'\n', pos + 1, end)
+        line = data[pos + 1:line_end if line_end >= 0 else end]
+        try:
+            values[name.lower()] = json.loads(line).get('value')
+        except json.JSONDecodeError:
+            pass
+    return values
+
+
+def build_index(filepath) -> List[IndexEntry]:
+    """Index every game of a JSONL file"""
+    with open(filepath, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            prefix = GAME_PREFIX.encode()
+            marker = b'\n' + prefix
+            starts = [0] if data[:len(prefix)] == prefix else []
+            pos = data.find(marker)
+            while pos >= 0:
+                starts.append(pos + 1)
+                pos = data.find(marker, pos + 1)
+            ends = starts[1:] + [len(data)]
+            return [IndexEntry(game, start, end, **_key_tags(data, start, end))
+                    for game, (start, end) in enumerate(zip(starts, ends))]
+
+
+class BoardIndex:
+    """Game offsets of one JSONL file, loaded from (or saved to) its sidecar index"""
+
+    def __init__(self, filepath, rebuild: bool = False):
+        self.path = Path(filepath)
+        self.sidecar = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        stat = self.path.stat()
+        self._stamp = [stat.st_size, stat.st_mtime_ns]
+        self.entries = None if rebuild else self._load()
+        self.rebuilt = self.entries is None
+        if self.entries is None:
+            self.entries = build_index(self.path)
+            self._save()
+
+    def _load(self) -> Optional[List[IndexEntry]]:
+        try:
+            with open(self.sidecar, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION or data.get('stamp') != self._stamp:
+            return None
+        return [IndexEntry(*entry) for entry in data['games']]
+
+    def _save(self):
+        """Write the sidecar atomically; a read-only directory just means rebuilding next time"""
+        data = {'version': INDEX_VERSION, 'stamp': self._stamp,
+                'games': [[e.game, e.start, e.end, e.board, e.room, e.event] for e in self.entries]}
+        temp = self.sidecar.with_name(f"{self.sidecar.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp, 'w', encoding='utf-8') as file:
+                json.dump(data, file, separators=(',', ':'))
+            os.replace(temp, self.sidecar)
+        except OSError:
+            temp.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(self, board: Optional[str] = None, room: Optional[str] = None,
+             event: Optional[str] = None) -> List[IndexEntry]:
+        """Entries whose key tags match every given value"""
+        return [e for e in self.entries
+                if (board is None or e.board == board) and (room is None or e.room == room)
+                and (event is None or e.event == event)]
+
+    def read(self, game: int, tags: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Decode one game as {tag name: tag object}, keeping only tags (all when None)"""
+        if not 0 <= game < len(self.entries):
+            raise IndexError(f"{self.path.name} has no game {game}")
+        entry = self.entries[game]
+        with open(self.path, 'rb') as file:
+            file.seek(entry.start)
+            text = file.read(entry.end - entry.start).decode('utf-8')
+        games = parse_games(text.splitlines(keepends=True), tags, f"{self.path}@{entry.start}")
+        return next(games, {})
+
+    def read_board(self, board: str, room: Optional[str] = None,
+                   tags: Optional[Iterable[str]] = None) -> List[Dict[str, Dict]]:
+        """Every game for one board (optionally one room)"""
+        return [self.read(e.game, tags) for e in self.find(board=board, room=room)]
+
+
+def resolve_file(name: str, data_dir: str = 'parsed-games') -> Path:
+    """A path, or a parsed-games file id such as 65937"""
+    path = Path(name)
+    if path.exists():
+        return path
+    return Path(data_dir) / f"parsed-{name}.jsonl"
+
+
+def verify_board_index():
+    """Check an index against stream_games on a small file, and its sidecar reuse, raises ValueError on mismatch"""
+    def tag(name, value):
+        return {'type': 'tag', 'name': name, 'value': value}
+
+    games = [[tag('Event', 'E'), tag('Board', '1'), tag('Room', 'Open'), tag('Contract', '4S')],
+             [tag('Board', '1'), tag('Room', 'Closed'), tag('Contract', '3NT')],
+             [],  # a game marker with no tags still counts
+             [tag('Board', '2'), tag('Room', 'Open')]]
+    lines = [{'type': 'directive', 'text': 'PBN 2.1'}]
+    for game in games:
+        lines += [{'type': 'game'}, *game]
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = Path(data_dir) / 'check.jsonl'
+        write = lambda rows: path.write_text(''.join(json.dumps(row, separators=(',', ':')) + '\n' for row in rows),
+                                             encoding='utf-8')
+        write(lines[:-3])  # the first three games, then the file grows and the sidecar goes stale
+        first = BoardIndex(path)
+        write(lines)
+        index, reused = BoardIndex(path), BoardIndex(path)
+        expected = list(stream_games(path))
+        read = [index.read(game) for game in range(len(index))]
+        keys = [(e.board, e.room, e.event) for e in reused.entries]
+        found = [e.game for e in index.find(board='1')], [e.game for e in index.find(room='Open')]
+        closed = reused.read_board('1', 'Closed', ['Contract'])
+
+    if (len(first), first.rebuilt, index.rebuilt, reused.rebuilt) != (3, True, True, False):
+        raise ValueError(f"Sidecar not rebuilt or reused as expected: {len(first)} games, "
+                         f"rebuilt {first.rebuilt}, {index.rebuilt}, {reused.rebuilt}")
+    if read != expected:
+        raise ValueError(f"Indexed games {read} differ from stream_games {expected}")
+    if keys != [('1', 'Open', 'E'), ('1', 'Closed', None), (None, None, None), ('2', 'Open', None)]:
+        raise ValueError(f"Index key tags {keys}")
+    if found != ([0, 1], [0, 3]) or closed != [{'Contract': tag('Contract', '3NT')}]:
+        raise ValueError(f"Lookups found {found} and {closed}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up single boards in a parsed-games file')
+    parser.add_argument('file', help='JSONL path or parsed-games file id (e.g. 65937)')
+    parser.add_argument('--board', help='Board number')
+    parser.add_argument('--room', help='Room (Open, Closed)')
+    parser.add_argument('--game', type=int, help='Game index, as reported by the validator')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index even if it is current')
+    args = parser.parse_args()
+
+    path = resolve_file(args.file, args.data_dir)
+    if not path.exists():
+        print(f"File not found: {path}")
+        sys.exit(1)
+    index = BoardIndex(path, rebuild=args.rebuild)
+
+    if args.game is not None:
+        entries = [index.entries[args.game]] if 0 <= args.game < len(index) else []
+    elif args.board is None and args.room is None:
+        for e in index.entries:
+            print(f"game {e.game:4}  board {e.board or '-':>4}  {e.room or '-':6}  {e.event or ''}")
+        return
+    else:
+        entries = index.find(board=args.board, room=args.room)
+    if not entries:
+        print("No matching game")
+        sys.exit(1)
+    for entry in entries:
+        print(f"# {path.name} game {entry.game} (bytes {entry.start}-{entry.end})")
+        for tag in index.read(entry.game).values():
+            print(json.dumps(tag))
+
+
+if __name__ == '__main__':
+    main()
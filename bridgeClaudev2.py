@@ -1,8 +1,151 @@
 import random
-
-DENOMS = ['C', 'D', 'H', 'S', 'NT']
-BIDS = [f"{level}{denom}" for level in range(1, 8) for denom in DENOMS]
-VALID_AUCTION_ACTIONS = set(['Pass', 'X', 'XX'] + BIDS)
+import time
+
+from bridgeEncoding import (
+    BIDS, CALLS, CALL_DENOM, CALL_ID, CALL_LEVEL, CARDS, CARD_BIT, CARD_ID, CARD_RANK,
+    CARD_SUIT, DENOMS, DENOM_ID, DOUBLE, FIRST_BID, LHO, PASS, RANK_ID, REDOUBLE, RISK_ID,
+    SEATS, SEAT_ID, SEAT_SIDE, SIDES, SUITS, SUIT_ID, SUIT_MASK, mask_to_cards, parse_pbn_deal,
+)
+
+VALID_AUCTION_ACTIONS = set(CALLS)
+
+class BitboardHands:
+    """Hands stored as one 52-bit integer per seat (13 bits per suit).
+
+    Indexing by seat returns the hand as a tuple of card strings, so code
+    that reads the plain dict-of-lists representation keeps working while
+    code that mutates it fails loudly; use add/remove to change a hand.
+    """
+    SEATS = SEATS
+
+    def __init__(self):
+        self.masks = [0, 0, 0, 0]  # indexed by seat id
+
+    def __getitem__(self, seat):
+        return tuple(mask_to_cards(self.masks[SEAT_ID[seat]]))
+
+    def __setitem__(self, seat, cards):
+        mask = 0
+        for card in cards:
+            mask |= CARD_BIT[CARD_ID[card]]
+        self.masks[SEAT_ID[seat]] = mask
+
+    def __contains__(self, seat):
+        return seat in SEAT_ID
+
+    def __iter__(self):
+        return iter(SEATS)
+
+    def __len__(self):
+        return len(SEATS)
+
+    def keys(self):
+        return list(SEATS)
+
+    def values(self):
+        return [tuple(mask_to_cards(mask)) for mask in self.masks]
+
+    def items(self):
+        return [(seat, tuple(mask_to_cards(mask))) for seat, mask in zip(SEATS, self.masks)]
+
+    def has_card(self, seat, card) -> bool:
+        return bool(self.masks[SEAT_ID[seat]] & CARD_BIT[CARD_ID[card]])
+
+    def has_suit(self, seat, suit) -> bool:
+        return bool(self.masks[SEAT_ID[seat]] & SUIT_MASK[SUIT_ID[suit]])
+
+    def is_dealt(self, card) -> bool:
+        """True if any seat holds the card"""
+        bit = CARD_BIT[CARD_ID[card]]
+        return any(mask & bit for mask in self.masks)
+
+    def add(self, seat, card):
+        self.masks[SEAT_ID[seat]] |= CARD_BIT[CARD_ID[card]]
+
+    def remove(self, seat, card):
+        seat_id = SEAT_ID[seat]
+        bit = CARD_BIT[CARD_ID[card]]
+        if not self.masks[seat_id] & bit:
+            raise ValueError(f"Player {seat} does not have {card}")
+        self.masks[seat_id] ^= bit
+
+# Score lattice: declarer-side duplicate score for every
+# level(1-7) x strain(C..NT) x risk(-, X, XX) x vulnerable x tricks made(0-13)
+FIRST_TRICK_POINTS = [20, 20, 30, 30, 40]
+TRICK_POINTS = [20, 20, 30, 30, 30]
+DOUBLED_UNDERTRICKS = [[100, 200, 200], [200, 300, 300]]  # [vul] first, second, third; then 300 each
+
+def _undertrick_penalty(down, risk, vul):
+    if risk == 0:
+        return (100 if vul else 50) * down
+    steps = DOUBLED_UNDERTRICKS[vul]
+    penalty = sum(steps[:down]) + 300 * max(0, down - len(steps))
+    return penalty * risk  # XX doubles the doubled penalty
+
+def _made_score(level, strain, risk, vul, over):
+    mult = (1, 2, 4)[risk]
+    contract_pts = (FIRST_TRICK_POINTS[strain] + TRICK_POINTS[strain] * (level - 1)) * mult
+    total = contract_pts + 50 * risk  # Insult: 50 doubled, 100 redoubled
+    total += (500 if vul else 300) if contract_pts >= 100 else 50
+    if level == 6:
+        total += 750 if vul else 500
+    elif level == 7:
+        total += 1500 if vul else 1000
+    if risk == 0:
+        total += TRICK_POINTS[strain] * over
+    else:
+        total += (200 if vul else 100) * risk * over
+    return total
+
+def _build_score_table():
+    table = []
+    for level in range(1, 8):
+        for strain in range(len(DENOMS)):
+            for risk in range(3):
+                for vul in range(2):
+                    for made in range(14):
+                        over = made - 6 - level
+                        if over >= 0:
+                            table.append(_made_score(level, strain, risk, vul, over))
+                        else:
+                            table.append(-_undertrick_penalty(-over, risk, vul))
+    return table
+
+SCORE_TABLE = _build_score_table()
+
+def duplicate_score(level, strain, risk, vul, made) -> int:
+    """Declarer-side duplicate score, negative when the contract goes down.
+
+    strain is 'C'..'NT', risk is '', 'X' or 'XX' and vul is a bool.
+    Level 0 (passed out) scores 0.
+    """
+    if level == 0:
+        return 0
+    return SCORE_TABLE[((((level - 1) * 5 + DENOM_ID[strain]) * 3 + RISK_ID[risk]) * 2 + bool(vul)) * 14 + made]
+
+def ns_score(level, strain, risk, declarer, made, vulnerable) -> int:
+    """NS-perspective score for a declarer seat and a PBN vulnerability ('None', 'NS', 'EW', 'All')"""
+    if level == 0 or not declarer:
+        return 0
+    side = SIDES[SEAT_SIDE[SEAT_ID[declarer]]]
+    pts = duplicate_score(level, strain, risk, vulnerable == 'All' or vulnerable == side, made)
+    return pts if side == 'NS' else -pts
+
+def verify_score_table():
+    """Check SCORE_TABLE against ScoreCalculator's trick-by-trick arithmetic, raises ValueError on mismatch"""
+    for level in range(1, 8):
+        for strain in DENOMS:
+            for risk in ('', 'X', 'XX'):
+                for vul in ('None', 'NS'):
+                    for made in range(14):
+                        sc = ScoreCalculator({'level': level, 'denomination': strain, 'risk': risk}, 'N', made, vul)
+                        side, pts = sc._arithmetic_score()
+                        expected = pts if side == 'NS' else -pts
+                        actual = duplicate_score(level, strain, risk, vul == 'NS', made)
+                        if actual != expected:
+                            raise ValueError(f"Score table mismatch for {level}{strain}{risk} "
+                                             f"vul={vul} made={made}: {actual} != {expected}")
+    return True
 
 class ScoreCalculator:
     TRICK_SCORE = {'C': 20, 'D': 20, 'H': 30, 'S': 30, 'NT': None}
@@ -41,16 +184,23 @@ class ScoreCalculator:
         return (self.vul == 'All') or (self.vul == self.declarer_side())
 
     def pbn_score(self) -> str:
-        side, pts = self.score()
-        if side is None:
-            return "NS 0"
-        ns_pts = pts if side == 'NS' else -pts
-        return f"NS {ns_pts}"
+        return f"NS {ns_score(self.level, self.denom, self.risk, self.declarer, self.made, self.vul)}"
 
     def score(self):
         if self.level == 0 or not self.declarer:
             return (None, 0)
 
+        pts = duplicate_score(self.level, self.denom, self.risk, self.is_vulnerable(), self.made)
+        if pts >= 0:
+            return (self.declarer_side(), pts)
+        defenders = 'EW' if self.declarer_side() == 'NS' else 'NS'
+        return (defenders, -pts)
+
+    def _arithmetic_score(self):
+        """score() computed step by step, used by verify_score_table"""
+        if self.level == 0 or not self.declarer:
+            return (None, 0)
+
         vul = self.is_vulnerable()
         tricks_needed = 6 + self.level
         over_under = self.made - tricks_needed
@@ -73,9 +223,9 @@ class ScoreCalculator:
 
             total = trick_pts
 
-            # Double/redouble bonus
+            # Double/redouble bonus: 50 doubled, 100 redoubled
             if mult > 1:
-                total += 50 * mult
+                total += 25 * mult
 
             # Game/part-game bonus
             if trick_pts >= 100:
@@ -127,191 +277,153 @@ class ScoreCalculator:
             defenders = 'EW' if self.declarer_side() == 'NS' else 'NS'
             return (defenders, penalty)
 
+
 class Auction:
-    DENOMINATIONS = ['C', 'D', 'H', 'S', 'NT']
+    DENOMINATIONS = DENOMS
     LEVELS = list(range(1, 8))
-    VALID_PLAYERS = ['N', 'E', 'S', 'W']
+    VALID_PLAYERS = SEATS
 
     def __init__(self, dealer='N'):
         if dealer not in self.VALID_PLAYERS:
             raise ValueError("Invalid dealer")
-        self.calls = []
+        self.call_ids = []
         self.last_bid_idx = None
         self.dealer = dealer
+        self.dealer_id = SEAT_ID[dealer]
+
+        # Running state, updated as calls arrive so every query is O(1)
+        self.last_bid = None          # call id of the last bid
+        self.last_bid_seat = None     # seat id of the last bidder
+        self.last_action = None       # call id of the last non-pass call
+        self.last_action_seat = None  # seat id of the last non-pass caller
+        self.risk = ''                # '', 'X' or 'XX' on the last bid
+        self.trailing_passes = 0
+        self.first_bidder = [[None] * len(DENOMS), [None] * len(DENOMS)]  # [side][denom] -> seat id
+
+    @property
+    def calls(self):
+        """Calls made so far as a tuple of {'player', 'call'} dicts, built from call_ids.
+
+        Read-only: use add_call to extend the auction.
+        """
+        return tuple({'player': SEATS[(self.dealer_id + i) % 4], 'call': CALLS[c]}
+                     for i, c in enumerate(self.call_ids))
+
+    def current_seat(self) -> int:
+        """Seat id of the player to call"""
+        return (self.dealer_id + len(self.call_ids)) % 4
 
     def current_player(self):
         """Get the current player to call"""
-        if not self.calls:
-            return self.dealer
-        
-        dealer_idx = self.VALID_PLAYERS.index(self.dealer)
-        call_count = len(self.calls)
-        current_idx = (dealer_idx + call_count) % 4
-        return self.VALID_PLAYERS[current_idx]
+        return SEATS[self.current_seat()]
 
     @classmethod
     def _bid_value(cls, bid_str: str) -> int:
-        if not bid_str or len(bid_str) < 2:
-            return -1
-        try:
-            level = int(bid_str[0])
-            denom = bid_str[1:]
-            if level not in cls.LEVELS or denom not in cls.DENOMINATIONS:
-                return -1
-            denom_index = cls.DENOMINATIONS.index(denom)
-            return (level - 1) * len(cls.DENOMINATIONS) + denom_index
-        except (ValueError, IndexError):
+        call = CALL_ID.get(bid_str) if isinstance(bid_str, str) else None
+        if call is None or call < FIRST_BID:
             return -1
+        return call - FIRST_BID
 
     def is_valid_call(self, player: str, call: str) -> bool:
-        # Validate player
-        if player not in self.VALID_PLAYERS:
+        # Validate player and call format
+        if not isinstance(player, str) or player not in SEAT_ID:
             return False
-            
-        # Check if it's this player's turn
-        if player != self.current_player():
+        if not isinstance(call, str) or call not in CALL_ID:
             return False
-            
-        # Validate call format
-        if not isinstance(call, str):
+        return self.is_valid_call_id(SEAT_ID[player], CALL_ID[call])
+
+    def is_valid_call_id(self, seat: int, call: int) -> bool:
+        """is_valid_call for a seat id and call id"""
+        # Check if it's this player's turn
+        if seat != (self.dealer_id + len(self.call_ids)) % 4:
             return False
 
-        if call == 'Pass':
+        if call == PASS:
             return True
 
-        if call == 'X':
-            # Find the last non-pass call
-            last_non_pass = None
-            for prev in reversed(self.calls):
-                if prev['call'] != 'Pass':
-                    last_non_pass = prev
-                    break
-            
-            if not last_non_pass:
-                return False
-
-            # Must be a bid (not X or XX)
-            if last_non_pass['call'] in ('X', 'XX'):
-                return False
-                
-            # Can't double your own side's bid
-            doubler_side = {'N', 'S'} if player in ('N', 'S') else {'E', 'W'}
-            bidder_side = {'N', 'S'} if last_non_pass['player'] in ('N', 'S') else {'E', 'W'}
-            
-            return doubler_side != bidder_side
-
-        if call == 'XX':
-            # Find the last non-pass call
-            last_non_pass = None
-            for prev in reversed(self.calls):
-                if prev['call'] != 'Pass':
-                    last_non_pass = prev
-                    break
-            
-            if not last_non_pass or last_non_pass['call'] != 'X':
-                return False
+        if call == DOUBLE:
+            # Last non-pass call must be an opponent's bid
+            last = self.last_action
+            return (last is not None and last >= FIRST_BID
+                    and SEAT_SIDE[seat] != SEAT_SIDE[self.last_action_seat])
 
-            # Can redouble your own side's doubled bid
-            redoubler_side = {'N', 'S'} if player in ('N', 'S') else {'E', 'W'}
-            doubler_side = {'N', 'S'} if last_non_pass['player'] in ('N', 'S') else {'E', 'W'}
-            
-            return redoubler_side != doubler_side
+        if call == REDOUBLE:
+            # Last non-pass call must be an opponent's double
+            return (self.last_action == DOUBLE
+                    and SEAT_SIDE[seat] != SEAT_SIDE[self.last_action_seat])
 
-        # Validate bid format and level
-        bid_value = self._bid_value(call)
-        if bid_value == -1:
-            return False
-            
         # Must be higher than last bid
-        if self.last_bid_idx is not None:
-            last_bid = self.calls[self.last_bid_idx]['call']
-            last_value = self._bid_value(last_bid)
-            if bid_value <= last_value:
-                return False
-                
-        return True
+        return self.last_bid is None or call > self.last_bid
 
     def add_call(self, player: str, call: str) -> bool:
         if not self.is_valid_call(player, call):
             raise ValueError(f"Illegal call {call!r} by {player}")
+        return self._append(SEAT_ID[player], CALL_ID[call])
 
-        self.calls.append({'player': player, 'call': call})
-        
-        # Update last bid index if this is a bid
-        if call not in ('Pass', 'X', 'XX'):
-            self.last_bid_idx = len(self.calls) - 1
+    def add_call_id(self, seat: int, call: int) -> bool:
+        """add_call for a seat id and call id"""
+        if not self.is_valid_call_id(seat, call):
+            raise ValueError(f"Illegal call {CALLS[call]!r} by {SEATS[seat]}")
+        return self._append(seat, call)
 
-        return self.is_finished()
+    def _append(self, seat: int, call: int) -> bool:
+        self.call_ids.append(call)
 
-    def is_finished(self) -> bool:
-        # Need at least 4 calls to finish
-        if len(self.calls) < 4:
-            return False
-            
-        # All pass out (4 passes in a row from the start)
-        if self.last_bid_idx is None:
-            # Check if we have exactly 4 passes or more
-            if len(self.calls) >= 4 and all(c['call'] == 'Pass' for c in self.calls[:4]):
-                return True
-            return False
+        if call == PASS:
+            self.trailing_passes += 1
+        else:
+            self.trailing_passes = 0
+            self.last_action = call
+            self.last_action_seat = seat
+            if call == DOUBLE:
+                self.risk = 'X'
+            elif call == REDOUBLE:
+                self.risk = 'XX'
+            else:
+                self.last_bid_idx = len(self.call_ids) - 1
+                self.last_bid = call
+                self.last_bid_seat = seat
+                self.risk = ''
+                first = self.first_bidder[SEAT_SIDE[seat]]
+                if first[CALL_DENOM[call]] is None:
+                    first[CALL_DENOM[call]] = seat
 
-        # Three passes after the last bid
-        calls_after_bid = self.calls[self.last_bid_idx + 1:]
-        if len(calls_after_bid) >= 3:
-            return all(c['call'] == 'Pass' for c in calls_after_bid[-3:])
+        return self.is_finished()
 
-        return False
+    def is_finished(self) -> bool:
+        # All pass out, or three passes after the last bid
+        if self.last_bid is None:
+            return self.trailing_passes >= 4
+        return self.trailing_passes >= 3
 
     def contract(self) -> dict:
         if not self.is_finished():
             raise RuntimeError("Auction not finished yet")
 
         # All pass - no contract
-        if self.last_bid_idx is None:
+        if self.last_bid is None:
             return {'level': 0, 'denomination': 'Pass', 'risk': ''}
 
-        last_bid = self.calls[self.last_bid_idx]
-        level = int(last_bid['call'][0])
-        denom = last_bid['call'][1:]
-        
-        # Check for doubles/redoubles after the last bid
-        calls_after = self.calls[self.last_bid_idx + 1:]
-        risk = ''
-        for call in calls_after:
-            if call['call'] == 'X':
-                risk = 'X'
-            elif call['call'] == 'XX':
-                risk = 'XX'
-
-        return {'level': level, 'denomination': denom, 'risk': risk}
+        return {'level': CALL_LEVEL[self.last_bid], 'denomination': DENOMS[CALL_DENOM[self.last_bid]],
+                'risk': self.risk}
 
-    def declarer(self) -> str:
+    def declarer_seat(self):
+        """Seat id of declarer, or None if passed out"""
         if not self.is_finished():
             raise RuntimeError("Auction not finished yet")
 
-        contract = self.contract()
-        if contract['level'] == 0:
+        if self.last_bid is None:
             return None
 
-        # Find the winning side
-        last_bid = self.calls[self.last_bid_idx]
-        winning_side = {'N', 'S'} if last_bid['player'] in ('N', 'S') else {'E', 'W'}
-        trump_suit = contract['denomination']
-
-        # Find the first player from the winning side to bid this trump suit
-        for call in self.calls:
-            if call['call'] in ('Pass', 'X', 'XX'):
-                continue
-                
-            bid_suit = call['call'][1:]
-            if bid_suit == trump_suit and call['player'] in winning_side:
-                return call['player']
+        # First player of the winning side to bid the final denomination
+        return self.first_bidder[SEAT_SIDE[self.last_bid_seat]][CALL_DENOM[self.last_bid]]
 
-        return None
+    def declarer(self) -> str:
+        seat = self.declarer_seat()
+        return SEATS[seat] if seat is not None else None
 
 class Trick:
-    RANKS = ['2','3','4','5','6','7','8','9','T','J','Q','K','A']
-    SEATS = ['N','E','S','W']
+    SEATS = SEATS
 
     def __init__(self, trump: str = None, leader: str = None):
         if leader and leader not in self.SEATS:
@@ -321,85 +433,284 @@ class Trick:
             
         self.trump = trump
         self.leader = leader
-        self.cards = []
+        self.trump_id = SUIT_ID[trump] if trump else -1
+        self.leader_id = SEAT_ID[leader] if leader else None
+        self.seat_ids = []
+        self.card_ids = []
+
+        # Running winner, updated as each card is added
+        self.lead_suit = None
+        self.winning_idx = None
+        self._winning_key = -1
+
+    @property
+    def cards(self):
+        """Cards played so far as a tuple of {'player', 'card'} dicts, built from seat_ids and card_ids.
+
+        Read-only: use add_card to play to the trick.
+        """
+        return tuple({'player': SEATS[p], 'card': CARDS[c]} for p, c in zip(self.seat_ids, self.card_ids))
+
+    def next_seat(self) -> int:
+        """Seat id of the player to play"""
+        if self.leader_id is None:
+            raise RuntimeError("No leader set for trick")
+        return (self.leader_id + len(self.card_ids)) % 4
 
     def next_player(self) -> str:
-        if not self.leader:
-            raise RuntimeError("No leader set for trick")
-        idx = self.SEATS.index(self.leader)
-        return self.SEATS[(idx + len(self.cards)) % 4]
+        return SEATS[self.next_seat()]
 
     def add_card(self, player: str, card: str, hands: dict) -> bool:
+        """Play a card from hands, a dict of card-string lists or BitboardHands.
+
+        BitboardHands go through check_card_id's mask checks. List hands
+        are checked against the list itself: for 13 strings, a membership
+        test and the off-suit scan are cheaper than building a mask per card.
+        """
+        self.check_card(player, card, hands)
+        seat, card_id = SEAT_ID[player], CARD_ID[card]
+        if isinstance(hands, BitboardHands):
+            hands.masks[seat] ^= CARD_BIT[card_id]
+        else:
+            hands[player].remove(card)
+        return self._append(seat, card_id)
+
+    def check_card(self, player: str, card: str, hands) -> None:
+        """Raise ValueError unless player may play card from hands now"""
         # Validate inputs
-        if player not in self.SEATS:
+        if player not in SEAT_ID:
             raise ValueError(f"Invalid player: {player}")
         if not isinstance(card, str) or len(card) != 2:
             raise ValueError(f"Invalid card format: {card}")
-        if card[0] not in ['C', 'D', 'H', 'S'] or card[1] not in self.RANKS:
+        if card not in CARD_ID:
             raise ValueError(f"Invalid card: {card}")
         if player not in hands:
             raise ValueError(f"No hand found for player {player}")
+        if isinstance(hands, BitboardHands):
+            seat = SEAT_ID[player]
+            self.check_card_id(seat, CARD_ID[card], hands.masks[seat])
+            return
         if not isinstance(hands[player], list):
             raise ValueError(f"Invalid hand format for player {player}")
 
-        expected = self.next_player()
-        if player != expected:
-            raise ValueError(f"It's {expected}'s turn, not {player}")
+        seat = SEAT_ID[player]
+        expected = self.next_seat()
+        if seat != expected:
+            raise ValueError(f"It's {SEATS[expected]}'s turn, not {player}")
 
-        if card not in hands[player]:
+        hand = hands[player]
+        if card not in hand:
             raise ValueError(f"Player {player} does not have {card}")
 
         # Check suit following
-        suit = card[0]
-        if self.cards:
-            lead_suit = self.cards[0]['card'][0]
-            player_has_lead_suit = any(c[0] == lead_suit for c in hands[player])
-            if player_has_lead_suit and suit != lead_suit:
-                raise ValueError(f"Must follow {lead_suit} suit")
+        if self.card_ids:
+            lead = CARD_SUIT[self.card_ids[0]]
+            if CARD_SUIT[CARD_ID[card]] != lead:
+                lead_suit = SUITS[lead]
+                if any(c[0] == lead_suit for c in hand):
+                    raise ValueError(f"Must follow {lead_suit} suit")
+
+    def add_card_id(self, seat: int, card: int, masks: list) -> bool:
+        """Play a card id for a seat id from bitboard masks indexed by seat id.
+
+        Membership, follow-suit and removal are mask operations.
+        """
+        mask = masks[seat]
+        self.check_card_id(seat, card, mask)
+        masks[seat] = mask ^ CARD_BIT[card]
+        return self._append(seat, card)
+
+    def check_card_id(self, seat: int, card: int, mask: int) -> None:
+        """Raise ValueError unless seat id may play card id from its hand mask now"""
+        expected = self.next_seat()
+        if seat != expected:
+            raise ValueError(f"It's {SEATS[expected]}'s turn, not {SEATS[seat]}")
+
+        if not mask & CARD_BIT[card]:
+            raise ValueError(f"Player {SEATS[seat]} does not have {CARDS[card]}")
 
-        hands[player].remove(card)
-        self.cards.append({'player': player, 'card': card})
-        return len(self.cards) == 4
+        # Check suit following
+        if self.card_ids:
+            lead = CARD_SUIT[self.card_ids[0]]
+            if CARD_SUIT[card] != lead and mask & SUIT_MASK[lead]:
+                raise ValueError(f"Must follow {SUITS[lead]} suit")
+
+    def _append(self, seat: int, card: int) -> bool:
+        suit = CARD_SUIT[card]
+        if self.lead_suit is None:
+            self.lead_suit = suit
+        if suit == self.trump_id:
+            key = 26 + CARD_RANK[card]  # Trump cards
+        elif suit == self.lead_suit:
+            key = 13 + CARD_RANK[card]  # Lead suit
+        else:
+            key = -1  # Other suits never win
+        if key > self._winning_key:
+            self.winning_idx = len(self.card_ids)
+            self._winning_key = key
+
+        self.seat_ids.append(seat)
+        self.card_ids.append(card)
+        return len(self.card_ids) == 4
+
+    def winner_seat(self) -> int:
+        """Seat id of the trick winner"""
+        if len(self.card_ids) != 4:
+            raise RuntimeError("Trick not complete")
+        return self.seat_ids[self.winning_idx]
 
     def winner(self) -> str:
-        if len(self.cards) != 4:
-            raise RuntimeError("Trick not complete")
-            
-        lead_suit = self.cards[0]['card'][0]
+        return SEATS[self.winner_seat()]
 
-        def card_score(entry):
-            suit, rank = entry['card'][0], entry['card'][1]
-            try:
-                rank_value = self.RANKS.index(rank)
-            except ValueError:
-                rank_value = 0
-                
-            if self.trump and suit == self.trump:
-                return (2, rank_value)  # Trump cards
-            elif suit == lead_suit:
-                return (1, rank_value)  # Lead suit
-            else:
-                return (0, rank_value)  # Other suits
+class PlayState:
+    """Play bookkeeping for one board.
+
+    Declaring side and trump are fixed when play starts and the trick
+    counts are updated as tricks complete, so the cost of each card does
+    not depend on how far into the board we are.
+    """
+    TRICKS_PER_BOARD = 13
+
+    def __init__(self, declarer: str, trump: str = None):
+        self.declarer = declarer
+        self.declarer_side = SEAT_SIDE[SEAT_ID[declarer]]
+        self.trump = trump
+        self.leader = SEATS[LHO[SEAT_ID[declarer]]]  # Left of declarer leads
+        self.completed_tricks = 0
+        self.declarer_tricks = 0
+        self.current_trick = Trick(trump=trump, leader=self.leader)
+        self.tricks = [self.current_trick]
 
-        winner_entry = max(self.cards, key=card_score)
-        return winner_entry['player']
+    def is_finished(self) -> bool:
+        return self.completed_tricks == self.TRICKS_PER_BOARD
+
+    def add_card(self, player: str, card: str, hands) -> bool:
+        """Play a card to the current trick, returns True if it completed the trick"""
+        if not self.current_trick.add_card(player, card, hands):
+            return False
+
+        winner = self.current_trick.winner_seat()
+        self.leader = SEATS[winner]
+        self.completed_tricks += 1
+        if SEAT_SIDE[winner] == self.declarer_side:
+            self.declarer_tricks += 1
+
+        # Start next trick
+        if not self.is_finished():
+            self.current_trick = Trick(trump=self.trump, leader=self.leader)
+            self.tricks.append(self.current_trick)
+        return True
+
+class BridgeProfile:
+    """Call counts and cumulative nanoseconds per action type and handler phase.
+
+    One profile can be passed to any number of Bridges, or profiles can be
+    merged afterwards. A Bridge without a profile runs none of this: the
+    hooks replace its methods on the instance only when one is given.
+    Phases are 'deal' (handle_deal_action), 'auction' (handle_auction_action),
+    'trick' (handle_play_action: removal, trick resolution and bookkeeping),
+    'validate' (legality checks: validate_action, Auction.is_valid_call_id
+    and Trick.check_card) and 'score' (scoring a played board). Phase time
+    is exclusive: a check run inside a handler counts under 'validate'
+    only, so the phases add up to the handlers' time.
+    """
+    def __init__(self):
+        self.actions = {}  # action name -> [calls, ns]
+        self.phases = {}   # phase name -> [calls, ns]
+        self._nested_ns = 0  # time spent in timed calls inside the current one
+
+    @staticmethod
+    def _add(counters, name, ns):
+        entry = counters.get(name)
+        if entry is None:
+            counters[name] = [1, ns]
+        else:
+            entry[0] += 1
+            entry[1] += ns
+
+    def timed(self, phase, func):
+        """Wrap func so each call is counted and timed under phase, less any timed calls inside it"""
+        phases, add, clock = self.phases, self._add, time.perf_counter_ns
+        def wrapper(*args, **kwargs):
+            outer = self._nested_ns
+            self._nested_ns = 0
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                add(phases, phase, elapsed - self._nested_ns)
+                self._nested_ns = outer + elapsed
+        return wrapper
+
+    def attach(self, bridge):
+        """Install the hooks on one Bridge instance"""
+        actions, add, clock = self.actions, self._add, time.perf_counter_ns
+        simulate = bridge.simulate
+        def profiled_simulate(action):
+            start = clock()
+            try:
+                simulate(action)
+            finally:
+                add(actions, action.get('name', '?') if isinstance(action, dict) else '?', clock() - start)
+        bridge.simulate = profiled_simulate
+        bridge.validate_action = self.timed('validate', bridge.validate_action)
+        bridge._score_board = self.timed('score', bridge._score_board)
+        bridge.handle_deal_action = self.timed('deal', bridge.handle_deal_action)
+        bridge.handle_auction_action = self.timed('auction', bridge.handle_auction_action)
+
+        # PlayState starts a new Trick every four cards; hook each one before its first card
+        handle_play_action = self.timed('trick', bridge.handle_play_action)
+        hooked = [None]
+        def profiled_play(action):
+            trick = bridge.play.current_trick if bridge.play is not None else None
+            if trick is not None and trick is not hooked[0]:
+                trick.check_card = self.timed('validate', trick.check_card)
+                hooked[0] = trick
+            handle_play_action(action)
+        bridge.handle_play_action = profiled_play
+
+    def attach_auction(self, auction):
+        """Hook an Auction's legality check; Bridge calls this as each auction starts"""
+        auction.is_valid_call_id = self.timed('validate', auction.is_valid_call_id)
+
+    def merge(self, other: 'BridgeProfile') -> 'BridgeProfile':
+        """Add another profile's counters into this one"""
+        for mine, theirs in ((self.actions, other.actions), (self.phases, other.phases)):
+            for name, (calls, ns) in theirs.items():
+                entry = mine.setdefault(name, [0, 0])
+                entry[0] += calls
+                entry[1] += ns
+        return self
+
+    def to_dict(self) -> dict:
+        return {kind: {name: {'calls': calls, 'ns': ns} for name, (calls, ns) in counters.items()}
+                for kind, counters in (('actions', self.actions), ('phases', self.phases))}
+
+    def report(self) -> str:
+        lines = []
+        for kind, counters in (('Action', self.actions), ('Phase', self.phases)):
+            for name, (calls, ns) in sorted(counters.items(), key=lambda item: -item[1][1]):
+                lines.append(f"{kind:6} {name:10} {calls:10,} calls {ns / 1e6:10.1f} ms {ns / calls:8.0f} ns/call")
+        return '\n'.join(lines)
 
 class Bridge:
-    SUITS = ['C', 'D', 'H', 'S']
-    RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-    SEATS = ['N', 'E', 'S', 'W']
+    SUITS = SUITS
+    SEATS = SEATS
     VALID_VULNERABILITY = ['None', 'NS', 'EW', 'All']
 
-    def __init__(self, actions=None):
-        self.cards = [s + r for s in self.SUITS for r in self.RANKS]
+    def __init__(self, actions=None, bitboard=False, profile=None):
+        self.cards = list(CARDS)
         self.actions = actions or []
-        self.hands = {'N': [], 'E': [], 'S': [], 'W': []}
+        self.bitboard = bitboard  # store hands as BitboardHands instead of lists
+        self.hands = BitboardHands() if bitboard else {'N': [], 'E': [], 'S': [], 'W': []}
         self.dealer = None
         self.game_index = 0
         self.current_phase = 'Setup'
         self.vulnerable = None
         self.current_trick = None
         self.auction = None
+        self.play = None
         
         # Game history
         self.dealers = []
@@ -412,6 +723,10 @@ class Bridge:
         self.results = []
         self.scores = []
 
+        self.profile = profile
+        if profile is not None:
+            profile.attach(self)
+
         # Initialize with default actions if none provided
         if not self.actions:
             self.actions = [
@@ -484,20 +799,24 @@ class Bridge:
                 raise ValueError("Dealer must be set before auction")
             self.current_phase = 'Auction'
             self.auction = Auction(self.dealer)
+            if self.profile is not None:
+                self.profile.attach_auction(self.auction)
 
         player = action['player']
         call = action['value']
         
-        if player not in self.SEATS:
+        seat = SEAT_ID.get(player)
+        if seat is None:
             raise ValueError(f"Invalid player: {player}")
-        if call not in VALID_AUCTION_ACTIONS:
+        call_id = CALL_ID.get(call)
+        if call_id is None:
             raise ValueError(f"Invalid auction call: {call}")
 
-        finished = self.auction.add_call(player, call)
+        finished = self.auction.add_call_id(seat, call_id)
         
         if finished:
             # Store auction results
-            self.auctions.append([c['call'] for c in self.auction.calls])
+            self.auctions.append([CALLS[c] for c in self.auction.call_ids])
             contract = self.auction.contract()
             self.contracts.append(contract)
             declarer = self.auction.declarer()
@@ -506,11 +825,11 @@ class Bridge:
             # Start play phase if there's a contract
             if contract['level'] > 0 and declarer:
                 self.current_phase = 'Play'
-                decl_idx = self.SEATS.index(declarer)
-                self.leader = self.SEATS[(decl_idx + 1) % 4]  # Left of declarer leads
                 trump = contract['denomination'] if contract['denomination'] != 'NT' else None
-                self.current_trick = Trick(trump=trump, leader=self.leader)
-                self.tricks = [self.current_trick]
+                self.play = PlayState(declarer, trump)
+                self.leader = self.play.leader
+                self.current_trick = self.play.current_trick
+                self.tricks = self.play.tricks
                 self.results.append(0)  # Tricks made by declaring side
             else:
                 # All pass - game over
@@ -518,23 +837,42 @@ class Bridge:
                 self.scores.append("NS 0")
 
     def handle_deal_action(self, action):
-        """Handle deal cards"""
-        if 'cards' not in action:
+        """Handle deal cards.
+
+        A PBN deal string in 'value' is parsed directly; otherwise the
+        per-card 'cards' list is used. Duplicates are caught with a single
+        seen-mask over the 52 cards.
+        """
+        value = action.get('value')
+        if 'cards' not in action and not isinstance(value, str):
             raise ValueError("Deal action must have 'cards' field")
             
         if self.current_phase != 'Setup':
             raise ValueError("Can only deal in setup phase")
 
-        cards = action['cards']
+        if isinstance(value, str):
+            masks = parse_pbn_deal(value)
+            lists = None
+        else:
+            masks, lists = self._deal_from_cards(action['cards'])
+
+        if self.bitboard:
+            self.hands = BitboardHands()
+            self.hands.masks = masks
+        else:
+            for seat_id, seat in enumerate(SEATS):
+                self.hands[seat] = lists[seat_id] if lists else mask_to_cards(masks[seat_id])
+
+        self.deals.append(action.get('cards', value))
+
+    def _deal_from_cards(self, cards):
+        """Validate a 52-entry card-dict list, returns (masks, card lists) indexed by seat id"""
         if not isinstance(cards, list) or len(cards) != 52:
             raise ValueError("Deal must contain exactly 52 cards")
 
-        # Clear existing hands
-        for seat in self.SEATS:
-            self.hands[seat] = []
-
-        # Distribute cards
-        seat_counts = {'N': 0, 'E': 0, 'S': 0, 'W': 0}
+        masks = [0, 0, 0, 0]
+        lists = [[], [], [], []]
+        seen = 0
         for card_info in cards:
             if not isinstance(card_info, dict):
                 raise ValueError("Each card must be a dictionary")
@@ -545,26 +883,30 @@ class Bridge:
             suit = card_info['suit']
             rank = card_info['rank']
             
-            if seat not in self.SEATS:
+            seat_id = SEAT_ID.get(seat)
+            if seat_id is None:
                 raise ValueError(f"Invalid seat: {seat}")
-            if suit not in self.SUITS:
+            suit_id = SUIT_ID.get(suit)
+            if suit_id is None:
                 raise ValueError(f"Invalid suit: {suit}")
-            if rank not in self.RANKS:
+            rank_id = RANK_ID.get(rank)
+            if rank_id is None:
                 raise ValueError(f"Invalid rank: {rank}")
                 
-            card = suit + rank
-            if card in [c for hand in self.hands.values() for c in hand]:
-                raise ValueError(f"Duplicate card: {card}")
-                
-            self.hands[seat].append(card)
-            seat_counts[seat] += 1
+            card_id = suit_id * 13 + rank_id
+            bit = CARD_BIT[card_id]
+            if seen & bit:
+                raise ValueError(f"Duplicate card: {CARDS[card_id]}")
+            seen |= bit
+            masks[seat_id] |= bit
+            lists[seat_id].append(CARDS[card_id])
 
         # Verify each player has exactly 13 cards
-        for seat, count in seat_counts.items():
-            if count != 13:
-                raise ValueError(f"Player {seat} has {count} cards, should have 13")
+        for seat_id, hand in enumerate(lists):
+            if len(hand) != 13:
+                raise ValueError(f"Player {SEATS[seat_id]} has {len(hand)} cards, should have 13")
 
-        self.deals.append(cards)
+        return masks, lists
 
     def handle_dealer_action(self, action):
         """Handle dealer selection"""
@@ -592,39 +934,33 @@ class Bridge:
         player = action['player']
         card = action['value']
         
-        if player not in self.SEATS:
+        if player not in SEAT_ID:
             raise ValueError(f"Invalid player: {player}")
 
-        trick_done = self.current_trick.add_card(player, card, self.hands)
+        play = self.play
+        trick_done = play.add_card(player, card, self.hands)
 
         if trick_done:
-            winner = self.current_trick.winner()
-            self.leader = winner
-            
-            # Update tricks won by declaring side
-            declaring_side = {'N', 'S'} if self.declarers[-1] in ('N', 'S') else {'E', 'W'}
-            if winner in declaring_side:
-                self.results[-1] += 1
+            self.leader = play.leader
+            self.results[-1] = play.declarer_tricks
+            self.current_trick = play.current_trick
 
             # Check if this was the last trick
-            if len([t for t in self.tricks if len(t.cards) == 4]) == 13:
-                # Calculate final score
-                contract = self.contracts[-1]
-                declarer = self.declarers[-1]
-                made = self.results[-1]
-                
-                if contract['level'] > 0:
-                    sc = ScoreCalculator(contract, declarer, made, self.vulnerable)
-                    self.scores.append(sc.pbn_score())
-                else:
-                    self.scores.append("NS 0")
-                    
+            if play.is_finished():
+                self.scores.append(self._score_board())
                 self.current_phase = 'Finished'
-            else:
-                # Start next trick
-                trump = self.contracts[-1]['denomination'] if self.contracts[-1]['denomination'] != 'NT' else None
-                self.current_trick = Trick(trump=trump, leader=self.leader)
-                self.tricks.append(self.current_trick)
+
+    def _score_board(self) -> str:
+        """PBN score of the board once its play is finished"""
+        contract = self.contracts[-1]
+        declarer = self.declarers[-1]
+        made = self.results[-1]
+        
+        if contract['level'] > 0:
+            pts = ns_score(contract['level'], contract['denomination'], contract['risk'],
+                           declarer, made, self.vulnerable)
+            return f"NS {pts}"
+        return "NS 0"
 
     def handle_vulnerable_action(self, action):
         """Handle vulnerability setting"""
@@ -645,7 +981,7 @@ class Bridge:
             'dealer': self.dealer,
             'vulnerable': self.vulnerable,
             'hands': {k: sorted(v) for k, v in self.hands.items()},
-            'auction_calls': [c['call'] for c in self.auction.calls] if self.auction else [],
+            'auction_calls': [CALLS[c] for c in self.auction.call_ids] if self.auction else [],
             'current_player': self.auction.current_player() if self.auction and self.current_phase == 'Auction' else None,
             'contract': self.contracts[-1] if self.contracts else None,
             'declarer': self.declarers[-1] if self.declarers else None,
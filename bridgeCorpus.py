@@ -0,0 +1,553 @@
+"""
+Compact memory-mapped binary corpus for parsed-games.
+
+Every board becomes one fixed-size record: the deal as its 12-byte index
+(bridgeDealIndex), seats and vulnerability packed into two bytes, the
+auction as call ids, the play as 52 card ids, declarer, contract, result
+and score, plus ids into a shared string table for the source file and
+the text tags (players, event, board, ...). Comments, directives and
+Note tags are not kept, and scores are stored from NS's side.
+
+CorpusReader maps the file and views the records as a NumPy structured
+array, so opening a corpus reads only the header and a board's fields
+are decoded when they are asked for. iter_games() yields the same game
+dicts as BridgeGameValidator.load_games_from_file, so the validator can
+read a corpus in place of the JSONL directory.
+
+Usage:
+    python bridgeCorpus.py [--data-dir=parsed-games] [--output=parsed-games.corpus] [--check]
+"""
+
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bridgeDealIndex import INDEX_BYTES, action_to_deal, decode_deals, encode_deals
+from bridgeDeals import deal_to_pbn, deals_to_pbn
+from bridgeEncoding import CALL_ID, CALLS, CARD_ID, CARDS, DENOM_ID, DENOMS, RISK_ID, RISKS, SEAT_ID, SEATS
+from bridgeStream import stream_games
+
+MAGIC = b'BRCORP\x00\x01'
+HEADER = struct.Struct('<8sIIQQQ')  # magic, record size, string count, record count, records offset, strings offset
+VULNERABILITIES = ['None', 'NS', 'EW', 'All']
+STRING_TAGS = ['Event', 'Site', 'Date', 'Board', 'Room', 'Scoring', 'North', 'East', 'South', 'West',
+               'HomeTeam', 'VisitTeam']
+AUCTION_BYTES = 48
+ALL_PASS = len(CALLS)  # the PBN 'AP' token
+NOTE_BASE = 64  # '=n=' note references are NOTE_BASE + n
+EMPTY = 255  # end of auction or play, missing seat or contract
+UNPLAYED = 254  # '-' in the play section
+NO_STRING = 0xFFFFFFFF
+NO_SCORE = -32768
+BATCH_SIZE = 4096  # boards whose deals are decoded together by the iterators
+PASS_CONTRACT = 0
+
+# Bits of the 'flags' byte; the low two bits are the vulnerability
+HAS_VULNERABLE, HAS_DEALER, HAS_DEAL, HAS_AUCTION, HAS_PLAY = (1 << i for i in range(2, 7))
+
+RECORD = np.dtype([
+    ('deal', np.uint8, INDEX_BYTES),
+    ('file', np.uint32),
+    ('game', np.uint32),
+    ('seats', np.uint8),  # dealer, first hand of the Deal tag, first caller, opening leader: 2 bits each
+    ('flags', np.uint8),
+    ('declarer', np.uint8),
+    ('contract', np.uint8),  # 0 pass, else 1 + ((level - 1) * 5 + strain) * 3 + risk
+    ('result', np.int8),  # -1 when not recorded
+    ('score', np.int16),  # NS score, NO_SCORE when not recorded
+    ('auction', np.uint8, AUCTION_BYTES),
+    ('play', np.uint8, 52),
+    ('tags', np.uint32, len(STRING_TAGS)),
+])
+
+
+def _encode_contract(tag: Dict) -> int:
+    value = tag.get('value', '')
+    if value == 'Pass':
+        return PASS_CONTRACT
+    if not value:
+        return EMPTY
+    level = int(value[0])
+    risk = value[len(value.rstrip('X')):]
+    strain = value[1:len(value) - len(risk)]
+    if not 1 <= level <= 7 or strain not in DENOM_ID or risk not in RISK_ID:
+        raise ValueError(f"Invalid contract: {value}")
+    return 1 + ((level - 1) * len(DENOMS) + DENOM_ID[strain]) * len(RISKS) + RISK_ID[risk]
+
+
+def _decode_contract(code: int) -> Optional[Dict]:
+    if code == EMPTY:
+        return None
+    if code == PASS_CONTRACT:
+        return {'type': 'tag', 'name': 'Contract', 'value': 'Pass', 'level': 0, 'risk': ''}
+    rest, risk = divmod(code - 1, len(RISKS))
+    level, strain = divmod(rest, len(DENOMS))
+    value = f"{level + 1}{DENOMS[strain]}{RISKS[risk]}"
+    return {'type': 'tag', 'name': 'Contract', 'value': value, 'level': level + 1,
+            'denomination': DENOMS[strain], 'risk': RISKS[risk]}
+
+
+def _encode_auction(tokens: List[str]) -> List[int]:
+    codes = []
+    for token in tokens:
+        if token in CALL_ID:
+            codes.append(CALL_ID[token])
+        elif token == 'AP':
+            codes.append(ALL_PASS)
+        elif token.startswith('=') and token.endswith('=') and token[1:-1].isdigit() \
+                and 0 < int(token[1:-1]) < EMPTY - NOTE_BASE - 1:
+            codes.append(NOTE_BASE + int(token[1:-1]))
+        else:
+            raise ValueError(f"Invalid auction token: {token}")
+    if len(codes) > AUCTION_BYTES:
+        raise ValueError(f"Auction has {len(codes)} tokens, at most {AUCTION_BYTES} fit in a record")
+    return codes
+
+
+def _decode_auction(codes: np.ndarray) -> List[str]:
+    tokens = []
+    for code in codes.tolist():
+        if code == EMPTY:
+            break
+        if code < len(CALLS):
+            tokens.append(CALLS[code])
+        elif code == ALL_PASS:
+            tokens.append('AP')
+        else:
+            tokens.append(f"={code - NOTE_BASE}=")
+    return tokens
+
+
+def _encode_play(tokens: List[str]) -> List[int]:
+    codes = []
+    for token in tokens:
+        if token == '*':
+            break
+        if token == '-':
+            codes.append(UNPLAYED)
+        elif token in CARD_ID:
+            codes.append(CARD_ID[token])
+        else:
+            raise ValueError(f"Invalid play token: {token}")
+    if len(codes) > 52:
+        raise ValueError(f"Play has {len(codes)} cards, at most 52 fit in a record")
+    return codes
+
+
+def _decode_play(codes: np.ndarray) -> List[str]:
+    tokens = []
+    for code in codes.tolist():
+        if code == EMPTY:
+            break
+        tokens.append('-' if code == UNPLAYED else CARDS[code])
+    return tokens + ['*']
+
+
+def _encode_score(value: str) -> int:
+    if not value:
+        return NO_SCORE
+    side, _, points = value.partition(' ')
+    try:
+        score = int(points)
+    except ValueError:
+        raise ValueError(f"Invalid score: {value}")
+    if side not in ('NS', 'EW'):
+        raise ValueError(f"Invalid score: {value}")
+    return score if side == 'NS' else -score
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        if text not in self.ids:
+            self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return self.ids[text]
+
+
+def _encode_game(game: Dict[str, Dict], record: np.void, strings: _StringTable):
+    """Fill one record from a game's tags"""
+    seats = flags = 0
+    if 'Vulnerable' in game:
+        value = game['Vulnerable']['value']
+        if value not in VULNERABILITIES:
+            raise ValueError(f"Invalid vulnerability: {value}")
+        flags |= HAS_VULNERABLE | VULNERABILITIES.index(value)
+    if 'Dealer' in game:
+        seats |= SEAT_ID[game['Dealer']['value']]
+        flags |= HAS_DEALER
+    if 'Deal' in game:
+        value = game['Deal']['value']
+        record['deal'] = encode_deals(action_to_deal(game['Deal'])[None, :])[0]
+        seats |= SEAT_ID[value[0]] << 2
+        flags |= HAS_DEAL
+    record['auction'] = EMPTY
+    if 'Auction' in game:
+        codes = _encode_auction(game['Auction']['tokens'])
+        record['auction'][:len(codes)] = codes
+        seats |= SEAT_ID[game['Auction']['value']] << 4
+        flags |= HAS_AUCTION
+    record['play'] = EMPTY
+    if 'Play' in game:
+        codes = _encode_play(game['Play']['tokens'])
+        record['play'][:len(codes)] = codes
+        seats |= SEAT_ID[game['Play']['value']] << 6
+        flags |= HAS_PLAY
+    record['seats'] = seats
+    record['flags'] = flags
+    record['declarer'] = SEAT_ID.get(game.get('Declarer', {}).get('value', ''), EMPTY)
+    record['contract'] = _encode_contract(game['Contract']) if 'Contract' in game else EMPTY
+    result = game.get('Result', {}).get('value', '')
+    record['result'] = int(result) if result else -1
+    record['score'] = _encode_score(game.get('Score', {}).get('value', ''))
+    record['tags'] = [strings.add(game[name]['value'] if name in game else None) for name in STRING_TAGS]
+
+
+def convert_corpus(data_dir: str, output: str) -> int:
+    """Write every game of a parsed-games directory to a binary corpus, returns the number of games"""
+    strings = _StringTable()
+    files = sorted(Path(data_dir).glob('*.jsonl'))
+    chunks = []
+    for filepath in files:
+        games = list(stream_games(filepath))
+        records = np.zeros(len(games), dtype=RECORD)
+        file_id = strings.add(filepath.name)
+        for index, game in enumerate(games):
+            try:
+                records[index]['file'] = file_id
+                records[index]['game'] = index
+                _encode_game(game, records[index], strings)
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{filepath.name} game {index}: {e}")
+        chunks.append(records)
+    records = np.concatenate(chunks) if chunks else np.zeros(0, dtype=RECORD)
+
+    encoded = [s.encode('utf-8') for s in strings.strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(s) for s in encoded])
+    records_offset = HEADER.size
+    strings_offset = records_offset + records.nbytes
+    with open(output, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, RECORD.itemsize, len(encoded), len(records), records_offset, strings_offset))
+        file.write(records.tobytes())
+        file.write(offsets.tobytes())
+        file.write(b''.join(encoded))
+    return len(records)
+
+
+class BoardView:
+    """One board of a CorpusReader; fields are decoded from the mapped record on access"""
+    __slots__ = ('reader', 'index', 'record')
+
+    def __init__(self, reader: 'CorpusReader', index: int):
+        self.reader = reader
+        self.index = index
+        self.record = reader.records[index]
+
+    def _has(self, flag: int) -> bool:
+        return bool(self.record['flags'] & flag)
+
+    def _seat(self, shift: int) -> str:
+        return SEATS[(int(self.record['seats']) >> shift) & 3]
+
+    @property
+    def file(self) -> str:
+        return self.reader.string(int(self.record['file']))
+
+    @property
+    def game(self) -> int:
+        return int(self.record['game'])
+
+    @property
+    def vulnerable(self) -> Optional[str]:
+        return VULNERABILITIES[self.record['flags'] & 3] if self._has(HAS_VULNERABLE) else None
+
+    @property
+    def dealer(self) -> Optional[str]:
+        return self._seat(0) if self._has(HAS_DEALER) else None
+
+    @property
+    def deal(self) -> Optional[np.ndarray]:
+        """(52,) seat array"""
+        return decode_deals(self.record['deal'][None, :])[0] if self._has(HAS_DEAL) else None
+
+    @property
+    def auction(self) -> Optional[List[str]]:
+        return _decode_auction(self.record['auction']) if self._has(HAS_AUCTION) else None
+
+    @property
+    def play(self) -> Optional[List[str]]:
+        return _decode_play(self.record['play']) if self._has(HAS_PLAY) else None
+
+    @property
+    def declarer(self) -> str:
+        code = int(self.record['declarer'])
+        return '' if code == EMPTY else SEATS[code]
+
+    @property
+    def contract(self) -> str:
+        tag = _decode_contract(int(self.record['contract']))
+        return tag['value'] if tag else ''
+
+    @property
+    def result(self) -> Optional[int]:
+        result = int(self.record['result'])
+        return None if result < 0 else result
+
+    @property
+    def score(self) -> Optional[int]:
+        """NS score"""
+        score = int(self.record['score'])
+        return None if score == NO_SCORE else score
+
+    @property
+    def pbn(self) -> Optional[str]:
+        """PBN deal string, listed from the same seat as the source Deal tag"""
+        return deal_to_pbn(self.deal, self._seat(2)) if self._has(HAS_DEAL) else None
+
+    def tag(self, name: str) -> Optional[str]:
+        return self.reader.string(int(self.record['tags'][STRING_TAGS.index(name)]))
+
+    def to_game(self, pbn: Optional[str] = None) -> Dict[str, Dict]:
+        """The board as {tag name: tag object}, like BridgeGameValidator.load_games_from_file.
+
+        pbn is the deal string when the caller has already decoded it.
+        """
+        game = {}
+
+        def tag(name, value, **extra):
+            game[name] = {'type': 'tag', 'name': name, 'value': value, **extra}
+
+        for name in STRING_TAGS:
+            value = self.tag(name)
+            if value is not None:
+                tag(name, value)
+        if self._has(HAS_VULNERABLE):
+            tag('Vulnerable', self.vulnerable)
+        if self._has(HAS_DEALER):
+            tag('Dealer', self.dealer)
+        if self._has(HAS_DEAL):
+            tag('Deal', pbn or self.pbn)
+        if self._has(HAS_AUCTION):
+            tag('Auction', self._seat(4), tokens=self.auction)
+        if self._has(HAS_PLAY):
+            tag('Play', self._seat(6), tokens=self.play)
+        tag('Declarer', self.declarer)
+        contract = _decode_contract(int(self.record['contract']))
+        if contract:
+            game['Contract'] = contract
+        result = self.result
+        tag('Result', '' if result is None else str(result))
+        score = self.score
+        tag('Score', '' if score is None else f"NS {score}")
+        return game
+
+
+class CorpusReader:
+    """Memory-mapped binary corpus; records are a zero-copy structured array"""
+
+    def __init__(self, filepath: str):
+        self.path = Path(filepath)
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty corpus file: {filepath}")
+        magic, record_size, string_count, count, records_offset, strings_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or record_size != RECORD.itemsize:
+            self.close()
+            raise ValueError(f"Not a binary corpus (or an incompatible version): {filepath}")
+        self.records = np.frombuffer(self._map, dtype=RECORD, count=count, offset=records_offset)
+        self._offsets = np.frombuffer(self._map, dtype=np.uint64, count=string_count + 1, offset=strings_offset)
+        self._blob = strings_offset + self._offsets.nbytes
+        self._strings = {}
+
+    def close(self):
+        self.records = self._offsets = None
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> BoardView:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return BoardView(self, index % len(self))
+
+    def __iter__(self) -> Iterator[BoardView]:
+        return (BoardView(self, i) for i in range(len(self)))
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NO_STRING:
+            return None
+        text = self._strings.get(string_id)
+        if text is None:
+            start = self._blob + int(self._offsets[string_id])
+            end = self._blob + int(self._offsets[string_id + 1])
+            text = self._strings[string_id] = self._map[start:end].decode('utf-8')
+        return text
+
+    def deals(self) -> np.ndarray:
+        """(n, 52) seat arrays for every board with a deal, in record order"""
+        has_deal = (self.records['flags'] & HAS_DEAL) != 0
+        return decode_deals(self.records['deal'][has_deal])
+
+    def files(self) -> List[str]:
+        """Source file names in record order"""
+        ids = self.records['file']
+        first = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else []
+        return [self.string(int(ids[i])) for i in first]
+
+    def _pbn_batches(self, first: int = 0, last: Optional[int] = None) -> Iterator[Tuple[int, List[Optional[str]]]]:
+        """Yield (first index, PBN deal strings) for every BATCH_SIZE records from first up to last"""
+        last = len(self) if last is None else min(last, len(self))
+        for start in range(first, last, BATCH_SIZE):
+            records = self.records[start:min(start + BATCH_SIZE, last)]
+            has_deal = (records['flags'] & HAS_DEAL) != 0
+            first = (records['seats'][has_deal] >> 2) & 3
+            strings = iter(deals_to_pbn(decode_deals(records['deal'][has_deal]), first))
+            yield start, [next(strings) if has else None for has in has_deal]
+
+    def iter_games(self, file_filter: Optional[str] = None, first: int = 0,
+                   last: Optional[int] = None) -> Iterator[Tuple[str, int, Dict]]:
+        """Yield (file name, game index, game dict) for every board, or records first up to last"""
+        for start, pbns in self._pbn_batches(first, last):
+            for offset, pbn in enumerate(pbns):
+                board = BoardView(self, start + offset)
+                name = board.file
+                if file_filter and file_filter not in name:
+                    continue
+                yield name, board.game, board.to_game(pbn)
+
+    def iter_deal_records(self) -> Iterator[Dict]:
+        """Yield {'file', 'game', 'board', 'deal'} like bridgeStream.iter_corpus_deals"""
+        for start, pbns in self._pbn_batches():
+            for offset, pbn in enumerate(pbns):
+                if pbn is not None:
+                    board = BoardView(self, start + offset)
+                    yield {'file': board.file, 'game': board.game, 'board': board.tag('Board') or '', 'deal': pbn}
+
+
+def check_corpus(data_dir: str, reader: CorpusReader) -> int:
+    """Compare every board with its JSONL source, returns the number of mismatched tags"""
+    mismatches = 0
+    games = reader.iter_games()
+    for filepath in sorted(Path(data_dir).glob('*.jsonl')):
+        for index, source in enumerate(stream_games(filepath)):
+            name, game_index, game = next(games)
+            for tag_name, tag in game.items():
+                original = source.get(tag_name, {})
+                fields = ['value'] + (['tokens'] if 'tokens' in tag else [])
+                if name != filepath.name or game_index != index or \
+                        any(tag[f] != original.get(f) for f in fields):
+                    mismatches += 1
+                    print(f"Mismatch in {filepath.name} game {index}: {tag_name}")
+    return mismatches
+
+
+def verify_corpus_codecs():
+    """Check every field codec and a two-board corpus round trip, raises ValueError on mismatch"""
+    contracts = ['Pass'] + [f"{level}{strain}{risk}" for level in range(1, 8) for strain in DENOMS for risk in RISKS]
+    codes = [_encode_contract({'value': value}) for value in contracts]
+    if sorted(set(codes)) != list(range(len(contracts))) or max(codes) >= UNPLAYED:
+        raise ValueError("Contract codes are not distinct and dense")
+    for value, code in zip(contracts, codes):
+        if _decode_contract(code)['value'] != value:
+            raise ValueError(f"Contract {value} decodes to {_decode_contract(code)['value']}")
+    if _encode_contract({'value': ''}) != EMPTY or _decode_contract(EMPTY) is not None:
+        raise ValueError("A missing contract does not round-trip")
+
+    auction = CALLS + ['AP', '=1=', f"={EMPTY - NOTE_BASE - 2}="]
+    for start in range(0, len(auction), AUCTION_BYTES):
+        tokens = auction[start:start + AUCTION_BYTES]
+        decoded = _decode_auction(np.array(_encode_auction(tokens) + [EMPTY], dtype=np.uint8))
+        if decoded != tokens:
+            raise ValueError(f"Auction {tokens} decodes to {decoded}")
+    play = CARDS[:51] + ['-']
+    if _decode_play(np.array(_encode_play(play + ['*']), dtype=np.uint8)) != play + ['*']:
+        raise ValueError("Play tokens do not round-trip")
+    if [_encode_score(value) for value in ('NS 620', 'EW 1430', 'NS 0', '')] != [620, -1430, 0, NO_SCORE]:
+        raise ValueError("Scores do not encode from NS's side")
+    for encode, bad in ((_encode_contract, {'value': '8S'}), (_encode_auction, ['=0=']),
+                        (_encode_auction, [f"={EMPTY - NOTE_BASE - 1}="]), (_encode_play, ['S1']),
+                        (_encode_score, 'XX 100')):
+        try:
+            encode(bad)
+        except ValueError:
+            continue
+        raise ValueError(f"{encode.__name__} accepted {bad}")
+
+    # A played board and a passed-out one through convert_corpus and back
+    def tag(name, value, **extra):
+        return {'type': 'tag', 'name': name, 'value': value, **extra}
+
+    deal = tag('Deal', "N:T983.743.A9.K964 Q752.AT82.QJT7.5 4.KQJ9.K8652.Q87 AKJ6.65.43.AJT32")
+    lines = [{'type': 'game'}, tag('Board', '1'), tag('North', 'UPMARK'), tag('Vulnerable', 'None'),
+             tag('Dealer', 'N'), deal, tag('Declarer', 'W'), tag('Contract', '4S'), tag('Result', '9'),
+             tag('Score', 'NS 50'), tag('Auction', 'N', tokens=['Pass', 'Pass', '1D', '1S', '=1=', 'AP']),
+             tag('Play', 'N', tokens=['H3', 'H2', 'H9', 'H6', 'H4', '-', '*']),
+             {'type': 'game'}, tag('Board', '2'), tag('Vulnerable', 'All'), tag('Dealer', 'E'), deal,
+             tag('Declarer', ''), tag('Contract', 'Pass'), tag('Result', ''), tag('Score', '')]
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = Path(data_dir) / 'check.jsonl'
+        path.write_text(''.join(json.dumps(line) + '\n' for line in lines), encoding='utf-8')
+        if convert_corpus(data_dir, str(path.with_suffix('.corpus'))) != 2:
+            raise ValueError("Two-board corpus does not hold 2 boards")
+        with CorpusReader(str(path.with_suffix('.corpus'))) as reader:
+            mismatches = check_corpus(data_dir, reader)
+            north = reader[0].tag('North'), reader[1].tag('North')
+    if mismatches or north != ('UPMARK', None):
+        raise ValueError(f"Two-board corpus read back with {mismatches} mismatched tags, North {north}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert parsed-games to a memory-mapped binary corpus')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--output', default='parsed-games.corpus', help='Binary corpus file to write')
+    parser.add_argument('--check', action='store_true', help='Read the corpus back and compare with the JSONL')
+    args = parser.parse_args()
+
+    if not Path(args.data_dir).exists():
+        print(f"Data directory not found: {args.data_dir}")
+        sys.exit(1)
+    try:
+        start = time.perf_counter()
+        count = convert_corpus(args.data_dir, args.output)
+        elapsed = time.perf_counter() - start
+    except ValueError as e:
+        print(f"Conversion failed: {e}")
+        sys.exit(1)
+    size = Path(args.output).stat().st_size
+    print(f"Wrote {count} games to {args.output} ({size} bytes) in {elapsed:.2f} s")
+
+    if args.check:
+        with CorpusReader(args.output) as reader:
+            if check_corpus(args.data_dir, reader):
+                sys.exit(1)
+        print("All boards match their JSONL source")
+
+
+if __name__ == '__main__':
+    main()
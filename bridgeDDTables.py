@@ -0,0 +1,152 @@
+"""
+Double-dummy trick tables for a whole corpus, solved in parallel.
+
+Deals are read lazily from the Deal tags of parsed-games (or from a file
+of PBN deal strings, one per line), fanned out to a ProcessPoolExecutor
+and written back as JSONL in input order while later deals are still
+being solved. Only a bounded number of deals is in flight at once, so a
+million-board input streams through in constant memory.
+
+A table is 20 full-deal solves. With the native DDS backend (see
+bridgeDoubleDummy) that is about 0.5 s per deal per core, so a million
+boards take roughly 140 core-hours. Without endplay installed (see
+requirements.txt) the pure-Python search takes minutes per deal, and the
+CLI says so before it starts.
+
+Usage:
+    python bridgeDDTables.py [--data-dir=parsed-games] [--corpus=FILE] [--deals=FILE] [--jobs=N] [--output=FILE]
+                             [--limit=N]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from bridgeCorpus import CorpusReader
+from bridgeDoubleDummy import HAVE_NATIVE, dd_table
+from bridgeEncoding import DENOMS, SEATS, parse_pbn_deal
+from bridgeStream import iter_corpus_deals
+
+
+def iter_deal_file(filepath: str) -> Iterator[Dict]:
+    """Yield {'line', 'deal'} for every PBN deal string in a text file"""
+    with open(filepath, 'r', encoding='utf-8') as file:
+        for number, line in enumerate(file, 1):
+            deal = line.strip()
+            if deal:
+                yield {'line': number, 'deal': deal}
+
+
+def solve_record(record: Dict) -> Dict:
+    """Add the DD table to one deal record, as {strain: {declarer: tricks}}"""
+    try:
+        table = dd_table(parse_pbn_deal(record['deal']))
+    except ValueError as e:
+        return {**record, 'error': str(e)}
+    return {**record, 'dd': {denom: dict(zip(SEATS, row)) for denom, row in zip(DENOMS, table)}}
+
+
+def solve_records(records: Iterable[Dict], jobs: Optional[int] = None) -> Iterator[Dict]:
+    """Solve deal records on a process pool, yielding results in input order.
+
+    At most a few deals per worker are queued at a time, so results start
+    streaming immediately and memory stays flat however long the input is.
+    jobs=1 solves in this process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        yield from map(solve_record, records)
+        return
+
+    records = iter(records)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque(pool.submit(solve_record, r) for r in islice(records, 2 * jobs))
+        while pending:
+            result = pending.popleft().result()
+            record = next(records, None)
+            if record is not None:
+                pending.append(pool.submit(solve_record, record))
+            yield result
+
+
+def write_tables(records: Iterable[Dict], output: Optional[str] = None, jobs: Optional[int] = None,
+                 limit: Optional[int] = None):
+    """Solve records and write one JSONL line per deal to output (default: stdout)"""
+    if limit is not None:
+        records = islice(records, limit)
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    start = time.perf_counter()
+    solved = errors = 0
+    try:
+        for result in solve_records(records, jobs):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            solved += 1
+            errors += 'error' in result
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"Solved {solved} deals ({errors} invalid) in {elapsed:.1f} s", file=sys.stderr)
+
+
+def verify_dd_tables():
+    """Check records for a deal with a known table and an invalid deal, raises ValueError on mismatch"""
+    from bridgePar import table_from_dict
+
+    # Each seat holds one whole suit: the side owning trumps ruffs every lead, and nobody makes NT
+    solid = 'N:AKQJT98765432... .AKQJT98765432.. ..AKQJT98765432. ...AKQJT98765432'
+    records = [{'line': 1, 'deal': solid}, {'line': 2, 'deal': solid[:-1]}]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # solved by quick tricks even without endplay
+        results = [json.loads(json.dumps(result)) for result in solve_records(records, jobs=1)]
+
+    expected = [[0, 13, 0, 13], [13, 0, 13, 0], [0, 13, 0, 13], [13, 0, 13, 0], [0, 0, 0, 0]]
+    if [r['line'] for r in results] != [1, 2] or 'dd' not in results[0] or 'error' not in results[1]:
+        raise ValueError(f"Unexpected records: {results}")
+    if table_from_dict(results[0]['dd']) != expected:
+        raise ValueError(f"Solid-suits table {table_from_dict(results[0]['dd'])} != {expected}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute double-dummy tables for every deal in a corpus')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--corpus', help='Binary corpus (bridgeCorpus output) to read instead of --data-dir')
+    parser.add_argument('--deals', help='Text file of PBN deal strings, one per line (instead of --data-dir)')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--output', help='JSONL output file (default: stdout)')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after this many deals')
+    args = parser.parse_args()
+
+    if not HAVE_NATIVE:
+        print("Warning: endplay is not installed, each deal will take minutes to solve (pip install endplay)",
+              file=sys.stderr)
+    if args.deals:
+        if not Path(args.deals).exists():
+            print(f"Deal file not found: {args.deals}")
+            sys.exit(1)
+        write_tables(iter_deal_file(args.deals), args.output, args.jobs, args.limit)
+    elif args.corpus:
+        if not Path(args.corpus).exists():
+            print(f"Corpus file not found: {args.corpus}")
+            sys.exit(1)
+        with CorpusReader(args.corpus) as reader:
+            write_tables(reader.iter_deal_records(), args.output, args.jobs, args.limit)
+    else:
+        if not Path(args.data_dir).exists():
+            print(f"Data directory not found: {args.data_dir}")
+            sys.exit(1)
+        write_tables(iter_corpus_deals(args.data_dir), args.output, args.jobs, args.limit)
+
+
+if __name__ == '__main__':
+    main()
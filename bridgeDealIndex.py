@@ -0,0 +1,313 @@
+"""
+Deal numbering: every deal maps to a unique index below 52!/(13!)^4.
+
+The index is mixed radix over the hands dealt in turn: North's 13 cards
+are ranked among all 52 with the combinatorial number system, East's
+among the 39 North does not hold and South's among the last 26 (West
+gets what is left), so
+
+    index = (north * C(39, 13) + east) * C(26, 13) + south
+
+which is less than 2^96 and is stored as 12 big-endian bytes. The batch
+functions work on (n, 52) seat arrays from bridgeDeals and (n, 12) uint8
+arrays, doing the 96-bit arithmetic in 24-bit limbs so that nothing
+leaves NumPy.
+
+Encoding packs each hand into 7 bytes and ranks it a byte at a time from
+a table of binomial sums, after squeezing out the cards earlier hands
+hold with a byte-wise bit-extract table. Decoding still unranks a card
+at a time with searchsorted on the binomial columns and is the slower
+half: on one core about 0.8M deals/s encode and 0.35M/s decode.
+
+Usage:
+    python bridgeDealIndex.py [--count=1000000] [--seed=0]
+"""
+
+import sys
+import time
+import argparse
+from math import comb, factorial
+from typing import Dict
+
+import numpy as np
+
+from bridgeDeals import generate_deals, masks_to_deals, validate_deal
+from bridgeEncoding import CARD_BIT, CARD_ID, CARD_SUIT, SEAT_ID, parse_pbn_deal
+
+DEAL_COUNT = factorial(52) // factorial(13) ** 4
+INDEX_BYTES = 12
+HAND_COUNTS = (comb(52, 13), comb(39, 13), comb(26, 13))
+BINOM = np.array([[comb(n, k) for k in range(14)] for n in range(53)], dtype=np.int64)
+BINOM_BY_K = BINOM.T.copy()
+LIMB_BITS = 24
+LIMB_MASK = np.uint64((1 << LIMB_BITS) - 1)
+HAND_BYTES = 7
+
+
+def _byte_tables():
+    """BYTE_POP, BYTE_RANK and BYTE_EXTRACT, see below"""
+    byte = np.arange(256)
+    pop = np.zeros(256, dtype=np.int64)
+    for bit in range(8):
+        pop += byte >> bit & 1
+    rank = np.zeros((HAND_BYTES, 14, 256), dtype=np.int64)
+    for i in range(HAND_BYTES):
+        for below in range(14):
+            taken = np.full(256, below)
+            for bit in range(min(8, 52 - 8 * i)):
+                held = byte >> bit & 1
+                taken = taken + held
+                rank[i, below] += held * np.where(taken <= 13, BINOM[8 * i + bit, np.minimum(taken, 13)], 0)
+    extract = np.zeros((256, 256), dtype=np.uint8)
+    for free in range(256):
+        for j, bit in enumerate(b for b in range(8) if free >> b & 1):
+            extract[free] |= ((byte >> bit & 1) << j).astype(np.uint8)
+    return pop, rank.reshape(-1), extract.reshape(-1)
+
+
+# BYTE_POP[b]: cards in byte b. BYTE_RANK[(i * 14 + k) * 256 + b]: what byte i of a hand adds to
+# its combinatorial rank when it holds b and k of the hand's cards lie below it.
+# BYTE_EXTRACT[f * 256 + b]: the bits of b at the set bits of f, packed low.
+BYTE_POP, BYTE_RANK, BYTE_EXTRACT = _byte_tables()
+
+
+def _count_below(cards: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """For each card, how many of others (any order) are lower"""
+    counts = np.zeros(cards.shape, dtype=np.int8)
+    for i in range(others.shape[1]):
+        counts += others[:, i, None] < cards
+    return counts
+
+
+def _hand_bytes(deals: np.ndarray) -> list:
+    """(n, 7) little-endian bytes of the N, E and S 52-bit card masks"""
+    n = len(deals)
+    padded = np.full((n, 8 * HAND_BYTES), 255, dtype=np.uint8)
+    padded[:, :52] = deals
+    hands = []
+    for seat in range(4):
+        held = padded == seat
+        if np.any(held.sum(axis=1, dtype=np.int8) != 13):
+            raise ValueError("Every seat must hold 13 cards")
+        if seat < 3:
+            hands.append(np.packbits(held.reshape(-1), bitorder='little').reshape(n, HAND_BYTES))
+    return hands
+
+
+def _rank_bytes(hand: np.ndarray) -> np.ndarray:
+    """(n, m) little-endian bytes of 13-card masks to their combinatorial ranks"""
+    below = np.zeros(len(hand), dtype=np.int64)
+    rank = np.zeros(len(hand), dtype=np.int64)
+    for i in range(hand.shape[1]):
+        byte = hand[:, i].astype(np.int64)
+        rank += BYTE_RANK[(i * 14 + below) * 256 + byte]
+        below += BYTE_POP[byte]
+    return rank
+
+
+def _extract_bytes(hand: np.ndarray, free: np.ndarray, size: int) -> np.ndarray:
+    """The bits of hand at the set bits of free, packed low, as (n, size) bytes"""
+    packed = np.zeros(len(hand), dtype=np.uint64)
+    shift = np.zeros(len(hand), dtype=np.uint64)
+    for i in range(hand.shape[1]):
+        f = free[:, i].astype(np.int64)
+        packed |= BYTE_EXTRACT[f * 256 + hand[:, i]].astype(np.uint64) << shift
+        shift += BYTE_POP[f].astype(np.uint64)
+    shifts = np.arange(size, dtype=np.uint64) * np.uint64(8)
+    return ((packed[:, None] >> shifts) & np.uint64(0xFF)).astype(np.uint8)
+
+
+def _subset_ranks(deals: np.ndarray) -> np.ndarray:
+    """(n, 3) combinatorial ranks of the N, E and S hands among the cards still undealt"""
+    north, east, south = _hand_bytes(deals)
+    free = ~north  # every seat holds 13 cards, so the free cards are E, S and W's
+    east_rank = _rank_bytes(_extract_bytes(east, free, 5))
+    south_rank = _rank_bytes(_extract_bytes(south, free & ~east, 4))
+    return np.stack([_rank_bytes(north), east_rank, south_rank], axis=1)
+
+
+def _mul_add(limbs: np.ndarray, factor: int, addend: np.ndarray):
+    """limbs = limbs * factor + addend, in place"""
+    carry = addend.astype(np.uint64)
+    factor = np.uint64(factor)
+    for j in range(limbs.shape[1]):
+        t = limbs[:, j] * factor + carry
+        limbs[:, j] = t & LIMB_MASK
+        carry = t >> np.uint64(LIMB_BITS)
+
+
+def _div_mod(limbs: np.ndarray, divisor: int) -> np.ndarray:
+    """limbs //= divisor in place, returns the remainders"""
+    rem = np.zeros(len(limbs), dtype=np.uint64)
+    divisor = np.uint64(divisor)
+    for j in reversed(range(limbs.shape[1])):
+        t = (rem << np.uint64(LIMB_BITS)) | limbs[:, j]
+        limbs[:, j] = t // divisor
+        rem = t % divisor
+    return rem
+
+
+def encode_deals(deals: np.ndarray) -> np.ndarray:
+    """(n, 52) seat arrays to (n, 12) uint8 big-endian deal indexes"""
+    deals = np.asarray(deals)
+    if deals.ndim != 2 or deals.shape[1] != 52:
+        raise ValueError("deals must be an (n, 52) array")
+    ranks = _subset_ranks(deals).astype(np.uint64)
+    limbs = np.zeros((len(deals), 4), dtype=np.uint64)
+    _mul_add(limbs, 1, ranks[:, 0])
+    _mul_add(limbs, HAND_COUNTS[1], ranks[:, 1])
+    _mul_add(limbs, HAND_COUNTS[2], ranks[:, 2])
+    shifts = np.array([16, 8, 0], dtype=np.uint64)
+    codes = (limbs[:, ::-1, None] >> shifts) & np.uint64(0xFF)
+    return codes.reshape(len(deals), INDEX_BYTES).astype(np.uint8)
+
+
+def _unrank(ranks: np.ndarray, size: int) -> np.ndarray:
+    """(n,) ranks of 13-card subsets of range(size) to sorted (n, 13) positions"""
+    positions = np.empty((len(ranks), 13), dtype=np.int8)
+    ranks = ranks.astype(np.int64)
+    for k in range(13, 0, -1):
+        column = BINOM_BY_K[k, :size]
+        p = np.searchsorted(column, ranks, side='right') - 1
+        positions[:, k - 1] = p
+        ranks -= column[p]
+    return positions
+
+
+def _spread(positions: np.ndarray, taken: np.ndarray) -> np.ndarray:
+    """Positions among the cards not in taken (sorted) to positions among all of them"""
+    gaps = taken - np.arange(taken.shape[1], dtype=np.int8)  # how many free cards come before each taken one
+    return positions + _count_below(positions + 1, gaps)
+
+
+def decode_deals(codes: np.ndarray) -> np.ndarray:
+    """(n, 12) uint8 deal indexes back to (n, 52) seat arrays"""
+    codes = np.asarray(codes, dtype=np.uint8)
+    if codes.ndim != 2 or codes.shape[1] != INDEX_BYTES:
+        raise ValueError("codes must be an (n, 12) array")
+    n = len(codes)
+    b = codes.reshape(n, 4, 3).astype(np.uint64)
+    limbs = ((b[:, :, 0] << np.uint64(16)) | (b[:, :, 1] << np.uint64(8)) | b[:, :, 2])[:, ::-1].copy()
+    south = _div_mod(limbs, HAND_COUNTS[2])
+    east = _div_mod(limbs, HAND_COUNTS[1])
+    north = limbs[:, 0] | (limbs[:, 1] << np.uint64(LIMB_BITS))
+    if np.any(limbs[:, 2:] != 0) or np.any(north >= np.uint64(HAND_COUNTS[0])):
+        raise ValueError(f"Deal index must be below {DEAL_COUNT}")
+
+    north = _unrank(north, 52)
+    east = _unrank(east, 39)
+    south = _spread(_spread(_unrank(south, 26), east), north)
+    east = _spread(east, north)
+    deals = np.full((n, 52), 3, dtype=np.uint8)
+    for seat, cards in enumerate((north, east, south)):
+        np.put_along_axis(deals, cards.astype(np.intp), seat, axis=1)
+    return deals
+
+
+def deal_index(deal: np.ndarray) -> int:
+    """Index of one deal"""
+    validate_deal(deal)
+    return int.from_bytes(encode_deals(np.asarray(deal)[None, :])[0].tobytes(), 'big')
+
+
+def deal_from_index(index: int) -> np.ndarray:
+    """The (52,) seat array with this index"""
+    if not 0 <= index < DEAL_COUNT:
+        raise ValueError(f"Deal index must be between 0 and {DEAL_COUNT - 1}")
+    code = np.frombuffer(index.to_bytes(INDEX_BYTES, 'big'), dtype=np.uint8)
+    return decode_deals(code[None, :])[0]
+
+
+def action_to_deal(action: Dict) -> np.ndarray:
+    """A Deal action (PBN 'value' or 'cards' list, as handle_deal_action takes it) to a (52,) seat array"""
+    value = action.get('value')
+    if isinstance(value, str):
+        masks = parse_pbn_deal(value)
+    else:
+        masks = [0, 0, 0, 0]
+        try:
+            for card in action['cards']:
+                masks[SEAT_ID[card['seat']]] |= CARD_BIT[CARD_ID[card['suit'] + card['rank']]]
+        except (KeyError, TypeError):
+            raise ValueError("Deal action must have a PBN 'value' or a valid 'cards' list")
+    deal = masks_to_deals(np.array([masks], dtype=np.uint64))[0]
+    validate_deal(deal)
+    return deal
+
+
+def action_index(action: Dict) -> int:
+    """Index of the deal in a Deal action"""
+    return deal_index(action_to_deal(action))
+
+
+def verify_deal_index():
+    """Check the edge indexes, round trips and a big-integer reference, raises ValueError on mismatch"""
+    def reference_index(deal):
+        # The module docstring's formula with Python integers, one card at a time
+        index, remaining = 0, list(range(52))
+        for seat in range(3):
+            positions = [i for i, card in enumerate(remaining) if deal[card] == seat]
+            index = index * comb(len(remaining), 13) + sum(comb(p, k + 1) for k, p in enumerate(positions))
+            remaining = [card for card in remaining if deal[card] != seat]
+        return index
+
+    # Index 0 gives North the lowest 13 cards (clubs), then East diamonds, South hearts and West spades;
+    # index 1 swaps South's top card with West's lowest; the last index deals the suits the other way round
+    first = np.array(CARD_SUIT, dtype=np.uint8)
+    second = first.copy()
+    second[[CARD_ID['HA'], CARD_ID['S2']]] = [SEAT_ID['W'], SEAT_ID['S']]
+    for index, deal in ((0, first), (1, second), (DEAL_COUNT - 1, 3 - first)):
+        if deal_index(deal) != index or not np.array_equal(deal_from_index(index), deal):
+            raise ValueError(f"Deal index {index} does not map to its expected deal")
+    for index in (2, DEAL_COUNT // 2, DEAL_COUNT - 2):
+        if deal_index(deal_from_index(index)) != index:
+            raise ValueError(f"Deal index {index} does not round-trip")
+    for index in (-1, DEAL_COUNT):
+        try:
+            deal_from_index(index)
+        except ValueError:
+            continue
+        raise ValueError(f"Out-of-range deal index {index} accepted")
+    try:
+        decode_deals(np.full((1, INDEX_BYTES), 255, dtype=np.uint8))
+    except ValueError:
+        pass
+    else:
+        raise ValueError("Deal code above DEAL_COUNT accepted")
+
+    deals = generate_deals(2000, seed=0)
+    codes = encode_deals(deals)
+    if not np.array_equal(decode_deals(codes), deals):
+        raise ValueError("Random deals do not round-trip through encode_deals and decode_deals")
+    for deal, code in zip(deals[:50], codes[:50]):
+        if int.from_bytes(code.tobytes(), 'big') != reference_index(deal):
+            raise ValueError(f"encode_deals gives {code.tobytes().hex()}, reference {reference_index(deal):x}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark deal index encoding and decoding')
+    parser.add_argument('--count', type=int, default=1000000, help='Number of random deals')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for numpy.random.default_rng')
+    args = parser.parse_args()
+
+    try:
+        deals = generate_deals(args.count, args.seed)
+    except ValueError as e:
+        print(f"Generation failed: {e}")
+        sys.exit(1)
+    start = time.perf_counter()
+    codes = encode_deals(deals)
+    encoded = time.perf_counter()
+    decoded = decode_deals(codes)
+    elapsed = time.perf_counter()
+    if not np.array_equal(decoded, deals):
+        print("Round trip failed")
+        sys.exit(1)
+    rate = lambda seconds: len(deals) / seconds / 1e6 if seconds else float('inf')
+    print(f"Encoded {len(deals)} deals in {encoded - start:.2f} s ({rate(encoded - start):.2f}M/s), "
+          f"decoded in {elapsed - encoded:.2f} s ({rate(elapsed - encoded):.2f}M/s)")
+
+
+if __name__ == '__main__':
+    main()
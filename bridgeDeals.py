@@ -0,0 +1,187 @@
+"""
+Bulk random deals as packed NumPy arrays.
+
+A batch of n deals is an (n, 52) uint8 array: column c is card id c (see
+bridgeEncoding) and the value is the seat id holding it. Each row is a
+shuffle of thirteen 0s, 1s, 2s and 3s made by Generator.permuted, so a
+million deals is one array operation and no per-card dicts are built.
+Deals convert to hand masks, PBN strings or the Deal action/tag format
+only when a Bridge or another consumer needs them.
+
+Usage:
+    python bridgeDeals.py [--count=1000000] [--seed=0] [--batch-size=1000000] [--pbn]
+"""
+
+import sys
+import time
+import argparse
+from typing import Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from bridgeEncoding import CARD_RANK, CARD_SUIT, RANKS, SEATS, SUITS, parse_pbn_deal
+
+SEAT_PATTERN = np.repeat(np.arange(4, dtype=np.uint8), 13)
+CARD_BITS = np.left_shift(np.uint64(1), np.arange(52, dtype=np.uint64))
+
+# deals_to_pbn grid: 'N:' then four hands of four 14-column suits (13 rank slots and a separator)
+PBN_HAND_WIDTH = 4 * 14
+PBN_WIDTH = 2 + 4 * PBN_HAND_WIDTH - 1
+PBN_SEPARATORS = [2 + h * PBN_HAND_WIDTH + s * 14 + 13 for h in range(4) for s in range(4)][:-1]
+PBN_SEPARATOR_CHARS = np.frombuffer(b'... ' * 4, dtype=np.uint8)[:len(PBN_SEPARATORS)]
+PBN_CARD_COLUMNS = np.array([2 + (3 - CARD_SUIT[c]) * 14 + 12 - CARD_RANK[c] for c in range(52)])
+PBN_RANK_CHARS = np.frombuffer(''.join(RANKS[CARD_RANK[c]] for c in range(52)).encode(), dtype=np.uint8)
+
+
+def _rng(seed: Union[None, int, np.random.Generator]) -> np.random.Generator:
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+
+def generate_deals(count: int, seed: Union[None, int, np.random.Generator] = None) -> np.ndarray:
+    """count random deals as an (count, 52) uint8 array of seat ids"""
+    if count < 0:
+        raise ValueError("count must not be negative")
+    rng = _rng(seed)
+    return rng.permuted(np.broadcast_to(SEAT_PATTERN, (count, 52)), axis=1)
+
+
+def iter_deal_batches(count: int, batch_size: int = 1000000,
+                      seed: Union[None, int, np.random.Generator] = None) -> Iterator[np.ndarray]:
+    """count deals in batches of at most batch_size rows, all drawn from one generator"""
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    rng = _rng(seed)
+    for start in range(0, count, batch_size):
+        yield generate_deals(min(batch_size, count - start), rng)
+
+
+def deals_to_masks(deals: np.ndarray) -> np.ndarray:
+    """(n, 52) seat arrays to (n, 4) uint64 hand masks indexed by seat id"""
+    deals = np.asarray(deals)
+    if deals.ndim != 2 or deals.shape[1] != 52:
+        raise ValueError("deals must be an (n, 52) array")
+    seats = np.arange(4, dtype=deals.dtype)
+    held = deals[:, :, None] == seats  # (n, 52, 4)
+    return np.where(held, CARD_BITS[:, None], np.uint64(0)).sum(axis=1, dtype=np.uint64)
+
+
+def masks_to_deals(masks: np.ndarray) -> np.ndarray:
+    """(n, 4) hand masks back to (n, 52) seat arrays"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    held = (masks[:, None, :] & CARD_BITS[None, :, None]) != 0  # (n, 52, 4)
+    if not np.all(held.sum(axis=2) == 1):
+        raise ValueError("Every card must be held by exactly one seat")
+    return held.argmax(axis=2).astype(np.uint8)
+
+
+def validate_deal(deal: np.ndarray):
+    """Raise ValueError unless a row gives every seat 13 cards"""
+    deal = np.asarray(deal)
+    if deal.shape != (52,) or deal.min() < 0 or deal.max() > 3:
+        raise ValueError("A deal is 52 seat ids from 0 to 3")
+    counts = np.bincount(deal.astype(np.intp), minlength=4)
+    if np.any(counts != 13):
+        seat = int(np.flatnonzero(counts != 13)[0])
+        raise ValueError(f"Player {SEATS[seat]} has {counts[seat]} cards, should have 13")
+
+
+def deal_to_pbn(deal: np.ndarray, first: str = 'N') -> str:
+    """PBN deal string for one row, hands listed clockwise from first"""
+    validate_deal(deal)
+    hands = [[[] for _ in SUITS] for _ in SEATS]
+    for card in range(51, -1, -1):  # high cards first within each suit
+        hands[deal[card]][CARD_SUIT[card]].append(RANKS[CARD_RANK[card]])
+    start = SEATS.index(first)
+    parts = []
+    for i in range(4):
+        hand = hands[(start + i) % 4]
+        parts.append('.'.join(''.join(hand[suit]) for suit in (3, 2, 1, 0)))
+    return f"{first}:" + ' '.join(parts)
+
+
+def deal_to_action(deal: np.ndarray) -> Dict:
+    """Deal action for Bridge(actions), in the same shape as a parsed-games Deal tag"""
+    value = deal_to_pbn(deal)
+    cards = [{'seat': SEATS[deal[card]], 'suit': SUITS[CARD_SUIT[card]], 'rank': RANKS[CARD_RANK[card]]}
+             for seat in range(4) for card in range(51, -1, -1) if deal[card] == seat]
+    return {'name': 'Deal', 'value': value, 'cards': cards}
+
+
+def deals_to_pbn(deals: np.ndarray, first: Union[str, Sequence[int]] = 'N') -> List[str]:
+    """PBN deal strings for a batch, first being one seat or a seat id per deal.
+
+    Every card is written into a fixed-width character grid in one array
+    operation and the unused slots are stripped per row, so no per-card
+    Python work is done.
+    """
+    deals = np.asarray(deals)
+    if deals.ndim != 2 or deals.shape[1] != 52:
+        raise ValueError("deals must be an (n, 52) array")
+    if np.any(np.stack([(deals == seat).sum(axis=1) for seat in range(4)]) != 13):
+        raise ValueError("Every seat must hold 13 cards")
+    n = len(deals)
+    first = np.full(n, SEATS.index(first)) if isinstance(first, str) else np.asarray(first, dtype=np.intp)
+    grid = np.full((n, PBN_WIDTH), ord('_'), dtype=np.uint8)
+    grid[:, PBN_SEPARATORS] = PBN_SEPARATOR_CHARS
+    grid[:, 0] = np.frombuffer(''.join(SEATS).encode(), dtype=np.uint8)[first]
+    grid[:, 1] = ord(':')
+    hand = (deals.astype(np.intp) - first[:, None]) % 4
+    grid[np.arange(n)[:, None], PBN_CARD_COLUMNS + hand * PBN_HAND_WIDTH] = PBN_RANK_CHARS
+    return [row.tobytes().translate(None, b'_').decode() for row in grid]
+
+
+def verify_deals():
+    """Check generated deals and every conversion against the per-deal PBN code, raises ValueError on mismatch"""
+    deals = generate_deals(4000, seed=0)
+    if np.any(np.stack([(deals == seat).sum(axis=1) for seat in range(4)]) != 13):
+        raise ValueError("A generated deal does not give every seat 13 cards")
+    if not np.array_equal(np.concatenate(list(iter_deal_batches(4000, 1500, seed=0))), deals):
+        raise ValueError("Batched deals differ from one generate_deals call with the same seed")
+    # Each seat should hold each card about a quarter of the time (sd ~27 over 4000 deals)
+    held = np.stack([(deals == seat).sum(axis=0) for seat in range(4)])
+    if np.any(np.abs(held - 1000) > 160):
+        raise ValueError(f"Card holders are far from uniform: {held.min()}-{held.max()} per 4000 deals")
+
+    masks = deals_to_masks(deals)
+    if not np.array_equal(masks_to_deals(masks), deals):
+        raise ValueError("Hand masks do not round-trip to the deals")
+    first = np.arange(len(deals)) % 4
+    batch = deals_to_pbn(deals, first)
+    for i in range(0, len(deals), 97):
+        pbn = deal_to_pbn(deals[i], SEATS[first[i]])
+        if batch[i] != pbn or parse_pbn_deal(pbn) != [int(m) for m in masks[i]]:
+            raise ValueError(f"Deal {i} converts inconsistently: {batch[i]} vs {pbn}")
+
+    pbn = "N:T983.743.A9.K964 Q752.AT82.QJT7.5 4.KQJ9.K8652.Q87 AKJ6.65.43.AJT32"
+    deal = masks_to_deals(np.array([parse_pbn_deal(pbn)], dtype=np.uint64))[0]
+    action = deal_to_action(deal)
+    first_card = {'seat': 'N', 'suit': 'S', 'rank': 'T'}
+    if deal_to_pbn(deal) != pbn or action['value'] != pbn or action['cards'][0] != first_card:
+        raise ValueError(f"Known deal converts to {deal_to_pbn(deal)}, action starts {action['cards'][0]}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate random deals in bulk')
+    parser.add_argument('--count', type=int, default=1000000, help='Number of deals')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for numpy.random.default_rng')
+    parser.add_argument('--batch-size', type=int, default=1000000, help='Deals generated per array')
+    parser.add_argument('--pbn', action='store_true', help='Print each deal as a PBN string')
+    args = parser.parse_args()
+
+    try:
+        start = time.perf_counter()
+        total = 0
+        for batch in iter_deal_batches(args.count, args.batch_size, args.seed):
+            total += len(batch)
+            if args.pbn:
+                sys.stdout.write('\n'.join(deals_to_pbn(batch)) + '\n')
+        elapsed = time.perf_counter() - start
+    except ValueError as e:
+        print(f"Generation failed: {e}")
+        sys.exit(1)
+    print(f"Generated {total} deals in {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
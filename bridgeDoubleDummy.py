@@ -0,0 +1,677 @@
+"""
+Double-dummy solver built on the engine's bitboard model.
+
+Positions are four 52-bit hand masks (see bridgeEncoding), a trump suit,
+the leader and the cards already played to the current trick. The solver
+answers "how many of the remaining tricks does the side to move take with
+best play by everyone" using:
+
+- a null-window search ("can this side take at least k tricks?") driven by
+  a binary search on k,
+- a partition-search transposition table at trick boundaries: each search
+  reports which cards its result depended on, and the entry records only
+  who holds the cards from there up, so positions that differ in lower
+  spot cards share it. Entries hold lower/upper bounds that persist across
+  searches,
+- quick-trick cutoffs from the top winners of the leader and partner,
+- equivalent-card merging: touching cards in one hand (no outstanding card
+  between them) are searched once,
+- move ordering that tries cheap winners, ruffs and low cards first.
+
+The pure-Python search is exact but too slow for full deals: every extra
+trick costs roughly 4x, so 8-card endings take about 0.2 s, 9-card
+endings about 1 s and a 13-card opening-lead position minutes. When the
+optional endplay package is installed, solve_deal, dd_table and
+solve_bridge hand positions to the DDS library it bundles instead (about
+20 ms per full-deal solve and 0.5 s per 20-entry table on one core).
+DoubleDummySolver itself always runs the Python search; pass native=False
+to the functions to force it. endplay is listed in requirements.txt;
+without it, asking these functions for positions with more than
+PYTHON_MAX_CARDS cards in a hand raises a RuntimeWarning rather than
+quietly spending minutes per solve.
+
+Usage:
+    python bridgeDoubleDummy.py "N:QJT85.9.J.J87652 A.A642.T9432.AK9 ..." [--trump=S] [--leader=W] [--python]
+"""
+
+import sys
+import time
+import argparse
+import warnings
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from bridgeEncoding import (
+    CARD_SUIT, CARDS, DENOMS, DENOM_ID, LHO, SEATS, SEAT_ID, SUIT_ID, cards_to_mask, masks_to_pbn, parse_pbn_deal,
+)
+
+try:  # optional native backend: Bo Haglund's DDS library as bundled by endplay
+    from endplay import dds as native_dds
+    from endplay.dds.solve import SolveMode as NativeSolveMode
+    from endplay.types import Deal as NativeDeal, Denom as NativeDenom, Player as NativePlayer
+except ImportError:
+    native_dds = None
+
+HAVE_NATIVE = native_dds is not None
+
+# Longest hand the pure-Python search solves in about a second
+PYTHON_MAX_CARDS = 9
+
+RANK_BITS = 0x1FFF
+SHIFTS = (0, 13, 26, 39)
+
+
+def _suit_layout(code: int) -> Tuple[int, int, int, Tuple[int, ...]]:
+    """Layout of one suit given its four holdings packed 13 bits apart (seat 0 lowest).
+
+    Returns the owner of each card from the top down (2 bits per card),
+    the number of cards, the four lengths packed 4 bits apart and the
+    mask of the top k cards for every k.
+    """
+    holdings = [(code >> (13 * seat)) & RANK_BITS for seat in range(4)]
+    union = holdings[0] | holdings[1] | holdings[2] | holdings[3]
+    pattern = 0
+    tops = [0]
+    bit = 1 << 12
+    while bit:
+        if union & bit:
+            owner = 0
+            while not holdings[owner] & bit:
+                owner += 1
+            pattern = pattern << 2 | owner
+            tops.append(tops[-1] | bit)
+        bit >>= 1
+    lengths = 0
+    for seat in range(4):
+        lengths |= bin(holdings[seat]).count('1') << (4 * seat)
+    return pattern, len(tops) - 1, lengths, tuple(tops)
+
+
+def _top_run(union: int, held: int) -> int:
+    """Mask of the highest cards of union in one suit that are all in held"""
+    run = 0
+    while union:
+        top = 1 << (union.bit_length() - 1)
+        if not held & top:
+            break
+        run |= top
+        union ^= top
+    return run
+
+
+def _representatives(union: int, held: int) -> Tuple[int, ...]:
+    """Rank of one card per run of touching cards in held, highest first.
+
+    union is every card of the suit still in play; cards of held with
+    nothing from union between them are equivalent.
+    """
+    reps = []
+    bit = 1 << 12
+    run = False
+    while bit:
+        if held & bit:
+            if not run:
+                reps.append(bit.bit_length() - 1)
+                run = True
+        elif union & bit:
+            run = False
+        bit >>= 1
+    return tuple(reps)
+
+
+def _check_position(hands: Sequence[int], leader: int, trick: Sequence[Tuple[int, int]]) -> Tuple[int, int]:
+    """Seat id to move and tricks left (counting the current one) of a valid position.
+
+    Raises ValueError if the trick is full or out of seat order, or if
+    the hands do not hold a consistent number of cards.
+    """
+    if len(trick) >= 4:
+        raise ValueError("Current trick already has 4 cards")
+    counts = [bin(m).count('1') for m in hands]
+    to_move = (leader + len(trick)) % 4
+    for i, (seat, _) in enumerate(trick):
+        if seat != (leader + i) % 4:
+            raise ValueError("Trick cards are not in seat order from the leader")
+    played = {seat for seat, _ in trick}
+    if any(counts[i] + (i in played) != counts[to_move] for i in range(4)):
+        raise ValueError("Hands do not hold a consistent number of cards")
+    return to_move, counts[to_move]
+
+
+class DoubleDummySolver:
+    """Alpha-beta double-dummy search with a persistent transposition table.
+
+    Searches return the result together with the cards whose ranks it
+    depended on (trick winners and the cards above them). A table entry
+    keeps only who holds those top cards in each suit plus every suit
+    length, so it also answers positions that differ in lower cards.
+    One solver is tied to one trump suit; reuse it for several positions
+    in the same strain (e.g. the four declarers of a deal) to share the
+    table.
+    """
+
+    def __init__(self, trump: Optional[str] = None):
+        if trump is not None and trump not in SUIT_ID:
+            raise ValueError(f"Invalid trump suit: {trump}")
+        self.trump = trump
+        self.trump_id = SUIT_ID[trump] if trump else -1
+        self.tt = {}  # (leader, lengths) -> {top counts: {owner prefixes: [lb, ub, best lead]}}
+        self.nodes = 0
+        self.masks = [0, 0, 0, 0]
+        self.trick_mask = 0
+        self.side = 0
+        self._layouts = {}
+        self._reps = {}
+        self._top_runs = {}
+
+    # -- public API --------------------------------------------------------
+
+    def solve(self, hands: Sequence[int], leader: int,
+              trick: Iterable[Tuple[int, int]] = (), guess: Optional[int] = None) -> int:
+        """Tricks the side to move takes from here, counting the current trick.
+
+        hands are four card masks indexed by seat id, leader is the seat id
+        that led (or will lead) the current trick and trick holds
+        (seat id, card id) pairs already played to it. With a guess the
+        search steps one trick at a time from it instead of bisecting,
+        which is cheaper when the guess is close.
+        """
+        masks = list(hands)
+        trick = list(trick)
+        to_move, tricks_left = _check_position(masks, leader, trick)
+        if tricks_left == 0:
+            return 0
+
+        self.masks = masks
+        self.trick_mask = 0  # cards in the current trick, still counted when merging equivalents
+        self.side = to_move & 1
+        lo, hi = 0, tricks_left
+        target = None if guess is None else min(max(guess, 1), tricks_left)
+        while lo < hi:
+            if target is None:
+                target = (lo + hi + 1) // 2
+            if self._search_from(leader, trick, target):
+                lo = target
+                target = lo + 1 if guess is not None else None
+            else:
+                hi = target - 1
+                target = hi if guess is not None else None
+        return lo
+
+    # -- search ------------------------------------------------------------
+
+    def _search_from(self, leader, trick, target):
+        """Null-window search from an arbitrary (possibly mid-trick) position"""
+        if not trick:
+            return self._trick(leader, 0, target)[0]
+
+        lead_suit = CARD_SUIT[trick[0][1]]
+        win_seat, win_card, win_key = -1, -1, -1
+        trick_mask = 0
+        for seat, card in trick:
+            key = self._key(card, lead_suit)
+            if key > win_key:
+                win_seat, win_card, win_key = seat, card, key
+            trick_mask |= 1 << card
+        self.trick_mask = trick_mask
+        try:
+            return self._follow((leader + len(trick)) % 4, len(trick), lead_suit,
+                                win_seat, win_card, win_key, 0, target)[0]
+        finally:
+            self.trick_mask = 0
+
+    def _key(self, card, lead_suit):
+        suit = card // 13
+        if suit == self.trump_id:
+            return 26 + card % 13
+        if suit == lead_suit:
+            return 13 + card % 13
+        return -1
+
+    def _quick_tricks(self, leader):
+        """Tricks the leader's side can cash from the top without losing the lead.
+
+        Counts the leader's own winners, or as many of them as partner can
+        follow to plus a run of partner's winners reached by leading low.
+        Returns the count and the cards it relies on. A suit's winners are
+        capped by the length of any opponent who could ruff it once void.
+        """
+        masks = self.masks
+        hand = masks[leader]
+        partner = masks[(leader + 2) % 4]
+        lho = masks[(leader + 1) % 4]
+        rho = masks[(leader + 3) % 4]
+        union = hand | lho | rho | partner
+        trump = self.trump_id
+        ruffers = ()
+        if trump >= 0:
+            trump_bits = RANK_BITS << (13 * trump)
+            ruffers = [opp for opp in (lho, rho) if opp & trump_bits]
+        runs = self._top_runs
+        total = used = 0
+        followed = followed_cards = 0  # own winners partner can follow to
+        entry = entry_cards = 0  # best run of partner's reached with a low lead
+        for shift in SHIFTS:
+            h = (hand >> shift) & RANK_BITS
+            if not h:
+                continue
+            u = (union >> shift) & RANK_BITS
+            run = runs.get((u, h))
+            if run is None:
+                run = runs[(u, h)] = _top_run(u, h)
+            own = bool(run)
+            if not own:
+                p = (partner >> shift) & RANK_BITS
+                run = runs.get((u, p))
+                if run is None:
+                    run = runs[(u, p)] = _top_run(u, p)
+                if not run:
+                    continue
+            count = bin(run).count('1')
+            if shift != 13 * trump:
+                for opp in ruffers:
+                    length = bin((opp >> shift) & RANK_BITS).count('1')
+                    if length < count:
+                        count = length
+            if not own:
+                if count > entry:
+                    entry, entry_cards = count, run << shift
+                continue
+            total += count
+            used |= run << shift
+            if bin((partner >> shift) & RANK_BITS).count('1') >= count:
+                followed += count
+                followed_cards |= run << shift
+        if followed + entry > total:
+            return followed + entry, followed_cards | entry_cards
+        return total, used
+
+    def _trick(self, leader, won, target):
+        """Start of a trick: won is tricks taken by self.side since the root.
+
+        Returns (result, cards the result depends on).
+        """
+        masks = self.masks
+        left = bin(masks[leader]).count('1')
+        if won >= target:
+            return True, 0
+        if won + left < target:
+            return False, 0
+        self.nodes += 1
+        side = self.side
+
+        if left == 1:
+            # Last trick: everyone plays their only card
+            win_card = masks[leader].bit_length() - 1
+            lead_suit = win_card // 13
+            win_seat, win_key = leader, self._key(win_card, lead_suit)
+            for i in (1, 2, 3):
+                seat = (leader + i) % 4
+                card = masks[seat].bit_length() - 1
+                key = self._key(card, lead_suit)
+                if key > win_key:
+                    win_seat, win_card, win_key = seat, card, key
+            return won + ((win_seat & 1) == side) >= target, 1 << win_card
+
+        # The leader's side wins this query iff it takes at least `threshold` of the tricks left
+        need = target - won
+        leader_is_max = (leader & 1) == side
+        threshold = need if leader_is_max else left - need + 1
+
+        quick, quick_cards = self._quick_tricks(leader)
+        if quick >= threshold:
+            return leader_is_max, quick_cards
+        if not leader_is_max and left - quick < need:
+            return False, quick_cards
+
+        # Table lookup
+        layouts = self._layouts
+        bucket_key = leader
+        m0, m1, m2, m3 = masks
+        suits = []
+        for shift in SHIFTS:
+            code = (((m0 >> shift) & RANK_BITS) | ((m1 >> shift) & RANK_BITS) << 13
+                    | ((m2 >> shift) & RANK_BITS) << 26 | ((m3 >> shift) & RANK_BITS) << 39)
+            layout = layouts.get(code)
+            if layout is None:
+                layout = layouts[code] = _suit_layout(code)
+            suits.append(layout)
+            bucket_key = bucket_key << 16 | layout[2]
+
+        bucket = self.tt.get(bucket_key)
+        if bucket is None:
+            bucket = self.tt[bucket_key] = {}
+        best = -1
+        (p0, c0, _, t0), (p1, c1, _, t1), (p2, c2, _, t2), (p3, c3, _, t3) = suits
+        for (k0, k1, k2, k3), entries in bucket.items():
+            entry = entries.get((p0 >> 2 * (c0 - k0), p1 >> 2 * (c1 - k1),
+                                 p2 >> 2 * (c2 - k2), p3 >> 2 * (c3 - k3)))
+            if entry is None:
+                continue
+            lb, ub, lead = entry
+            if lb >= threshold or ub < threshold:
+                return ((lb >= threshold) == leader_is_max,
+                        t0[k0] | t1[k1] << 13 | t2[k2] << 26 | t3[k3] << 39)
+            if lead >= 0 and best < 0:
+                best = lead
+
+        result, relevant, card = self._lead(leader, won, target, best)
+
+        # Store under the top cards of each suit down to the lowest relevant one
+        tops = []
+        prefixes = []
+        widened = 0
+        for (pattern, count, _, top), shift in zip(suits, SHIFTS):
+            r = (relevant >> shift) & RANK_BITS
+            k = 0
+            if r:
+                low = r & -r
+                while not top[k] & low:
+                    k += 1
+                widened |= top[k] << shift
+            tops.append(k)
+            prefixes.append(pattern >> 2 * (count - k))
+        entries = bucket.get(tuple(tops))
+        if entries is None:
+            entries = bucket[tuple(tops)] = {}
+        prefixes = tuple(prefixes)
+        entry = entries.get(prefixes)
+        if entry is None:
+            entry = entries[prefixes] = [0, left, -1]
+        if result == leader_is_max:
+            if threshold > entry[0]:
+                entry[0] = threshold
+            entry[2] = card
+        elif threshold - 1 < entry[1]:
+            entry[1] = threshold - 1
+        return result, widened
+
+    def _reps_of(self, union, held, shift):
+        """Representative card ids of held within one suit, highest first"""
+        u = (union >> shift) & RANK_BITS
+        h = (held >> shift) & RANK_BITS
+        reps = self._reps.get((u, h))
+        if reps is None:
+            reps = self._reps[(u, h)] = _representatives(u, h)
+        return reps
+
+    def _lead_moves(self, leader):
+        """Leads ordered by a quick estimate of how promising they are"""
+        masks = self.masks
+        hand = masks[leader]
+        partner = masks[(leader + 2) % 4]
+        lho = masks[(leader + 1) % 4]
+        rho = masks[(leader + 3) % 4]
+        union = hand | partner | lho | rho
+        trump = self.trump_id
+        trump_bits = RANK_BITS << (13 * trump) if trump >= 0 else 0
+        scored = []
+        for shift in (39, 26, 13, 0):
+            suit_bits = RANK_BITS << shift
+            if not hand & suit_bits:
+                continue
+            reps = self._reps_of(union, hand, shift)
+            top = 1 << ((union & suit_bits).bit_length() - 1)
+            if hand & top:
+                # Cash the top card, other cards of the suit later
+                scored.append((60, shift + reps[0]))
+                for r in reps[1:]:
+                    scored.append((10 - r, shift + r))
+                continue
+            base = 0
+            if partner & top:
+                base = 40  # Lead towards partner's winner
+            if trump_bits and shift != 13 * trump:
+                if not partner & suit_bits and partner & trump_bits:
+                    base += 30  # Partner can ruff
+                if (not lho & suit_bits and lho & trump_bits) or (not rho & suit_bits and rho & trump_bits):
+                    base -= 30  # Opponent can ruff
+            for r in reps:
+                scored.append((base - r, shift + r))
+        scored.sort(reverse=True)
+        return [card for _, card in scored]
+
+    def _follow_moves(self, seat, playable, lead_suit, win_seat, win_key):
+        """Cards for a follower: low when partner is winning, else cheapest winner first"""
+        masks = self.masks
+        union = masks[0] | masks[1] | masks[2] | masks[3] | self.trick_mask
+        winners, losers = [], []
+        for shift in SHIFTS:
+            if not (playable >> shift) & RANK_BITS:
+                continue
+            for r in reversed(self._reps_of(union, playable, shift)):  # lowest first
+                card = shift + r
+                if self._key(card, lead_suit) > win_key:
+                    winners.append(card)
+                else:
+                    losers.append(card)
+        if (win_seat & 1) == (seat & 1):
+            return losers + winners
+        return winners + losers
+
+    def _lead(self, leader, won, target, best=-1):
+        """Try each lead, best (a lead that worked in an earlier search) first.
+
+        Returns the result, the cards it depends on and the lead that
+        produced it (-1 if every lead failed).
+        """
+        masks = self.masks
+        hand = masks[leader]
+        is_max = (leader & 1) == self.side
+        moves = self._lead_moves(leader)
+        if best >= 0 and best in moves:
+            moves.remove(best)
+            moves.insert(0, best)
+        relevant = 0
+        for card in moves:
+            bit = 1 << card
+            suit = card // 13
+            masks[leader] = hand ^ bit
+            self.trick_mask = bit
+            result, cards = self._follow((leader + 1) % 4, 1, suit, leader, card,
+                                         self._key(card, suit), won, target)
+            masks[leader] = hand
+            self.trick_mask = 0
+            if result == is_max:
+                return result, cards, card
+            relevant |= cards
+        # Failing every lead also relied on the merged equivalents staying equivalent
+        for card in moves:
+            hand ^= 1 << card
+        return not is_max, relevant | hand, -1
+
+    def _follow(self, seat, pos, lead_suit, win_seat, win_card, win_key, won, target):
+        masks = self.masks
+        hand = masks[seat]
+        playable = hand & (RANK_BITS << (13 * lead_suit))
+        if not playable:
+            playable = hand
+        is_max = (seat & 1) == self.side
+        trick_mask = self.trick_mask
+        relevant = 0
+        moves = self._follow_moves(seat, playable, lead_suit, win_seat, win_key)
+        for card in moves:
+            bit = 1 << card
+            key = self._key(card, lead_suit)
+            if key > win_key:
+                new_seat, new_card, new_key = seat, card, key
+            else:
+                new_seat, new_card, new_key = win_seat, win_card, win_key
+            masks[seat] = hand ^ bit
+            if pos == 3:
+                self.trick_mask = 0
+                result, cards = self._trick(new_seat, won + ((new_seat & 1) == self.side), target)
+                cards |= 1 << new_card
+            else:
+                self.trick_mask = trick_mask | bit
+                result, cards = self._follow((seat + 1) % 4, pos + 1, lead_suit,
+                                             new_seat, new_card, new_key, won, target)
+            masks[seat] = hand
+            self.trick_mask = trick_mask
+            if result == is_max:
+                return result, cards
+            relevant |= cards
+        for card in moves:
+            playable ^= 1 << card
+        return not is_max, relevant | playable
+
+
+def _use_native(native: Optional[bool], cards: int = 0) -> bool:
+    """Resolve a native= argument: None means DDS when endplay is installed.
+
+    Falling back to the Python search for hands of more than
+    PYTHON_MAX_CARDS cards warns, since each solve then takes seconds to
+    minutes.
+    """
+    if native is None:
+        if not HAVE_NATIVE and cards > PYTHON_MAX_CARDS:
+            warnings.warn(f"endplay is not installed, so {cards}-card positions use the pure-Python search and "
+                          f"take minutes each (pip install endplay, or pass native=False)",
+                          RuntimeWarning, stacklevel=3)
+        return HAVE_NATIVE
+    if native and not HAVE_NATIVE:
+        raise ImportError("The native double-dummy backend needs endplay (pip install endplay)")
+    return native
+
+
+def _native_deal(hands: Sequence[int], trump: Optional[str], leader: int,
+                 trick: Sequence[Tuple[int, int]] = ()):
+    """endplay Deal for a position, with the current trick replayed from the hands"""
+    hands = list(hands)
+    for seat, card in trick:
+        hands[seat] |= 1 << card
+    deal = NativeDeal(masks_to_pbn(hands))
+    deal.first = NativePlayer(leader)  # endplay numbers seats N, E, S, W like SEAT_ID
+    deal.trump = NativeDenom.find(trump or 'NT')
+    for _, card in trick:
+        deal.play(CARDS[card])
+    return deal
+
+
+def dd_table(hands: Sequence[int], native: Optional[bool] = None) -> List[List[int]]:
+    """Double-dummy tricks for every declarer in every strain.
+
+    Returns table[strain id][declarer seat id] in DENOMS and SEATS order.
+    Full deals go to DDS's table solver when the native backend is used
+    (native=None uses it if endplay is installed). Otherwise each strain
+    uses one solver for all four declarers so they share its
+    transposition table, and each declarer's result seeds the next
+    search.
+    """
+    counts = [bin(m).count('1') for m in hands]
+    if len(set(counts)) != 1:
+        raise ValueError("Hands do not hold a consistent number of cards")
+    if _use_native(native, counts[0]):
+        if counts[0] == 13:
+            rows = native_dds.calc_dd_table(NativeDeal(masks_to_pbn(hands))).to_list()
+            return [list(rows[NativeDenom.find(denom)]) for denom in DENOMS]
+        # DDS's table call assumes 13 cards, so endings are solved entry by entry
+        return [[counts[0] - solve_deal(hands, None if denom == 'NT' else denom, LHO[declarer], native=True)
+                 for declarer in range(4)] for denom in DENOMS]
+
+    table = []
+    for denom in DENOMS:
+        solver = DoubleDummySolver(None if denom == 'NT' else denom)
+        row = [0, 0, 0, 0]
+        defence = None  # tricks for the side defending the previous declarer
+        for declarer in (0, 2, 1, 3):
+            if defence is not None and declarer == 1:
+                defence = counts[0] - defence  # NS now defend: guess their declaring tricks
+            defence = solver.solve(hands, LHO[declarer], guess=defence)
+            row[declarer] = counts[0] - defence
+        table.append(row)
+    return table
+
+
+def solve_deal(hands: Sequence[int], trump: Optional[str], leader: int,
+               trick: Iterable[Tuple[int, int]] = (), native: Optional[bool] = None) -> int:
+    """Tricks the side to move takes from a position.
+
+    Uses DDS when the native backend is used (native=None uses it if
+    endplay is installed), otherwise a fresh DoubleDummySolver.
+    """
+    trick = list(trick)
+    if not _use_native(native, max(bin(m).count('1') for m in hands)):
+        return DoubleDummySolver(trump).solve(hands, leader, trick)
+    if trump is not None and trump not in SUIT_ID:
+        raise ValueError(f"Invalid trump suit: {trump}")
+    if _check_position(hands, leader, trick)[1] == 0:
+        return 0
+    board = native_dds.solve_board(_native_deal(hands, trump, leader, trick), NativeSolveMode.OptimalOne)
+    return max(tricks for _, tricks in board)
+
+
+def solve_bridge(bridge, native: Optional[bool] = None) -> int:
+    """Tricks still available to the side to move in a Bridge game in its play phase.
+
+    Hands, trump, leader and the cards in the current trick all come from
+    the Bridge object; the current trick counts towards the total.
+    """
+    if bridge.current_phase != 'Play':
+        raise ValueError("Can only solve a game in play phase")
+    hands = getattr(bridge.hands, 'masks', None)
+    if hands is None:
+        hands = [cards_to_mask(bridge.hands[seat]) for seat in SEATS]
+    trick = bridge.current_trick
+    if len(trick.card_ids) == 4:
+        raise ValueError("Board is finished")
+    return solve_deal(hands, trick.trump, trick.leader_id, zip(trick.seat_ids, trick.card_ids), native)
+
+
+def verify_double_dummy():
+    """Check the solvers on endings with known results, raises ValueError on mismatch.
+
+    Runs the Python search, and DDS as well when endplay is installed.
+    """
+    def hands(*holdings):
+        return [cards_to_mask(holding.split()) for holding in holdings]
+
+    # South's CA squeezes West in the majors; with the spade guard moved to East there is no squeeze
+    squeeze = hands('SQ HA H2', 'D4 D5 D6', 'CA H3 D2', 'SK HK HQ')
+    no_squeeze = hands('SQ HA H2', 'SK D5 D6', 'CA H3 D2', 'D4 HK HQ')
+    # East ruffs North's top spade when hearts are trumps
+    ruff = hands('SA SK', 'H2 H3', 'D2 D3', 'C2 C3')
+    checks = [(squeeze, None, SEAT_ID['S'], 3), (no_squeeze, None, SEAT_ID['S'], 2),
+              (ruff, 'H', SEAT_ID['N'], 0), (ruff, None, SEAT_ID['N'], 2)]
+    # table[strain][declarer] for the squeeze ending, from DDS
+    squeeze_table = [[2, 0, 2, 1], [0, 3, 0, 3], [2, 1, 1, 1], [2, 1, 1, 2], [0, 0, 1, 2]]
+
+    for native in (False, True) if HAVE_NATIVE else (False,):
+        for position, trump, leader, expected in checks:
+            tricks = solve_deal(position, trump, leader, native=native)
+            if tricks != expected:
+                raise ValueError(f"{masks_to_pbn(position)} {trump or 'NT'} led by {SEATS[leader]}: "
+                                 f"{tricks} tricks, expected {expected} (native={native})")
+        table = dd_table(squeeze, native=native)
+        if table != squeeze_table:
+            raise ValueError(f"Squeeze ending table {table} != {squeeze_table} (native={native})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Double-dummy solve a PBN deal')
+    parser.add_argument('deal', help='PBN deal string, e.g. "N:AKQ.. ..."')
+    parser.add_argument('--trump', default='NT', help='Trump suit (C, D, H, S) or NT')
+    parser.add_argument('--leader', default='W', help='Opening leader (N, E, S, W)')
+    parser.add_argument('--python', action='store_true', help='Use the pure-Python search even if endplay is installed')
+    args = parser.parse_args()
+
+    if args.trump not in DENOM_ID or args.leader not in SEAT_ID:
+        print("Invalid trump or leader")
+        sys.exit(1)
+    trump = None if args.trump == 'NT' else args.trump
+    hands = parse_pbn_deal(args.deal)
+    start = time.perf_counter()
+    if _use_native(False if args.python else None, 13):
+        tricks = solve_deal(hands, trump, SEAT_ID[args.leader], native=True)
+        how = 'DDS'
+    else:
+        solver = DoubleDummySolver(trump)
+        tricks = solver.solve(hands, SEAT_ID[args.leader])
+        how = f"{solver.nodes} nodes"
+    elapsed = time.perf_counter() - start
+    print(f"{args.leader} leads, {args.trump}: {args.leader}'s side takes {tricks}, "
+          f"declaring side {13 - tricks} ({how}, {elapsed * 1000:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Integer encoding of cards, seats and calls shared by the bridge engine.
+
+Cards are 0-51 (suit * 13 + rank, clubs lowest, 2 lowest), seats are 0-3
+in N, E, S, W order and calls are 0-37 (Pass, X, XX, then 1C..7NT).
+Strings are only needed at the edges, e.g. reading PBN or building state.
+"""
+
+SUITS = ['C', 'D', 'H', 'S']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+SEATS = ['N', 'E', 'S', 'W']
+DENOMS = ['C', 'D', 'H', 'S', 'NT']
+SIDES = ['NS', 'EW']
+
+SUIT_ID = {s: i for i, s in enumerate(SUITS)}
+RANK_ID = {r: i for i, r in enumerate(RANKS)}
+SEAT_ID = {s: i for i, s in enumerate(SEATS)}
+DENOM_ID = {d: i for i, d in enumerate(DENOMS)}
+NT = DENOM_ID['NT']
+
+# Cards
+CARDS = [s + r for s in SUITS for r in RANKS]
+CARD_ID = {c: i for i, c in enumerate(CARDS)}
+CARD_SUIT = [i // 13 for i in range(52)]
+CARD_RANK = [i % 13 for i in range(52)]
+CARD_BIT = [1 << i for i in range(52)]
+SUIT_MASK = [0x1FFF << (13 * s) for s in range(4)]
+FULL_MASK = (1 << 52) - 1
+
+# Seats: N/S are side 0, E/W side 1
+SEAT_SIDE = [i & 1 for i in range(4)]
+PARTNER = [(i + 2) % 4 for i in range(4)]
+LHO = [(i + 1) % 4 for i in range(4)]
+
+# Calls
+PASS, DOUBLE, REDOUBLE = 0, 1, 2
+BIDS = [f"{level}{denom}" for level in range(1, 8) for denom in DENOMS]
+CALLS = ['Pass', 'X', 'XX'] + BIDS
+CALL_ID = {c: i for i, c in enumerate(CALLS)}
+FIRST_BID = 3
+CALL_LEVEL = [0, 0, 0] + [level for level in range(1, 8) for _ in DENOMS]
+CALL_DENOM = [-1, -1, -1] + [d for _ in range(1, 8) for d in range(len(DENOMS))]
+
+RISKS = ['', 'X', 'XX']
+RISK_ID = {r: i for i, r in enumerate(RISKS)}
+
+
+def card_id(card: str) -> int:
+    """Card string such as 'SA' to its id"""
+    return CARD_ID[card]
+
+
+def mask_to_cards(mask: int) -> list:
+    """Card strings held in a 52-bit mask, clubs first and low to high"""
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(CARDS[low.bit_length() - 1])
+        mask ^= low
+    return cards
+
+
+def cards_to_mask(cards) -> int:
+    mask = 0
+    for card in cards:
+        mask |= CARD_BIT[CARD_ID[card]]
+    return mask
+
+
+def masks_to_pbn(masks, first: int = 0) -> str:
+    """PBN deal string for four masks indexed by seat id, hands listed clockwise from seat id first.
+
+    Hands may hold fewer than 13 cards (an ending); voids are left empty.
+    """
+    parts = []
+    for i in range(4):
+        mask = masks[(first + i) % 4]
+        parts.append('.'.join(''.join(RANKS[r] for r in range(12, -1, -1) if mask >> (13 * suit + r) & 1)
+                              for suit in (3, 2, 1, 0)))
+    return f"{SEATS[first]}:" + ' '.join(parts)
+
+
+def parse_pbn_deal(deal: str) -> list:
+    """Parse a PBN deal string ('N:T974.AKQJ.K653.9 ...') into four masks indexed by seat id.
+
+    Raises ValueError for malformed strings, unknown ranks, duplicate cards
+    or hands that do not hold exactly 13 cards.
+    """
+    first, sep, hands = deal.partition(':')
+    first_id = SEAT_ID.get(first.strip())
+    if not sep or first_id is None:
+        raise ValueError(f"Invalid PBN deal: {deal}")
+    hands = hands.split()
+    if len(hands) != 4:
+        raise ValueError(f"PBN deal must list 4 hands: {deal}")
+
+    masks = [0, 0, 0, 0]
+    seen = 0
+    for i, hand in enumerate(hands):
+        seat = (first_id + i) % 4
+        holdings = hand.split('.')
+        if len(holdings) != 4:
+            raise ValueError(f"Invalid PBN hand: {hand}")
+        mask = 0
+        for suit, holding in zip((3, 2, 1, 0), holdings):  # S.H.D.C
+            if holding == '-':
+                continue
+            base = 13 * suit
+            for rank in holding:
+                rank_id = RANK_ID.get(rank)
+                if rank_id is None:
+                    raise ValueError(f"Invalid rank: {rank}")
+                bit = CARD_BIT[base + rank_id]
+                if seen & bit:
+                    raise ValueError(f"Duplicate card: {CARDS[base + rank_id]}")
+                seen |= bit
+                mask |= bit
+        count = bin(mask).count('1')
+        if count != 13:
+            raise ValueError(f"Player {SEATS[seat]} has {count} cards, should have 13")
+        masks[seat] = mask
+    return masks
+
+
+def verify_encoding():
+    """Check the id tables invert each other and PBN deals round-trip, raises ValueError on mismatch"""
+    for table, ids in ((SUITS, SUIT_ID), (RANKS, RANK_ID), (SEATS, SEAT_ID), (DENOMS, DENOM_ID),
+                       (CARDS, CARD_ID), (CALLS, CALL_ID), (RISKS, RISK_ID)):
+        if len(ids) != len(table) or any(ids[name] != i for i, name in enumerate(table)):
+            raise ValueError(f"Id table does not invert {table[:3]}...")
+    for call in range(FIRST_BID, len(CALLS)):
+        if CALLS[call] != f"{CALL_LEVEL[call]}{DENOMS[CALL_DENOM[call]]}":
+            raise ValueError(f"Call {call} decodes to {CALL_LEVEL[call]}{DENOMS[CALL_DENOM[call]]}, not {CALLS[call]}")
+
+    deal = "N:T983.743.A9.K964 Q752.AT82.QJT7.5 4.KQJ9.K8652.Q87 AKJ6.65.43.AJT32"
+    masks = parse_pbn_deal(deal)
+    if sum(masks) != FULL_MASK or masks_to_pbn(masks) != deal:
+        raise ValueError(f"PBN deal does not round-trip: {masks_to_pbn(masks)}")
+    if mask_to_cards(masks[SEAT_ID['W']])[-4:] != ['S6', 'SJ', 'SK', 'SA']:
+        raise ValueError(f"West spades decode to {mask_to_cards(masks[SEAT_ID['W']])[-4:]}")
+    if parse_pbn_deal(masks_to_pbn(masks, first=SEAT_ID['E'])) != masks:
+        raise ValueError("PBN deal listed from East does not round-trip")
+    for bad in (deal.replace('T983', 'T982'), deal.replace('T983', 'T98'), deal[2:]):
+        try:
+            parse_pbn_deal(bad)
+        except ValueError:
+            continue
+        raise ValueError(f"Malformed PBN deal accepted: {bad}")
+    return True
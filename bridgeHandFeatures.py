@@ -0,0 +1,184 @@
+"""
+Hand-evaluation features for packed deals, vectorized over every hand.
+
+Deals are (n, 52) seat arrays as made by bridgeDeals (PBN Deal tags are
+converted with deals_from_pbn). Every feature is computed for all n
+deals and all four seats at once from two small arrays: the suit lengths
+and which of the J, Q, K and A each seat holds. Per-seat results are
+(n, 4) arrays indexed by seat id; per-suit results are (n, 4, 4) with
+suits in clubs-first id order.
+
+Usage:
+    python bridgeHandFeatures.py [--data-dir=parsed-games] [--corpus=FILE] [--random=N] [--seed=0]
+"""
+
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from bridgeDeals import generate_deals, masks_to_deals
+from bridgeEncoding import SEATS, parse_pbn_deal
+from bridgeStream import iter_corpus_deals
+
+SEAT_IDS = np.arange(4, dtype=np.uint8)
+HONOR_HCP = np.array([1, 2, 3, 4], dtype=np.int16)  # J, Q, K, A
+HONOR_CONTROLS = np.array([0, 0, 1, 2], dtype=np.int16)
+SHAPE_CLASSES = ['balanced', 'semi-balanced', 'unbalanced']
+BALANCED = [4333, 4432, 5332]
+SEMI_BALANCED = [5422, 6322]
+
+
+@dataclass
+class HandFeatures:
+    """Features of every hand in a batch of deals, indexed [deal, seat] (and [.., suit] for lengths)"""
+    hcp: np.ndarray
+    lengths: np.ndarray
+    shape: np.ndarray  # sorted suit lengths as digits, e.g. 5431; 10+ card suits take two digits
+    shape_class: np.ndarray  # index into SHAPE_CLASSES
+    controls: np.ndarray
+    quick_tricks: np.ndarray  # float, in steps of 0.5
+    losers: np.ndarray  # losing-trick count
+
+    def __len__(self) -> int:
+        return len(self.hcp)
+
+
+def _check(deals: np.ndarray) -> np.ndarray:
+    deals = np.asarray(deals)
+    if deals.ndim != 2 or deals.shape[1] != 52:
+        raise ValueError("deals must be an (n, 52) array")
+    return deals
+
+
+def deals_from_pbn(deals: Iterable[str]) -> np.ndarray:
+    """PBN deal strings to an (n, 52) seat array"""
+    masks = np.array([parse_pbn_deal(deal) for deal in deals], dtype=np.uint64).reshape(-1, 4)
+    return masks_to_deals(masks)
+
+
+def suit_lengths(deals: np.ndarray) -> np.ndarray:
+    """(n, 4, 4) suit lengths, [deal, seat, suit id]"""
+    by_suit = _check(deals).reshape(-1, 4, 13)
+    return np.stack([(by_suit == seat).sum(axis=2, dtype=np.int8) for seat in SEAT_IDS], axis=1)
+
+
+def honors(deals: np.ndarray) -> np.ndarray:
+    """(n, 4, 4, 4) bool, [deal, seat, suit id, J/Q/K/A]"""
+    top = _check(deals).reshape(-1, 4, 13)[:, :, 9:]
+    return top[:, None, :, :] == SEAT_IDS[None, :, None, None]
+
+
+def hand_hcp(deals: np.ndarray) -> np.ndarray:
+    """(n, 4) HCP of every seat"""
+    return (honors(deals) * HONOR_HCP).sum(axis=(2, 3))
+
+
+def shape_patterns(lengths: np.ndarray) -> np.ndarray:
+    """Suit lengths to sorted shape numbers (4-3-3-3 is 4333)"""
+    ordered = np.sort(lengths.astype(np.int16), axis=-1)
+    return ordered[..., 3] * 1000 + ordered[..., 2] * 100 + ordered[..., 1] * 10 + ordered[..., 0]
+
+
+def shape_classes(shapes: np.ndarray) -> np.ndarray:
+    """Shape numbers to indexes into SHAPE_CLASSES"""
+    return np.where(np.isin(shapes, BALANCED), 0, np.where(np.isin(shapes, SEMI_BALANCED), 1, 2)).astype(np.int8)
+
+
+def hand_features(deals: np.ndarray) -> HandFeatures:
+    """Every feature for every seat of every deal"""
+    lengths = suit_lengths(deals)
+    held = honors(deals)
+    jack, queen, king, ace = (held[..., i] for i in range(4))
+
+    # Quick tricks per suit: AK 2, AQ 1.5, A or KQ 1, guarded K 0.5
+    quick = np.where(ace & king, 2.0, np.where(ace & queen, 1.5, np.where(
+        ace | (king & queen), 1.0, np.where(king & (lengths >= 2), 0.5, 0.0))))
+    # Losers per suit: the top three cards (or fewer) that are not the A, K and Q in their places
+    losers = (np.minimum(lengths, 3) - ace - (king & (lengths >= 2)) - (queen & (lengths >= 3))).astype(np.int8)
+
+    shapes = shape_patterns(lengths)
+    return HandFeatures(
+        hcp=(held * HONOR_HCP).sum(axis=(2, 3)),
+        lengths=lengths,
+        shape=shapes,
+        shape_class=shape_classes(shapes),
+        controls=(held * HONOR_CONTROLS).sum(axis=(2, 3)),
+        quick_tricks=quick.sum(axis=2),
+        losers=losers.sum(axis=2),
+    )
+
+
+def verify_hand_features():
+    """Check every feature on a hand-evaluated deal, raises ValueError on mismatch"""
+    deals = deals_from_pbn(["N:T983.743.A9.K964 Q752.AT82.QJT7.5 4.KQJ9.K8652.Q87 AKJ6.65.43.AJT32"])
+    features = hand_features(deals)
+    expected = {  # N, E, S, W
+        'hcp': [7, 9, 11, 13],
+        'lengths': [[4, 2, 3, 4], [1, 4, 4, 4], [3, 5, 4, 1], [5, 2, 2, 4]],
+        'shape': [4432, 4441, 5431, 5422],
+        'shape_class': [0, 2, 2, 1],
+        'controls': [3, 2, 2, 5],
+        'quick_tricks': [1.5, 1.0, 1.5, 3.0],
+        'losers': [9, 7, 6, 7],
+    }
+    for name, values in expected.items():
+        actual = getattr(features, name)[0]
+        if not np.array_equal(actual, values):
+            raise ValueError(f"{name} {actual.tolist()} != {values}")
+    if not np.array_equal(hand_hcp(deals)[0], expected['hcp']):
+        raise ValueError(f"hand_hcp {hand_hcp(deals)[0].tolist()} != {expected['hcp']}")
+
+    # The pack always holds 40 HCP, 12 controls and 13 cards per suit
+    features = hand_features(generate_deals(1000, seed=0))
+    if (np.any(features.hcp.sum(axis=1) != 40) or np.any(features.controls.sum(axis=1) != 12)
+            or np.any(features.lengths.sum(axis=1) != 13)):
+        raise ValueError("Random deals do not share out 40 HCP, 12 controls and 13 cards per suit")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute hand-evaluation features for many deals')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--corpus', help='Binary corpus (bridgeCorpus output) to read instead of --data-dir')
+    parser.add_argument('--random', type=int, default=None, help='Use this many random deals instead')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for numpy.random.default_rng')
+    args = parser.parse_args()
+
+    if args.random is not None:
+        deals = generate_deals(args.random, args.seed)
+    elif args.corpus:
+        if not Path(args.corpus).exists():
+            print(f"Corpus file not found: {args.corpus}")
+            sys.exit(1)
+        from bridgeCorpus import CorpusReader  # only the CLI reads corpora; keep the feature code light
+        with CorpusReader(args.corpus) as reader:
+            deals = reader.deals()
+    else:
+        if not Path(args.data_dir).exists():
+            print(f"Data directory not found: {args.data_dir}")
+            sys.exit(1)
+        try:
+            deals = deals_from_pbn(record['deal'] for record in iter_corpus_deals(args.data_dir))
+        except ValueError as e:
+            print(f"Invalid deal: {e}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    features = hand_features(deals)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(features)} deals, {4 * len(features)} hands in {elapsed:.3f} s")
+    for i, seat in enumerate(SEATS):
+        print(f"  {seat}: HCP {features.hcp[:, i].mean():5.2f}  controls {features.controls[:, i].mean():4.2f}  "
+              f"quick tricks {features.quick_tricks[:, i].mean():4.2f}  losers {features.losers[:, i].mean():4.2f}")
+    classes = np.bincount(features.shape_class.ravel(), minlength=len(SHAPE_CLASSES))
+    print('  ' + '  '.join(f"{name} {count / classes.sum():.1%}" for name, count in zip(SHAPE_CLASSES, classes)))
+
+
+if __name__ == '__main__':
+    main()
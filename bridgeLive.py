@@ -0,0 +1,176 @@
+"""
+Incremental matchpoint scoring for live pairs events.
+
+Each board keeps its NS scores in a Fenwick tree indexed by every score
+duplicate bridge can produce (taken from the ScoreCalculator score table),
+so inserting, correcting or deleting one result is O(log n). Matchpoints
+are not stored: a result's matchpoints are read from its board's counts
+when asked for, so every matchpoint a change affects is current as soon as
+the change is made. Pair totals sum those reads over the boards a pair
+has played.
+"""
+
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from bridgeClaudev2 import SCORE_TABLE, ScoreCalculator
+
+# Every NS score a board can produce, in ascending order
+SCORE_VALUES = sorted(set(SCORE_TABLE) | {-s for s in SCORE_TABLE} | {0})
+SCORE_SLOT = {score: i for i, score in enumerate(SCORE_VALUES)}
+
+
+class BoardScores:
+    """Sorted multiset of NS scores on one board, with counts per score."""
+
+    def __init__(self):
+        self.tree = [0] * (len(SCORE_VALUES) + 1)  # Fenwick tree, 1-based
+        self.counts = [0] * len(SCORE_VALUES)
+        self.total = 0
+
+    @staticmethod
+    def _slot(score: int) -> int:
+        slot = SCORE_SLOT.get(score)
+        if slot is None:
+            raise ValueError(f"Not a duplicate score: {score}")
+        return slot
+
+    def _update(self, slot: int, delta: int):
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def insert(self, score: int):
+        slot = self._slot(score)
+        self._update(slot, 1)
+        self.counts[slot] += 1
+        self.total += 1
+
+    def remove(self, score: int):
+        slot = self._slot(score)
+        if not self.counts[slot]:
+            raise ValueError(f"No result with score {score} on this board")
+        self._update(slot, -1)
+        self.counts[slot] -= 1
+        self.total -= 1
+
+    def count_below(self, score: int) -> int:
+        i = self._slot(score)
+        count = 0
+        while i > 0:
+            count += self.tree[i]
+            i -= i & -i
+        return count
+
+    def count_equal(self, score: int) -> int:
+        return self.counts[self._slot(score)]
+
+    def matchpoints(self, score: int, expected: Optional[int] = None) -> float:
+        """NS matchpoints for a score already on the board, 1 per result beaten and 1/2 per tie.
+
+        With expected set the result is Neuberg-adjusted to a board
+        played that many times.
+        """
+        mp = self.count_below(score) + 0.5 * (self.count_equal(score) - 1)
+        if expected is None or expected == self.total:
+            return mp
+        return (mp + 0.5) * expected / self.total - 0.5
+
+    @property
+    def top(self) -> int:
+        return max(self.total - 1, 0)
+
+
+class LiveEvent:
+    """Running matchpoint totals for a pairs event as results are submitted."""
+
+    def __init__(self, expected: Optional[int] = None):
+        self.expected = expected  # results per board for Neuberg adjustment, None for raw matchpoints
+        self.boards: Dict[Hashable, BoardScores] = {}
+        self.results: Dict[Tuple[Hashable, Hashable], Tuple[Hashable, int]] = {}  # (board, NS) -> (EW, score)
+        self.ew_results: Dict[Tuple[Hashable, Hashable], Hashable] = {}  # (board, EW) -> NS
+        self.pair_boards: Dict[Hashable, Dict[Hashable, str]] = {}  # pair -> {board: 'NS' or 'EW'}
+
+    def submit(self, board: Hashable, ns_pair: Hashable, ew_pair: Hashable, score: int):
+        """Add one result, or correct it if the NS pair already has a result on the board"""
+        existing = self.results.get((board, ns_pair))
+        if self.ew_results.get((board, ew_pair), ns_pair) != ns_pair:
+            raise ValueError(f"Pair {ew_pair} already has a result on board {board}")
+        if existing is not None:
+            self.delete(board, ns_pair)
+
+        scores = self.boards.get(board)
+        if scores is None:
+            scores = self.boards[board] = BoardScores()
+        scores.insert(score)
+        self.results[(board, ns_pair)] = (ew_pair, score)
+        self.ew_results[(board, ew_pair)] = ns_pair
+        self.pair_boards.setdefault(ns_pair, {})[board] = 'NS'
+        self.pair_boards.setdefault(ew_pair, {})[board] = 'EW'
+
+    def submit_contract(self, board: Hashable, ns_pair: Hashable, ew_pair: Hashable,
+                        contract: dict, declarer: str, made: int, vulnerable: str):
+        """Add a result scored by ScoreCalculator"""
+        pbn = ScoreCalculator(contract, declarer, made, vulnerable).pbn_score()
+        self.submit(board, ns_pair, ew_pair, int(pbn.split()[1]))
+
+    def delete(self, board: Hashable, ns_pair: Hashable):
+        ew_pair, score = self.results.pop((board, ns_pair))
+        del self.ew_results[(board, ew_pair)]
+        self.boards[board].remove(score)
+        del self.pair_boards[ns_pair][board]
+        del self.pair_boards[ew_pair][board]
+
+    def board_matchpoints(self, board: Hashable, pair: Hashable) -> float:
+        """Current matchpoints for a pair on one board, from their own direction"""
+        direction = self.pair_boards[pair][board]
+        ns_pair = pair if direction == 'NS' else self.ew_results[(board, pair)]
+        scores = self.boards[board]
+        mp = scores.matchpoints(self.results[(board, ns_pair)][1], self.expected)
+        if direction == 'NS':
+            return mp
+        top = self.expected - 1 if self.expected else scores.top
+        return top - mp
+
+    def pair_total(self, pair: Hashable) -> float:
+        """Running matchpoint total for a pair over the boards they have played"""
+        return sum(self.board_matchpoints(board, pair) for board in self.pair_boards.get(pair, {}))
+
+    def standings(self) -> List[Tuple[Hashable, float, int]]:
+        """(pair, matchpoints, boards played) for every pair, best first"""
+        rows = [(pair, self.pair_total(pair), len(boards)) for pair, boards in self.pair_boards.items()]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows
+
+
+def verify_live_event():
+    """Check a live event with corrections and a deletion against bridgePairs, raises ValueError on mismatch"""
+    from bridgePairs import matchpoints
+
+    event = LiveEvent(expected=4)
+    final = [(1, 'N1', 'E1', 100), (1, 'N2', 'E2', 100), (1, 'N3', 'E3', 50), (1, 'N4', 'E4', -50),
+             (2, 'N1', 'E2', 420), (2, 'N2', 'E3', 170), (2, 'N3', 'E4', 170)]
+    event.submit(1, 'N3', 'E3', -50)  # corrected to 50 below
+    event.submit(2, 'N4', 'E1', 620)  # deleted below
+    for result in final:
+        event.submit(*result)
+    event.delete(2, 'N4')
+    event.submit_contract(3, 'N4', 'E1', {'level': 3, 'denomination': 'NT', 'risk': ''}, 'N', 9, 'None')
+    final.append((3, 'N4', 'E1', 400))
+    try:
+        event.submit(1, 'N5', 'E1', 0)
+    except ValueError:
+        pass
+    else:
+        raise ValueError("A second result for E1 on board 1 was accepted")
+
+    boards, _, _, scores = zip(*final)
+    expected = matchpoints(list(boards), list(scores), 4)
+    for (board, ns_pair, ew_pair, _), mp in zip(final, expected):
+        live = event.board_matchpoints(board, ns_pair), event.board_matchpoints(board, ew_pair)
+        if abs(live[0] - mp) > 1e-9 or abs(live[1] - (3 - mp)) > 1e-9:
+            raise ValueError(f"Board {board} {ns_pair}-{ew_pair}: live {live}, expected {mp}, {3 - mp}")
+    totals = {pair: total for pair, total, _ in event.standings()}
+    if abs(totals['N4'] - 1.5) > 1e-9 or abs(totals['E1'] - 2) > 1e-9:
+        raise ValueError(f"Pair totals N4 {totals['N4']}, E1 {totals['E1']}, expected 1.5 and 2")
+    return True
@@ -0,0 +1,159 @@
+"""
+Matchpoint and cross-IMP scoring for pairs events.
+
+Results come in as flat NumPy arrays: the board each result was played on
+and its NS score (from ScoreCalculator or bridgeBatchScoring.score_many).
+Every board is ranked with one lexsort instead of comparing results
+pairwise, so scoring is O(n log n) in the number of results.
+
+Matchpoints are 1 per result beaten and 1/2 per tie, so the top on a board
+played n times is n - 1. EW matchpoints are top minus NS matchpoints and
+EW cross-IMPs are the negated NS cross-IMPs.
+"""
+
+import numpy as np
+
+from bridgeTeams import IMP_THRESHOLDS
+
+# Boards are packed into one sorted key: board rank * KEY_STRIDE + score + KEY_OFFSET
+KEY_OFFSET = 1 << 20
+KEY_STRIDE = 1 << 22
+MAX_SCORE = KEY_OFFSET - IMP_THRESHOLDS[-1]
+
+
+def _rank_boards(board, score):
+    """Sort results by (board, score); returns the order and group/run bounds in sorted position"""
+    board = np.asarray(board)
+    score = np.asarray(score, dtype=np.int64)
+    if board.shape != score.shape or board.ndim != 1:
+        raise ValueError("board and score must be 1-D arrays of the same length")
+    if score.size and np.abs(score).max() >= MAX_SCORE:
+        raise ValueError("score out of range")
+
+    order = np.lexsort((score, board))
+    sorted_board = board[order]
+    sorted_score = score[order]
+    n = len(order)
+    idx = np.arange(n)
+
+    new_board = np.ones(n, dtype=bool)
+    new_board[1:] = sorted_board[1:] != sorted_board[:-1]
+    new_run = new_board.copy()
+    new_run[1:] |= sorted_score[1:] != sorted_score[:-1]
+
+    # Start of each element's board group and score run, and the matching ends
+    group_start = np.maximum.accumulate(np.where(new_board, idx, 0))
+    run_start = np.maximum.accumulate(np.where(new_run, idx, 0))
+    group_end = _ends(new_board, n)
+    run_end = _ends(new_run, n)
+    return order, sorted_board, sorted_score, group_start, group_end, run_start, run_end
+
+
+def _ends(starts, n):
+    """Exclusive end of the run containing each position, given a run-start mask"""
+    start_idx = np.flatnonzero(starts)
+    bounds = np.append(start_idx[1:], n)
+    return np.repeat(bounds, np.diff(np.append(start_idx, n)))
+
+
+def _unsort(order, values):
+    out = np.empty_like(values)
+    out[order] = values
+    return out
+
+
+def board_counts(board):
+    """Number of results on each result's board"""
+    board = np.asarray(board)
+    _, inverse, counts = np.unique(board, return_inverse=True, return_counts=True)
+    return counts[inverse.reshape(board.shape)]
+
+
+def matchpoints(board, score, expected=None):
+    """NS matchpoints for every result.
+
+    Boards played fewer times than the others are Neuberg-adjusted to
+    the top of a board played `expected` times (default: the most results
+    on any board), so every board carries the same weight.
+    """
+    order, _, _, group_start, group_end, run_start, run_end = _rank_boards(board, score)
+    if not len(order):
+        return np.zeros(0)
+
+    below = run_start - group_start
+    ties = run_end - run_start - 1
+    played = group_end - group_start
+    mp = below + 0.5 * ties
+
+    if expected is None:
+        expected = played.max()
+    if np.any(played > expected):
+        raise ValueError("expected is smaller than the number of results on a board")
+    # Neuberg: (MP + 1/2) * N / n - 1/2
+    mp = np.where(played == expected, mp, (mp + 0.5) * expected / played - 0.5)
+    return _unsort(order, mp)
+
+
+def matchpoint_percentages(board, score, expected=None):
+    """NS matchpoints as a percentage of the top"""
+    mp = matchpoints(board, score, expected)
+    if expected is None:
+        expected = board_counts(board).max() if len(mp) else 1
+    top = max(expected - 1, 1)
+    return 100.0 * mp / top
+
+
+def cross_imps(board, score, average=False):
+    """NS cross-IMPs: each result IMPed against every other result on its board.
+
+    The IMP scale is a step function, so the total against a board is the
+    sum over IMP thresholds t of results at least t below minus results
+    at least t above. Each count is a searchsorted on the sorted board.
+    With average=True totals are divided by the number of comparisons.
+    """
+    order, sorted_board, sorted_score, group_start, group_end, _, _ = _rank_boards(board, score)
+    if not len(order):
+        return np.zeros(0)
+
+    board_rank = np.cumsum(np.r_[True, sorted_board[1:] != sorted_board[:-1]]) - 1
+    keys = board_rank * KEY_STRIDE + sorted_score + KEY_OFFSET
+
+    total = np.zeros(len(order), dtype=np.int64)
+    for t in IMP_THRESHOLDS:
+        at_most = np.searchsorted(keys, keys - t, side='right') - group_start
+        at_least = group_end - np.searchsorted(keys, keys + t, side='left')
+        total += at_most - at_least
+
+    if average:
+        comparisons = np.maximum(group_end - group_start - 1, 1)
+        return _unsort(order, total / comparisons)
+    return _unsort(order, total)
+
+
+def pair_totals(pair, values):
+    """Sum per-result values (matchpoints or cross-IMPs) by pair id; returns (pairs, totals)"""
+    pairs, inverse = np.unique(np.asarray(pair), return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=np.asarray(values, dtype=float), minlength=len(pairs))
+    return pairs, totals
+
+
+def verify_matchpoints():
+    """Check the scorers on a small hand-scored event, raises ValueError on mismatch"""
+    # Board 1 played 4 times, board 2 three times and board 3 once, results interleaved
+    board = np.array([2, 1, 3, 1, 2, 1, 2, 1])
+    score = np.array([170, 100, 0, 50, 420, -50, 170, 100])
+    pair = np.array(['B', 'A', 'A', 'C', 'A', 'D', 'C', 'B'])
+    checks = [
+        # Board 2 and 3 are Neuberg-adjusted to 4 results: (MP + 1/2) * 4 / n - 1/2
+        ('matchpoints', matchpoints(board, score), [5 / 6, 2.5, 1.5, 1, 17 / 6, 0, 5 / 6, 2.5]),
+        ('percentages', matchpoint_percentages(board, score),
+         [250 / 9, 250 / 3, 50, 100 / 3, 850 / 9, 0, 250 / 9, 250 / 3]),
+        # 420 beats 170 by 250 (6 IMPs); on board 1 differences of 50, 100 and 150 are 2, 3 and 4 IMPs
+        ('cross-IMPs', cross_imps(board, score), [-6, 6, 0, -1, 12, -11, -6, 6]),
+        ('averaged cross-IMPs', cross_imps(board, score, average=True), [-3, 2, 0, -1 / 3, 6, -11 / 3, -3, 2]),
+        ('pair totals', pair_totals(pair, matchpoints(board, score))[1], [41 / 6, 10 / 3, 11 / 6, 0]),
+    ]
+    for name, actual, expected in checks:
+        if not np.allclose(actual, expected):
+            raise ValueError(f"{name} {np.round(actual, 3).tolist()} != {np.round(expected, 3).tolist()}")
+    return True
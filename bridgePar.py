@@ -0,0 +1,232 @@
+"""
+Par scores and par contracts from a double-dummy trick table.
+
+The table is 20 trick counts, table[strain][declarer] in DENOMS and SEATS
+order (as returned by bridgeDoubleDummy.dd_table). Par is the result of
+the bidding game where each side may outbid the other and a contract
+that fails is doubled: the 35 contracts are walked from 7NT down and
+each keeps the NS score reached once it is bid, so the whole game is one
+backward pass over ScoreCalculator's score table. When both sides could
+open the bidding, the dealer's side bids first.
+
+Usage:
+    python bridgePar.py TRICKS [--dealer=N]
+
+TRICKS is 20 hex digits, the tricks for N, E, S and W in C, D, H, S, NT
+order for each strain in turn (e.g. the dd field of bridgeDDTables).
+"""
+
+import sys
+import json
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from bridgeClaudev2 import duplicate_score
+from bridgeEncoding import DENOMS, SEATS, SEAT_ID, SIDES
+
+VULNERABILITIES = ['None', 'NS', 'EW', 'All']
+CONTRACTS = [(level, strain) for level in range(1, 8) for strain in range(len(DENOMS))]
+SIDE_SEATS = [(0, 2), (1, 3)]
+
+# Tables (dealer N) with the par DDS reports for them, as Par strings
+PAR_CHECKS = [
+    ([[9, 4, 9, 4], [9, 4, 9, 4], [4, 9, 4, 9], [4, 9, 4, 9], [6, 6, 6, 6]], 'None', 'NS -100 4CX-NS-1, 4DX-NS-1'),
+    ([[9, 4, 9, 4], [9, 4, 9, 4], [4, 9, 4, 9], [4, 9, 4, 9], [6, 6, 6, 6]], 'All', 'NS -140 3H-EW=, 3S-EW='),
+    ([[7, 5, 7, 5], [5, 7, 5, 7], [6, 6, 6, 6], [9, 4, 9, 4], [7, 6, 7, 6]], 'None', 'NS 140 2S-NS+1'),
+    ([[10, 3, 10, 3], [10, 3, 10, 3], [2, 11, 2, 11], [3, 9, 4, 9], [6, 7, 6, 7]], 'None',
+     'NS -300 6CX-NS-2, 6DX-NS-2'),
+    ([[10, 3, 10, 3], [10, 3, 10, 3], [2, 11, 2, 11], [3, 9, 4, 9], [6, 7, 6, 7]], 'NS', 'NS -450 5H-EW='),
+    ([[4, 9, 4, 9], [9, 3, 9, 3], [5, 7, 5, 7], [9, 3, 9, 3], [5, 6, 5, 6]], 'None', 'NS 100 4CX-EW-1'),
+    ([[12, 0, 12, 0], [7, 6, 6, 6], [11, 2, 9, 2], [12, 0, 12, 0], [11, 0, 7, 0]], 'NS', 'NS 1430 6S-NS='),
+    ([[8, 5, 8, 5], [5, 8, 5, 7], [1, 12, 1, 11], [1, 12, 1, 11], [2, 8, 2, 8]], 'EW', 'NS -1100 7CX-NS-5'),
+    ([[5, 8, 5, 8], [12, 0, 12, 0], [12, 0, 12, 0], [5, 7, 5, 7], [9, 0, 9, 0]], 'NS',
+     'NS 1100 6SX-EW-5, 7CX-EW-5'),
+    ([[6] * 4 for _ in range(5)], 'All', 'NS 0'),
+]
+
+
+@dataclass
+class ParContract:
+    """One contract that reaches the par score"""
+    level: int
+    strain: str
+    risk: str
+    declarers: str  # every seat of the side that takes the most tricks, e.g. 'NS' or 'E'
+    tricks: int
+    score: int  # NS perspective
+
+    def __str__(self) -> str:
+        diff = self.tricks - self.level - 6
+        return f"{self.level}{self.strain}{self.risk}-{self.declarers}{'=' if diff == 0 else f'{diff:+d}'}"
+
+
+@dataclass
+class Par:
+    """Par score from NS's side, the side entitled to it and the contracts that reach it"""
+    score: int
+    side: str  # 'NS', 'EW' or '' when the board should be passed out
+    contracts: List[ParContract] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        text = f"NS {self.score}"
+        if self.contracts:
+            text += ' ' + ', '.join(str(c) for c in self.contracts)
+        return text
+
+
+def validate_table(table: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Check a trick table is 5 strains by 4 declarers of 0-13, returns it as lists"""
+    rows = [list(row) for row in table]
+    if len(rows) != len(DENOMS) or any(len(row) != len(SEATS) for row in rows):
+        raise ValueError("Trick table must have 5 strains of 4 declarers")
+    for row in rows:
+        for tricks in row:
+            if not isinstance(tricks, int) or not 0 <= tricks <= 13:
+                raise ValueError(f"Invalid trick count: {tricks}")
+    return rows
+
+
+def parse_table(text: str) -> List[List[int]]:
+    """Trick table from 20 hex digits, N E S W for each strain in DENOMS order"""
+    if len(text) != 20:
+        raise ValueError("Trick table must be 20 hex digits")
+    try:
+        tricks = [int(c, 16) for c in text]
+    except ValueError:
+        raise ValueError(f"Invalid trick table: {text}")
+    return validate_table([tricks[i:i + 4] for i in range(0, 20, 4)])
+
+
+def table_from_dict(dd: Dict[str, Dict[str, int]]) -> List[List[int]]:
+    """Trick table from {strain: {declarer: tricks}}, the dd field of bridgeDDTables output"""
+    try:
+        return validate_table([[dd[denom][seat] for seat in SEATS] for denom in DENOMS])
+    except KeyError as e:
+        raise ValueError(f"Trick table is missing {e.args[0]}")
+
+
+def calculate_par(table: Sequence[Sequence[int]], vulnerable: str = 'None', dealer: str = 'N') -> Par:
+    """Par for one vulnerability ('None', 'NS', 'EW', 'All')"""
+    if vulnerable not in VULNERABILITIES:
+        raise ValueError(f"Invalid vulnerability: {vulnerable}")
+    if dealer not in SEAT_ID:
+        raise ValueError(f"Invalid dealer: {dealer}")
+    table = validate_table(table)
+    best = [[max(row[seat] for seat in seats) for row in table] for seats in SIDE_SEATS]
+    vul = [vulnerable in ('NS', 'All'), vulnerable in ('EW', 'All')]
+
+    # outcome[i][side]: NS score if side plays contract i, doubled when it fails
+    outcome = []
+    for level, strain in CONTRACTS:
+        scores = []
+        for side in (0, 1):
+            tricks = best[side][strain]
+            risk = '' if tricks >= level + 6 else 'X'
+            pts = duplicate_score(level, DENOMS[strain], risk, vul[side], tricks)
+            scores.append(pts if side == 0 else -pts)
+        outcome.append(scores)
+
+    # value[i][side]: NS score once side has bid contract i and both sides play on perfectly.
+    # NS want it high and EW low; the other side passes unless a higher bid does better for them.
+    sign = (1, -1)
+    value = [None] * len(CONTRACTS)
+    above = [None, None]  # best value either side can reach by bidding above the current contract
+    for i in reversed(range(len(CONTRACTS))):
+        row = []
+        for side in (0, 1):
+            other = 1 - side
+            v = outcome[i][side]
+            if above[other] is not None and sign[other] * above[other] > sign[other] * v:
+                v = above[other]
+            row.append(v)
+        value[i] = row
+        for side in (0, 1):
+            if above[side] is None or sign[side] * row[side] > sign[side] * above[side]:
+                above[side] = row[side]
+
+    # The dealer's side may open; if they pass, the other side may open or pass it back
+    first = SEAT_ID[dealer] & 1
+    second = 1 - first
+    first_open, second_open = above[first], above[second]
+    back = max(sign[first] * first_open, 0) * sign[first]
+    wait = second_open if sign[second] * second_open > sign[second] * back else back
+    score = first_open if sign[first] * first_open >= sign[first] * wait else wait
+
+    if score == 0:
+        return Par(0, '')
+    return Par(score, SIDES[score < 0], _par_contracts(table, best, outcome, score))
+
+
+def _par_contracts(table, best, outcome, score) -> List[ParContract]:
+    """Lowest contract in each strain that ends the auction at the par score.
+
+    The other side would bid up to the highest contract whose result beats
+    par for them, so a par contract, making or sacrifice, has to take that
+    contract away from them; any lower contract with the same score would
+    be outbid.
+    """
+    sign = (1, -1)
+    floor = [0, 0]  # contracts by side must be bid at or above floor[side]
+    for side in (0, 1):
+        other = 1 - side
+        for i in range(len(CONTRACTS)):
+            if sign[other] * outcome[i][other] > sign[other] * score:
+                floor[side] = i
+
+    contracts = []
+    seen = set()
+    for i, (level, strain) in enumerate(CONTRACTS):
+        for side in (0, 1):
+            if i < floor[side] or (side, strain) in seen or outcome[i][side] != score:
+                continue
+            seen.add((side, strain))
+            tricks = best[side][strain]
+            declarers = ''.join(SEATS[seat] for seat in SIDE_SEATS[side] if table[strain][seat] == tricks)
+            risk = '' if tricks >= level + 6 else 'X'
+            contracts.append(ParContract(level, DENOMS[strain], risk, declarers, tricks, score))
+    return contracts
+
+
+def verify_par():
+    """Check calculate_par against PAR_CHECKS, raises ValueError on mismatch"""
+    for table, vulnerable, expected in PAR_CHECKS:
+        actual = str(calculate_par(table, vulnerable))
+        if actual != expected:
+            raise ValueError(f"Par mismatch for {table} vul={vulnerable}: {actual} != {expected}")
+    return True
+
+
+def calculate_par_all(table: Sequence[Sequence[int]], dealer: str = 'N') -> Dict[str, Par]:
+    """Par for each of the four vulnerabilities"""
+    return {vul: calculate_par(table, vul, dealer) for vul in VULNERABILITIES}
+
+
+def load_dd_tables(filepath: str) -> Dict[Tuple[str, int], List[List[int]]]:
+    """Trick tables from bridgeDDTables JSONL output, keyed by (file name, game index)"""
+    tables = {}
+    with open(filepath, 'r', encoding='utf-8') as file:
+        for line in file:
+            record = json.loads(line)
+            if 'dd' in record and 'file' in record:
+                tables[(record['file'], record['game'])] = table_from_dict(record['dd'])
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Par scores from a double-dummy trick table')
+    parser.add_argument('tricks', help='20 hex digits: N E S W tricks for C, D, H, S, NT in turn')
+    parser.add_argument('--dealer', default='N', help='Dealer (N, E, S, W)')
+    args = parser.parse_args()
+
+    try:
+        results = calculate_par_all(parse_table(args.tricks), args.dealer)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    for vul, par in results.items():
+        print(f"{vul:>4}: {par}")
+
+
+if __name__ == '__main__':
+    main()
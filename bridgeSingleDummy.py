@@ -0,0 +1,432 @@
+"""
+Monte Carlo single-dummy analysis.
+
+Declarer sees their own hand, dummy and every card played. The analysis
+deals the unseen cards between the defenders at random (respecting the
+suits each defender has shown out of), solves every layout double-dummy
+with bridgeDoubleDummy and summarises the tricks and expected score for
+each candidate: the cards declarer or dummy could play next, or a list
+of contracts before the opening lead.
+
+Layout i is always drawn from the seed string "<seed>:<i>", and samples
+are taken in fixed-size batches with the stopping rule checked between
+batches, so a report only depends on the seed - not on how many worker
+processes solved it.
+
+Layouts are solved with DDS when endplay is installed (see
+bridgeDoubleDummy). Otherwise each worker keeps one pure-Python solver
+per trump suit across samples; its table entries depend only on the
+cards that matter, so they stay valid from one layout to the next. Card
+analysis in the later tricks takes milliseconds per layout either way,
+but contract analysis needs a full-deal solve per strain and layout: about 0.1-0.3 s
+with DDS (some 30 s for 100 layouts of two strains on one core) and
+minutes each without it. Any analysis of hands longer than
+PYTHON_MAX_CARDS therefore needs endplay for more than a handful of
+samples; without it the analysis warns before it starts.
+
+Usage:
+    python bridgeSingleDummy.py DEAL --declarer=S --contracts 3NT 4S [--vulnerable=None]
+                                [--samples=100] [--seed=0] [--jobs=N] [--tolerance=0.25]
+
+Only declarer's and dummy's hands are read from DEAL.
+"""
+
+import os
+import sys
+import math
+import random
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from bridgeClaudev2 import duplicate_score
+from bridgeDoubleDummy import HAVE_NATIVE, PYTHON_MAX_CARDS, DoubleDummySolver, solve_deal
+from bridgeEncoding import (
+    CARD_BIT, CARD_SUIT, CARDS, DENOMS, LHO, PARTNER, SEAT_ID, SEAT_SIDE, SEATS,
+    SUIT_ID, SUIT_MASK, SUITS, cards_to_mask, masks_to_pbn, parse_pbn_deal,
+)
+
+BATCH_SIZE = 32  # samples between stopping checks; fixed so results don't depend on the worker count
+Z_95 = 1.96
+MAX_SOLVER_BUCKETS = 200000  # clear a worker's table past this many buckets
+
+
+@dataclass
+class Position:
+    """What declarer knows: their own and dummy's cards, the defenders' combined cards and the play so far"""
+    declarer: int
+    trump: Optional[str]
+    known: List[int]  # masks by seat id; the defenders' entries are 0
+    unseen: int  # cards the two defenders hold between them
+    counts: List[int]  # cards each seat still holds
+    voids: List[int]  # suit ids each seat has shown out of, as a 4-bit mask
+    leader: int
+    trick: List[Tuple[int, int]] = field(default_factory=list)
+    tricks_won: int = 0  # tricks the declaring side has already taken
+
+    @property
+    def to_move(self) -> int:
+        return (self.leader + len(self.trick)) % 4
+
+
+def position_from_bridge(bridge) -> Position:
+    """Declarer's view of a Bridge game in its play phase"""
+    if bridge.current_phase != 'Play':
+        raise ValueError("Can only analyse a game in play phase")
+    declarer = SEAT_ID[bridge.declarers[-1]]
+    masks = getattr(bridge.hands, 'masks', None)
+    if masks is None:
+        masks = [cards_to_mask(bridge.hands[seat]) for seat in SEATS]
+    known = [0, 0, 0, 0]
+    for seat in (declarer, PARTNER[declarer]):
+        known[seat] = masks[seat]
+    defenders = (LHO[declarer], PARTNER[LHO[declarer]])
+
+    # A defender who did not follow suit is void in the suit led
+    voids = [0, 0, 0, 0]
+    for trick in bridge.tricks:
+        if not trick.card_ids:
+            continue
+        lead = CARD_SUIT[trick.card_ids[0]]
+        for seat, card in zip(trick.seat_ids, trick.card_ids):
+            if CARD_SUIT[card] != lead:
+                voids[seat] |= 1 << lead
+
+    trick = bridge.current_trick
+    return Position(
+        declarer=declarer,
+        trump=trick.trump,
+        known=known,
+        unseen=masks[defenders[0]] | masks[defenders[1]],
+        counts=[bin(m).count('1') for m in masks],
+        voids=voids,
+        leader=trick.leader_id,
+        trick=list(zip(trick.seat_ids, trick.card_ids)),
+        tricks_won=bridge.play.declarer_tricks,
+    )
+
+
+def opening_position(declarer_hand: int, dummy_hand: int, declarer: int) -> Position:
+    """Declarer's view before the opening lead, trump set per contract"""
+    if declarer_hand & dummy_hand:
+        raise ValueError("Declarer and dummy share cards")
+    known = [0, 0, 0, 0]
+    known[declarer] = declarer_hand
+    known[PARTNER[declarer]] = dummy_hand
+    counts = [13, 13, 13, 13]
+    counts[declarer] = bin(declarer_hand).count('1')
+    counts[PARTNER[declarer]] = bin(dummy_hand).count('1')
+    if counts[declarer] != 13 or counts[PARTNER[declarer]] != 13:
+        raise ValueError("Declarer and dummy must hold 13 cards each")
+    unseen = ((1 << 52) - 1) ^ declarer_hand ^ dummy_hand
+    return Position(declarer, None, known, unseen, counts, [0, 0, 0, 0], LHO[declarer])
+
+
+def sample_layout(position: Position, rng: random.Random) -> List[int]:
+    """Deal the unseen cards to the defenders at random, consistent with their voids"""
+    a = LHO[position.declarer]
+    b = PARTNER[a]
+    to_a, to_b, free = [], [], []
+    for card in _card_ids(position.unseen):
+        suit_bit = 1 << CARD_SUIT[card]
+        if position.voids[a] & suit_bit:
+            if position.voids[b] & suit_bit:
+                raise ValueError(f"Both defenders are void in {SUITS[CARD_SUIT[card]]} but it is unseen")
+            to_b.append(card)
+        elif position.voids[b] & suit_bit:
+            to_a.append(card)
+        else:
+            free.append(card)
+    need = position.counts[a] - len(to_a)
+    if need < 0 or need > len(free) or len(to_b) + len(free) - need != position.counts[b]:
+        raise ValueError("Unseen cards do not fit the defenders' hands")
+    rng.shuffle(free)
+    masks = list(position.known)
+    masks[a] = sum(CARD_BIT[c] for c in to_a + free[:need])
+    masks[b] = sum(CARD_BIT[c] for c in to_b + free[need:])
+    return masks
+
+
+def _card_ids(mask: int) -> List[int]:
+    """Card ids set in a mask, lowest first"""
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def legal_cards(position: Position) -> List[int]:
+    """Cards the player to move (declarer or dummy) may play"""
+    seat = position.to_move
+    if seat not in (position.declarer, PARTNER[position.declarer]):
+        raise ValueError(f"{SEATS[seat]} is a defender; only declarer's or dummy's cards can be analysed")
+    hand = position.known[seat]
+    if position.trick:
+        follow = hand & SUIT_MASK[CARD_SUIT[position.trick[0][1]]]
+        if follow:
+            hand = follow
+    return _card_ids(hand)
+
+
+# -- per-sample solving (runs in worker processes) ----------------------------
+
+_solvers = {}
+
+
+def _solver(trump: Optional[str]) -> DoubleDummySolver:
+    solver = _solvers.get(trump)
+    if solver is None or len(solver.tt) > MAX_SOLVER_BUCKETS:
+        solver = _solvers[trump] = DoubleDummySolver(trump)
+    return solver
+
+
+def _solve(trump: Optional[str], hands: List[int], leader: int, trick=()) -> int:
+    """Tricks for the side to move: DDS when endplay is installed, else this worker's cached solver"""
+    if HAVE_NATIVE:
+        return solve_deal(hands, trump, leader, trick, native=True)
+    return _solver(trump).solve(hands, leader, trick)
+
+
+def _trick_winner(trick, trump_id):
+    lead = CARD_SUIT[trick[0][1]]
+    best_seat, best_key = -1, -2
+    for seat, card in trick:
+        suit = CARD_SUIT[card]
+        key = 26 + card % 13 if suit == trump_id else 13 + card % 13 if suit == lead else -1
+        if key > best_key:
+            best_seat, best_key = seat, key
+    return best_seat
+
+
+def _card_tricks(position: Position, masks: List[int], cards: Sequence[int]) -> List[int]:
+    """Declaring side's total tricks after each candidate card, in one layout"""
+    seat = position.to_move
+    side = SEAT_SIDE[position.declarer]
+    remaining = bin(masks[seat]).count('1')  # tricks left, counting the current one
+    trump_id = SUIT_ID[position.trump] if position.trump else -1
+    totals = []
+    for card in cards:
+        hand = list(masks)
+        hand[seat] ^= CARD_BIT[card]
+        trick = position.trick + [(seat, card)]
+        if len(trick) == 4:
+            winner = _trick_winner(trick, trump_id)
+            won = SEAT_SIDE[winner] == side
+            later = _solve(position.trump, hand, winner) if remaining > 1 else 0
+            tricks = won + (later if SEAT_SIDE[winner] == side else remaining - 1 - later)
+        else:
+            r = _solve(position.trump, hand, position.leader, trick)
+            tricks = r if SEAT_SIDE[(seat + 1) % 4] == side else remaining - r
+        totals.append(position.tricks_won + tricks)
+    return totals
+
+
+def _contract_tricks(position: Position, masks: List[int], strains: Sequence[str]) -> List[int]:
+    """Declarer's tricks in each strain, in one layout"""
+    results = {}
+    for strain in strains:
+        if strain not in results:
+            results[strain] = 13 - _solve(None if strain == 'NT' else strain, masks, LHO[position.declarer])
+    return [results[strain] for strain in strains]
+
+
+def _run_sample(task):
+    kind, position, candidates, seed, index = task
+    masks = sample_layout(position, random.Random(f"{seed}:{index}"))
+    if kind == 'cards':
+        return _card_tricks(position, masks, candidates)
+    return _contract_tricks(position, masks, candidates)
+
+
+# -- reporting -----------------------------------------------------------------
+
+@dataclass
+class CandidateStats:
+    """Trick distribution and expected score for one candidate card or contract"""
+    name: str
+    scores: List[int]  # declarer's score by total tricks taken, 0-13
+    counts: List[int] = field(default_factory=lambda: [0] * 14)
+
+    def add(self, tricks: int):
+        self.counts[tricks] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def mean_tricks(self) -> float:
+        n = self.samples
+        return sum(t * c for t, c in enumerate(self.counts)) / n if n else 0.0
+
+    @property
+    def expected_score(self) -> float:
+        n = self.samples
+        return sum(s * c for s, c in zip(self.scores, self.counts)) / n if n else 0.0
+
+    def half_width(self) -> float:
+        """Half-width of the 95% confidence interval on mean tricks"""
+        n = self.samples
+        if n < 2:
+            return math.inf
+        mean = self.mean_tricks
+        var = sum(c * (t - mean) ** 2 for t, c in enumerate(self.counts)) / (n - 1)
+        return Z_95 * math.sqrt(var / n)
+
+    def distribution(self) -> List[float]:
+        """Share of samples taking each number of tricks, 0-13"""
+        n = self.samples or 1
+        return [c / n for c in self.counts]
+
+
+@dataclass
+class SingleDummyReport:
+    samples: int
+    stopped_early: bool
+    candidates: List[CandidateStats]
+
+    def best(self) -> CandidateStats:
+        return max(self.candidates, key=lambda c: c.expected_score)
+
+
+def _analyse(kind, position, candidates, stats, samples, seed, jobs, tolerance, min_samples) -> SingleDummyReport:
+    cards = max(position.counts)
+    if not HAVE_NATIVE and cards > PYTHON_MAX_CARDS:
+        warnings.warn(f"endplay is not installed, so each {cards}-card layout uses the pure-Python search and "
+                      f"takes minutes; keep samples to a handful or pip install endplay",
+                      RuntimeWarning, stacklevel=3)
+    jobs = jobs or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    done = 0
+    try:
+        while done < samples:
+            batch = min(BATCH_SIZE, samples - done)
+            tasks = [(kind, position, candidates, seed, i) for i in range(done, done + batch)]
+            for row in (pool.map(_run_sample, tasks) if pool else map(_run_sample, tasks)):
+                for st, tricks in zip(stats, row):
+                    st.add(tricks)
+            done += batch
+            if done >= min_samples and all(st.half_width() <= tolerance for st in stats):
+                break
+    finally:
+        if pool:
+            pool.shutdown()
+    return SingleDummyReport(done, done < samples, stats)
+
+
+def parse_contract(contract: str) -> Tuple[int, str, str]:
+    """'4S', '3NTX' etc. to (level, strain, risk)"""
+    if len(contract) < 2 or not contract[0] in '1234567':
+        raise ValueError(f"Invalid contract: {contract}")
+    strain = 'NT' if contract[1:3] == 'NT' else contract[1]
+    risk = contract[1 + len(strain):]
+    if strain not in DENOMS or risk not in ('', 'X', 'XX'):
+        raise ValueError(f"Invalid contract: {contract}")
+    return int(contract[0]), strain, risk
+
+
+def analyse_contracts(declarer_hand: int, dummy_hand: int, declarer: str, contracts: Sequence[str],
+                      vulnerable: bool = False, samples: int = 100, seed: int = 0, jobs: Optional[int] = 1,
+                      tolerance: float = 0.25, min_samples: int = BATCH_SIZE) -> SingleDummyReport:
+    """Tricks and expected score for each candidate contract before the opening lead.
+
+    vulnerable is whether declarer's side is vulnerable. Sampling stops
+    once every contract's 95% interval on mean tricks is within
+    tolerance, or after samples layouts. Every layout costs one
+    full-deal solve per distinct strain, so more than a handful of
+    samples needs the native DDS backend (endplay); without it this
+    warns and each layout takes minutes.
+    """
+    if declarer not in SEAT_ID:
+        raise ValueError(f"Invalid declarer: {declarer}")
+    position = opening_position(declarer_hand, dummy_hand, SEAT_ID[declarer])
+    stats, strains = [], []
+    for contract in contracts:
+        level, strain, risk = parse_contract(contract)
+        stats.append(CandidateStats(contract, [duplicate_score(level, strain, risk, vulnerable, t)
+                                               for t in range(14)]))
+        strains.append(strain)
+    return _analyse('contracts', position, strains, stats, samples, seed, jobs, tolerance, min_samples)
+
+
+def analyse_cards(bridge, samples: int = 100, seed: int = 0, jobs: Optional[int] = 1,
+                  tolerance: float = 0.25, min_samples: int = BATCH_SIZE) -> SingleDummyReport:
+    """Tricks and expected score for each card declarer or dummy can play next in a Bridge game"""
+    position = position_from_bridge(bridge)
+    contract = bridge.contracts[-1]
+    declarer_side = 'NS' if SEAT_SIDE[position.declarer] == 0 else 'EW'
+    vulnerable = bridge.vulnerable in ('All', declarer_side)
+    scores = [duplicate_score(contract['level'], contract['denomination'], contract['risk'], vulnerable, t)
+              for t in range(14)]
+    cards = legal_cards(position)
+    stats = [CandidateStats(CARDS[c], scores) for c in cards]
+    return _analyse('cards', position, cards, stats, samples, seed, jobs, tolerance, min_samples)
+
+
+def verify_single_dummy():
+    """Check sampling and card analysis on a finesse ending with known odds, raises ValueError on mismatch"""
+    south, west = SEAT_ID['S'], SEAT_ID['W']
+    known = [cards_to_mask(['SA', 'SQ']), 0, cards_to_mask(['S2', 'S3']), 0]
+    unseen = cards_to_mask(['SK', 'S4', 'H2', 'H3'])
+
+    def finesse(voids, min_samples):
+        position = Position(south, None, known, unseen, [2, 2, 2, 2], voids, south)
+        cards = legal_cards(position)
+        stats = [CandidateStats(CARDS[c], [0] * 14) for c in cards]
+        return position, _analyse('cards', position, cards, stats, 192, 0, 1, 0.0, min_samples)
+
+    # Of the 6 layouts, South takes 2 tricks unless East holds SK4 (the finesse loses and the king is guarded)
+    _, report = finesse([0, 0, 0, 0], 192)
+    for st in report.candidates:
+        if abs(st.mean_tricks - 11 / 6) > 0.1:
+            raise ValueError(f"Finesse ending: {st.name} averages {st.mean_tricks:.3f} tricks, expected about 1.833")
+
+    # Once West has shown out of hearts they hold both spades, so the finesse always works
+    # and sampling stops after the first batch
+    position, report = finesse([0, 0, 0, 1 << SUIT_ID['H']], BATCH_SIZE)
+    for i in range(20):
+        masks = sample_layout(position, random.Random(f"0:{i}"))
+        if masks[west] != cards_to_mask(['SK', 'S4']):
+            raise ValueError(f"West was dealt {masks_to_pbn(masks)} after showing out of hearts")
+    if report.samples != BATCH_SIZE or any(st.mean_tricks != 2 for st in report.candidates):
+        raise ValueError(f"Finesse ending with West void in hearts: {report.samples} samples, "
+                         f"{[st.mean_tricks for st in report.candidates]} tricks, expected {BATCH_SIZE} and 2")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo single-dummy analysis of candidate contracts')
+    parser.add_argument('deal', help='PBN deal; only declarer and dummy are used')
+    parser.add_argument('--declarer', required=True, help='Declarer (N, E, S, W)')
+    parser.add_argument('--contracts', nargs='+', required=True, help='Candidate contracts, e.g. 3NT 4S')
+    parser.add_argument('--vulnerable', default='None', help="Vulnerability ('None', 'NS', 'EW', 'All')")
+    parser.add_argument('--samples', type=int, default=100, help='Most layouts to sample (more than a handful needs endplay)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Stop when every 95%% interval is this tight')
+    args = parser.parse_args()
+
+    try:
+        hands = parse_pbn_deal(args.deal)
+        seat = SEAT_ID[args.declarer]
+        side = 'NS' if SEAT_SIDE[seat] == 0 else 'EW'
+        report = analyse_contracts(hands[seat], hands[PARTNER[seat]], args.declarer, args.contracts,
+                                   args.vulnerable in ('All', side), args.samples, args.seed,
+                                   args.jobs, args.tolerance)
+    except (KeyError, ValueError) as e:
+        print(f"Analysis failed: {e}")
+        sys.exit(1)
+
+    print(f"{report.samples} layouts{' (stopped early)' if report.stopped_early else ''}")
+    for st in report.candidates:
+        dist = ' '.join(f"{t}:{p:.0%}" for t, p in enumerate(st.distribution()) if p)
+        print(f"  {st.name:>5}: {st.mean_tricks:.2f} tricks (±{st.half_width():.2f}), "
+              f"expected score {st.expected_score:+.0f}  [{dist}]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Streaming reader for parsed-games JSONL.
+
+Games are yielded one at a time as soon as the next game (or the end of
+the file) closes them, so memory stays flat and callers can start work
+on the first board of a dump of any size. The parser writes compact JSON
+with 'type' first, so each line is classified by its prefix: directives,
+comments and unwanted tags are skipped without decoding, and only the
+requested tags go through json.loads. Lines written any other way are
+decoded and classified normally.
+
+Every game marker yields a game, even one with none of the requested
+tags ({}), so game indexes count markers exactly as bridgeBoardIndex
+and bridgeCorpus do. The readers this replaced dropped such games, which
+shifted the indexes of the games after them; the validator now reports
+them as missing their required tags instead.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GAME_PREFIX = '{"type":"game"'
+TAG_PREFIX = '{"type":"tag","name":"'
+TYPE_PREFIX = '{"type":"'
+
+
+def tag_prefixes(tags: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(f'{TAG_PREFIX}{name}"' for name in tags)
+
+
+def parse_games(lines: Iterable[str], tags: Optional[Iterable[str]] = None,
+                source: str = '') -> Iterator[Dict[str, Dict]]:
+    """Yield each game in a sequence of JSONL lines as {tag name: tag object}, keeping only tags (all when None).
+
+    A game with none of the requested tags is yielded as {}, not skipped.
+    """
+    wanted = set(tags) if tags is not None else None
+    prefixes = tag_prefixes(wanted) if wanted is not None else (TAG_PREFIX,)
+    game = None
+    for line_num, line in enumerate(lines, 1):
+        if line.startswith(GAME_PREFIX):
+            obj = {'type': 'game'}
+        elif line.startswith(prefixes):
+            obj = None
+        elif line.startswith(TYPE_PREFIX) or not line.strip():
+            continue  # directive, comment or a tag nobody asked for
+        else:
+            obj = None
+        if obj is None:
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Invalid JSON in {source}:{line_num}: {e}")
+                continue
+
+        if obj.get('type') == 'game':
+            if game is not None:
+                yield game
+            game = {}
+        elif obj.get('type') == 'tag' and game is not None:
+            name = obj.get('name')
+            if wanted is None or name in wanted:
+                game[name] = obj
+    if game is not None:
+        yield game
+
+
+def stream_games(filepath, tags: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Dict]]:
+    """Yield each game in a file as {tag name: tag object}, keeping only tags (all when None)"""
+    with open(filepath, 'r', encoding='utf-8') as file:
+        yield from parse_games(file, tags, str(filepath))
+
+
+def stream_corpus(data_dir: str = 'parsed-games', tags: Optional[Iterable[str]] = None,
+                  file_filter: Optional[str] = None) -> Iterator[Tuple[str, int, Dict[str, Dict]]]:
+    """Yield (file name, game index, game) for every game in a directory, file by file in name order"""
+    for filepath in sorted(Path(data_dir).glob('*.jsonl')):
+        if file_filter and file_filter not in filepath.name:
+            continue
+        for index, game in enumerate(stream_games(filepath, tags)):
+            yield filepath.name, index, game
+
+
+def iter_corpus_deals(data_dir: str = 'parsed-games') -> Iterator[Dict]:
+    """Yield {'file', 'game', 'board', 'deal'} for every game with a Deal tag"""
+    for name, index, game in stream_corpus(data_dir, ('Board', 'Deal')):
+        deal = game.get('Deal')
+        if deal is not None:
+            yield {'file': name, 'game': index, 'board': game.get('Board', {}).get('value', ''),
+                   'deal': deal['value']}
+
+
+def verify_stream():
+    """Check tag filtering, non-compact lines and empty games on a small dump, raises ValueError on mismatch"""
+    def tag(name, value):
+        return {'type': 'tag', 'name': name, 'value': value}
+
+    def compact(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+    board, deal, dealer, event = tag('Board', '1'), tag('Deal', 'N:...'), tag('Dealer', 'N'), tag('Event', 'E')
+    contract = tag('Contract', '4S')
+    lines = [compact({'type': 'directive', 'text': 'PBN 2.1'}),
+             compact({'type': 'game'}), compact(board), compact(dealer), compact(deal),
+             compact({'type': 'comment', 'text': '{"type":"tag","name":"Board"}'}),
+             json.dumps({'name': 'Contract', 'value': '4S', 'type': 'tag'}),  # not compact, type last
+             '',
+             compact({'type': 'game'}), compact(event),
+             compact({'type': 'game'})]
+    checks = [
+        # 'Deal' must not pick up 'Dealer'; the second game has none of the tags and the third none at all
+        (('Board', 'Deal', 'Contract'), [{'Board': board, 'Deal': deal, 'Contract': contract}, {}, {}]),
+        (None, [{'Board': board, 'Dealer': dealer, 'Deal': deal, 'Contract': contract}, {'Event': event}, {}]),
+    ]
+    for tags, expected in checks:
+        games = list(parse_games(lines, tags))
+        if games != expected:
+            raise ValueError(f"parse_games with tags={tags} gave {games}, expected {expected}")
+    return True
@@ -0,0 +1,247 @@
+"""
+IMP team-match scoring over parsed PBN files.
+
+Boards are keyed by (event, segment, board). The first room seen waits in
+a dict until the other room arrives, then the pair is scored in IMPs and
+added to its segment and match totals, so the corpus is read in a single
+streaming pass. A room that turns up twice for one board is counted as
+a duplicate and its first result kept. The home team sits NS in the Open
+room and EW in the Closed room; IMPs are reported from the home team's
+side.
+
+Usage:
+    python bridgeTeams.py [--data-dir=parsed-games] [--boards]
+"""
+
+import sys
+import time
+import argparse
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bridgeClaudev2 import ScoreCalculator
+from bridgeStream import stream_games
+
+# Lower bound of each IMP step: 20-40 is 1 IMP, ..., 4000+ is 24 IMPs
+IMP_THRESHOLDS = [20, 50, 90, 130, 170, 220, 270, 320, 370, 430, 500, 600,
+                  750, 900, 1100, 1300, 1500, 1750, 2000, 2250, 2500, 3000, 3500, 4000]
+
+MATCH_TAGS = {'Event', 'Site', 'Board', 'Room', 'HomeTeam', 'VisitTeam',
+              'Vulnerable', 'Declarer', 'Contract', 'Result', 'Score'}
+
+
+def imps(diff: int) -> int:
+    """Convert a score difference to IMPs, keeping its sign"""
+    steps = bisect_right(IMP_THRESHOLDS, abs(diff))
+    return steps if diff >= 0 else -steps
+
+
+def ns_score(board: Dict[str, str]) -> int:
+    """NS score of a board from its Score tag, or from the contract if the tag is empty"""
+    score = board.get('Score', '')
+    if score:
+        side, pts = score.split()
+        return int(pts) if side == 'NS' else -int(pts)
+    contract = board.get('Contract', '')
+    if not contract or contract == 'Pass':
+        return 0
+    level = int(contract[0])
+    denom = 'NT' if contract[1:3] == 'NT' else contract[1]
+    risk = contract[1 + len(denom):]
+    calc = ScoreCalculator({'level': level, 'denomination': denom, 'risk': risk},
+                           board.get('Declarer'), int(board.get('Result') or 0), board.get('Vulnerable'))
+    return int(calc.pbn_score().split()[1])
+
+
+def iter_boards(filepath: Path) -> Iterator[Dict[str, str]]:
+    """Yield each board in a JSONL file as {tag name: value}, keeping only MATCH_TAGS"""
+    for game in stream_games(filepath, MATCH_TAGS):
+        yield {name: tag.get('value', '') for name, tag in game.items()}
+
+
+@dataclass
+class BoardComparison:
+    """One board played in both rooms"""
+    event: str
+    segment: str
+    board: int
+    open_score: int
+    closed_score: int
+
+    @property
+    def imps(self) -> int:
+        """IMPs to the home team (NS in the Open room)"""
+        return imps(self.open_score - self.closed_score)
+
+
+@dataclass
+class SegmentTotal:
+    """IMP totals for one segment of a match"""
+    event: str
+    segment: str
+    home_team: str
+    visit_team: str
+    boards: int = 0
+    home_imps: int = 0
+    visit_imps: int = 0
+
+    def add(self, board_imps: int):
+        self.boards += 1
+        if board_imps > 0:
+            self.home_imps += board_imps
+        else:
+            self.visit_imps -= board_imps
+
+
+@dataclass
+class MatchTotal:
+    """IMP totals for a whole match, summed over its segments"""
+    event: str
+    home_team: str
+    visit_team: str
+    segments: List[str] = field(default_factory=list)
+    boards: int = 0
+    home_imps: int = 0
+    visit_imps: int = 0
+
+    def add(self, segment: str, board_imps: int):
+        if segment not in self.segments:
+            self.segments.append(segment)
+        self.boards += 1
+        if board_imps > 0:
+            self.home_imps += board_imps
+        else:
+            self.visit_imps -= board_imps
+
+
+class TeamMatchScorer:
+    """Pairs Open and Closed room results and accumulates IMP totals in one pass."""
+
+    ROOMS = ('Open', 'Closed')
+
+    def __init__(self):
+        self.pending: Dict[Tuple[str, str, str], Tuple[str, int]] = {}
+        self.comparisons: List[BoardComparison] = []
+        self.segments: Dict[Tuple[str, str], SegmentTotal] = {}
+        self.matches: Dict[Tuple[str, str, str], MatchTotal] = {}
+        self.paired = set()
+        self.skipped = 0
+        self.duplicates = 0  # room results for a board whose room was already seen
+
+    def add_board(self, board: Dict[str, str], segment: str,
+                  home_team: str = '', visit_team: str = '') -> Optional[BoardComparison]:
+        """Add one room's result, returns the comparison once both rooms are in"""
+        room = board.get('Room')
+        if room not in self.ROOMS or not board.get('Board'):
+            self.skipped += 1
+            return None
+        event = board.get('Event', '')
+        key = (event, segment, board['Board'])
+        score = ns_score(board)
+
+        other = self.pending.get(key)
+        if key in self.paired or (other is not None and other[0] == room):
+            self.duplicates += 1  # keep the first result for the room
+            return None
+        if other is None:
+            self.pending[key] = (room, score)
+            return None
+        del self.pending[key]
+        self.paired.add(key)
+
+        open_score, closed_score = (score, other[1]) if room == 'Open' else (other[1], score)
+        comparison = BoardComparison(event, segment, int(board['Board']), open_score, closed_score)
+        self.comparisons.append(comparison)
+
+        seg_total = self.segments.get((event, segment))
+        if seg_total is None:
+            seg_total = self.segments[(event, segment)] = SegmentTotal(event, segment, home_team, visit_team)
+        match_total = self.matches.get((event, home_team, visit_team))
+        if match_total is None:
+            match_total = self.matches[(event, home_team, visit_team)] = MatchTotal(event, home_team, visit_team)
+        board_imps = comparison.imps
+        seg_total.add(board_imps)
+        match_total.add(segment, board_imps)
+        return comparison
+
+    def add_file(self, filepath: Path):
+        """Stream every board of a file. Teams carry over from the first board that names them."""
+        home_team = visit_team = ''
+        for board in iter_boards(filepath):
+            home_team = board.get('HomeTeam', home_team)
+            visit_team = board.get('VisitTeam', visit_team)
+            segment = board.get('Site') or filepath.stem
+            self.add_board(board, segment, home_team, visit_team)
+
+    def run(self, data_dir: str = 'parsed-games') -> 'TeamMatchScorer':
+        for filepath in sorted(Path(data_dir).glob('*.jsonl')):
+            self.add_file(filepath)
+        return self
+
+    @property
+    def unpaired(self) -> List[Tuple[str, str, str]]:
+        """Boards seen in only one room"""
+        return list(self.pending)
+
+
+def verify_imps():
+    """Check imps() on every 10-point difference against the WBF scale, raises ValueError on mismatch"""
+    # Published WBF IMP scale as (lowest difference, highest difference) per IMP
+    scale = [(0, 10), (20, 40), (50, 80), (90, 120), (130, 160), (170, 210), (220, 260), (270, 310),
+             (320, 360), (370, 420), (430, 490), (500, 590), (600, 740), (750, 890), (900, 1090),
+             (1100, 1290), (1300, 1490), (1500, 1740), (1750, 1990), (2000, 2240), (2250, 2490),
+             (2500, 2990), (3000, 3490), (3500, 3990), (4000, 7600)]
+    for expected, (low, high) in enumerate(scale):
+        for diff in range(low, high + 10, 10):
+            if imps(diff) != expected or imps(-diff) != -expected:
+                raise ValueError(f"IMPs for {diff}: {imps(diff)}, {imps(-diff)}, expected {expected}")
+
+    scorer = TeamMatchScorer()
+    for board, room, score in (('1', 'Open', 'NS 420'), ('1', 'Closed', 'EW 50'), ('1', 'Open', 'NS 0'),
+                               ('2', 'Closed', 'NS 620'), ('2', 'Open', 'NS 100')):
+        scorer.add_board({'Event': 'check', 'Board': board, 'Room': room, 'Score': score}, 'segment')
+    total = scorer.matches[('check', '', '')]
+    if (total.home_imps, total.visit_imps, scorer.duplicates) != (10, 11, 1):
+        raise ValueError(f"Match check scored {total.home_imps}-{total.visit_imps} "
+                         f"with {scorer.duplicates} duplicates, expected 10-11 with 1")
+    if ns_score({'Contract': '3NTX', 'Declarer': 'W', 'Result': '8', 'Vulnerable': 'All', 'Score': ''}) != 200:
+        raise ValueError("3NTX-1 vulnerable by West does not score NS 200 without a Score tag")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score Open/Closed room pairs as IMP team matches')
+    parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--boards', action='store_true', help='Print every board comparison')
+    args = parser.parse_args()
+
+    if not Path(args.data_dir).exists():
+        print(f"Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    scorer = TeamMatchScorer().run(args.data_dir)
+    elapsed = time.perf_counter() - start
+
+    if args.boards:
+        for c in scorer.comparisons:
+            print(f"{c.event} / {c.segment} board {c.board}: "
+                  f"Open NS {c.open_score}, Closed NS {c.closed_score}, {c.imps:+d} IMPs")
+
+    print("SEGMENTS:")
+    for seg in scorer.segments.values():
+        print(f"  {seg.event} / {seg.segment}: {seg.home_team} {seg.home_imps} - "
+              f"{seg.visit_imps} {seg.visit_team} ({seg.boards} boards)")
+    print("MATCHES:")
+    for match in scorer.matches.values():
+        print(f"  {match.event}: {match.home_team} {match.home_imps} - {match.visit_imps} "
+              f"{match.visit_team} ({len(match.segments)} segments, {match.boards} boards)")
+
+    print(f"\n{len(scorer.comparisons)} boards compared, {len(scorer.unpaired)} unpaired, "
+          f"{scorer.skipped} skipped, {scorer.duplicates} duplicates in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
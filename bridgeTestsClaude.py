@@ -6,7 +6,7 @@ against parsed PBN (Portable Bridge Notation) files to ensure accuracy
 of game logic, scoring, and contract resolution.
 
 Usage:
-    python test_bridge_games.py [--verbose] [--filter=PATTERN] [--fail-fast]
+    python test_bridge_games.py [--verbose] [--filter=PATTERN] [--fail-fast] [--jobs=N] [--cache-dir=DIR]
 
 Environment Variables:
     BRIDGE_TEST_DATA_DIR: Directory containing parsed PBN files (default: 'parsed-games')
@@ -18,18 +18,61 @@ import json
 import logging
 import argparse
 from typing import List, Dict, Tuple, Optional, NamedTuple
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import sys
 from pathlib import Path
 
 # Import the Bridge simulator
 try:
-    from bridgeClaudev2 import Bridge
-except ImportError:
-    print("Error: Could not import Bridge class from bridgeClean module")
+    from bridgeClaudev2 import Bridge, verify_score_table
+    from bridgePar import Par, ParContract, calculate_par, load_dd_tables, verify_par
+    from bridgeCorpus import CorpusReader
+    from bridgeStream import stream_games, verify_stream
+    from bridgeValidationCache import ValidationCache, verify_validation_cache
+    from bridgeEncoding import verify_encoding
+    from bridgeBatchScoring import verify_score_many
+    from bridgeTeams import verify_imps
+    from bridgePairs import verify_matchpoints
+    from bridgeLive import verify_live_event
+    from bridgeDoubleDummy import verify_double_dummy
+    from bridgeDDTables import verify_dd_tables
+    from bridgeSingleDummy import verify_single_dummy
+    from bridgeDeals import verify_deals
+    from bridgeConstrainedDeals import verify_constrained_deals
+    from bridgeHandFeatures import verify_hand_features
+    from bridgeDealIndex import verify_deal_index
+    from bridgeCorpus import verify_corpus_codecs
+    from bridgeBoardIndex import verify_board_index
+    from bridgeBenchmark import verify_benchmark_stats
+except ImportError as e:
+    print(f"Error: Could not import the bridge modules: {e}")
     sys.exit(1)
 
+# Self-checks of lookup tables and codecs against known values, each raises ValueError on mismatch
+SELF_CHECKS = [
+    verify_score_table,
+    verify_par,
+    verify_encoding,
+    verify_score_many,
+    verify_imps,
+    verify_matchpoints,
+    verify_live_event,
+    verify_double_dummy,
+    verify_dd_tables,
+    verify_single_dummy,
+    verify_deals,
+    verify_constrained_deals,
+    verify_hand_features,
+    verify_deal_index,
+    verify_corpus_codecs,
+    verify_stream,
+    verify_board_index,
+    verify_validation_cache,
+    verify_benchmark_stats,
+]
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,6 +86,7 @@ DENOMS = ['C', 'D', 'H', 'S', 'NT']
 BIDS = [f"{level}{denom}" for level in range(1, 8) for denom in DENOMS]
 VALID_AUCTION_ACTIONS = set(['Pass', 'X', 'XX'] + BIDS)
 TARGET_TAGS = {'Vulnerable', 'Dealer', 'Deal', 'Declarer', 'Contract', 'Result', 'Score', 'Auction', 'Play'}
+CORPUS_CHUNK = 64  # boards per work unit when a binary corpus is validated in parallel
 
 @dataclass
 class GameResult:
@@ -58,6 +102,7 @@ class GameResult:
     expected_score: Optional[str]
     actual_score: Optional[str]
     errors: List[str]
+    par: Optional[Par] = None
     
     @property
     def is_valid(self) -> bool:
@@ -68,6 +113,17 @@ class GameResult:
     def has_play_data(self) -> bool:
         """Returns True if this game included play data."""
         return self.expected_result is not None
+    
+    def to_dict(self) -> Dict:
+        """Plain-JSON form, as stored in the validation cache."""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GameResult':
+        par = data.get('par')
+        if par is not None:
+            par = Par(par['score'], par['side'], [ParContract(**c) for c in par['contracts']])
+        return cls(**{**data, 'par': par})
 
 class ValidationStats:
     """Tracks validation statistics across all games."""
@@ -79,8 +135,12 @@ class ValidationStats:
         self.contract_matches = 0
         self.result_matches = 0
         self.score_matches = 0
+        self.games_with_par = 0
+        self.par_matches = 0
         self.error_counts = defaultdict(int)
         self.failed_games = []
+        self.cache_hits = 0  # boards replayed from the validation cache
+        self.cache_misses = 0  # boards simulated while the cache was enabled
     
     def add_result(self, result: GameResult):
         """Add a game result to the statistics."""
@@ -109,10 +169,32 @@ class ValidationStats:
                 self.score_matches += 1
             else:
                 self.error_counts['score_mismatch'] += 1
+
+        if result.par is not None:
+            self.games_with_par += 1
+            if result.actual_score == f"NS {result.par.score}":
+                self.par_matches += 1
         
         if not result.is_valid:
             self.failed_games.append(result)
     
+    def merge(self, other: 'ValidationStats') -> 'ValidationStats':
+        """Add another run's statistics (games validated after this run's) into this one."""
+        self.total_games += other.total_games
+        self.games_with_play += other.games_with_play
+        self.declarer_matches += other.declarer_matches
+        self.contract_matches += other.contract_matches
+        self.result_matches += other.result_matches
+        self.score_matches += other.score_matches
+        self.games_with_par += other.games_with_par
+        self.par_matches += other.par_matches
+        for error_type, count in other.error_counts.items():
+            self.error_counts[error_type] += count
+        self.failed_games.extend(other.failed_games)
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        return self
+    
     def print_summary(self):
         """Print a comprehensive summary of validation results."""
         print("\n" + "="*60)
@@ -139,6 +221,11 @@ class ValidationStats:
             print("\nPLAY VALIDATION:")
             print(f"  Result matches: {self.result_matches}/{self.games_with_play} ({result_pct:.1f}%)")
             print(f"  Score matches: {self.score_matches}/{self.games_with_play} ({score_pct:.1f}%)")
+
+        if self.games_with_par > 0:
+            par_pct = (self.par_matches / self.games_with_par) * 100
+            print("\nPAR COMPARISON:")
+            print(f"  Scored exactly par: {self.par_matches}/{self.games_with_par} ({par_pct:.1f}%)")
         
         # Error summary
         if self.error_counts:
@@ -156,55 +243,39 @@ class ValidationStats:
         
         print(f"\nOVERALL SUCCESS RATE: {success_rate:.1f}%")
         
+        if self.cache_hits or self.cache_misses:
+            print(f"\nCACHE: {self.cache_hits} boards replayed, {self.cache_misses} simulated")
+        
         if self.failed_games:
             print(f"\nFAILED GAMES: {len(self.failed_games)}")
 
 class BridgeGameValidator:
     """Main class for validating Bridge games against PBN data."""
     
-    def __init__(self, data_dir: str = 'parsed-games', verbose: bool = False):
+    def __init__(self, data_dir: str = 'parsed-games', verbose: bool = False,
+                 dd_tables: Optional[Dict[Tuple[str, int], List[List[int]]]] = None,
+                 corpus: Optional[str] = None, cache_dir: Optional[str] = None):
         self.data_dir = Path(data_dir)
         self.verbose = verbose
+        self.dd_tables = dd_tables or {}  # (file name, game index) -> 20-entry trick table
+        self.corpus = Path(corpus) if corpus else None  # binary corpus read instead of data_dir
+        self.cache_dir = cache_dir
+        self.cache = ValidationCache(cache_dir) if cache_dir else None  # per-file results of JSONL input
         self.stats = ValidationStats()
         
-        if not self.data_dir.exists():
+        if self.corpus:
+            if not self.corpus.exists():
+                raise FileNotFoundError(f"Corpus file not found: {corpus}")
+        elif not self.data_dir.exists():
             raise FileNotFoundError(f"Data directory not found: {data_dir}")
     
     def load_games_from_file(self, filepath: Path) -> List[Dict]:
         """Load and parse games from a single JSONL file."""
-        games = []
-        current_game = None
-        
         try:
-            with open(filepath, 'r', encoding='utf-8') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        obj = json.loads(line)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Invalid JSON in {filepath}:{line_num}: {e}")
-                        continue
-                    
-                    if obj.get('type') == 'game':
-                        if current_game:
-                            games.append(current_game)
-                        current_game = {}
-                    elif obj.get('type') == 'tag' and current_game is not None:
-                        name = obj.get('name')
-                        if name in TARGET_TAGS:
-                            current_game[name] = obj
-                
-                if current_game:
-                    games.append(current_game)
-                    
+            return list(stream_games(filepath, TARGET_TAGS))
         except Exception as e:
             logger.error(f"Error reading file {filepath}: {e}")
             return []
-        
-        return games
     
     def create_auction_actions(self, game: Dict) -> List[Dict]:
         """Convert PBN auction tokens to Bridge simulator actions."""
@@ -353,6 +424,15 @@ class BridgeGameValidator:
             except Exception as e:
                 errors.append(f"Play simulation error: {e}")
         
+        # Par from a double-dummy table, when one was supplied for this game
+        par = None
+        table = self.dd_tables.get((file_name, game_index))
+        if table is not None:
+            try:
+                par = calculate_par(table, game['Vulnerable']['value'], game['Dealer']['value'])
+            except ValueError as e:
+                errors.append(f"Par calculation error: {e}")
+        
         return GameResult(
             file_name=file_name,
             game_index=game_index,
@@ -364,15 +444,48 @@ class BridgeGameValidator:
             actual_result=actual_result,
             expected_score=expected_score,
             actual_score=actual_score,
-            errors=errors
+            errors=errors,
+            par=par
         )
     
-    def run_validation(self, file_filter: Optional[str] = None, fail_fast: bool = False) -> ValidationStats:
-        """Run validation on all PBN files in the data directory."""
+    def iter_corpus_games(self, file_filter: Optional[str] = None, first: int = 0, last: Optional[int] = None):
+        """Yield (file name, game index, game) from the binary corpus, or records first up to last."""
+        with CorpusReader(self.corpus) as reader:
+            logger.info(f"Processing {len(reader)} games from {self.corpus}...")
+            yield from reader.iter_games(file_filter, first, last)
+    
+    def list_files(self, file_filter: Optional[str] = None) -> List[Path]:
+        """JSONL files in the data directory, in the order they are validated."""
         files = list(self.data_dir.glob('*.jsonl'))
-        
         if file_filter:
             files = [f for f in files if file_filter in f.name]
+        return files
+    
+    def iter_one_file(self, file_path: Path):
+        """Yield (file name, game index, game) from one JSONL file."""
+        logger.info(f"Processing file: {file_path.name}")
+        try:
+            for game_index, game in enumerate(stream_games(file_path, TARGET_TAGS)):
+                yield file_path.name, game_index, game
+        except OSError as e:
+            logger.error(f"Error reading file {file_path}: {e}")
+    
+    def run_validation(self, file_filter: Optional[str] = None, fail_fast: bool = False,
+                       jobs: int = 1) -> ValidationStats:
+        """Run validation on all PBN files in the data directory (or the binary corpus).
+        
+        With jobs > 1, files (or corpus record ranges) are validated in a
+        process pool and their stats merged back in input order, so the
+        summary and the order of failures match a serial run.
+        """
+        if jobs > 1:
+            return self.run_parallel(file_filter, fail_fast, jobs)
+        
+        if self.corpus:
+            self.validate_games(self.iter_corpus_games(file_filter), fail_fast)
+            return self.stats
+        
+        files = self.list_files(file_filter)
         
         if not files:
             logger.warning(f"No JSONL files found in {self.data_dir}")
@@ -381,24 +494,119 @@ class BridgeGameValidator:
         logger.info(f"Processing {len(files)} files...")
         
         for file_path in files:
-            logger.info(f"Processing file: {file_path.name}")
-            games = self.load_games_from_file(file_path)
+            if not self.validate_file(file_path, fail_fast):
+                break
+        return self.stats
+    
+    def validate_games(self, games, fail_fast: bool = False, report: bool = True) -> bool:
+        """Validate (file name, game index, game) tuples into self.stats, returns False if stopped early.
+        
+        Pool workers pass report=False and leave reporting failures to the parent.
+        """
+        return self.add_results((self.validate_game(*game) for game in games), fail_fast, report)
+    
+    def add_results(self, results, fail_fast: bool = False, report: bool = True, cached: bool = False) -> bool:
+        """Add GameResults to self.stats, returns False if stopped early at a failure."""
+        for result in results:
+            self.stats.add_result(result)
+            if cached:
+                self.stats.cache_hits += 1
+            elif self.cache:
+                self.stats.cache_misses += 1
             
-            for game_index, game in enumerate(games):
-                result = self.validate_game(file_path.name, game_index, game)
-                self.stats.add_result(result)
-                
-                if self.verbose and not result.is_valid:
-                    print(f"\nFAILED: {file_path.name} game {game_index}")
-                    for error in result.errors:
-                        print(f"  - {error}")
-                
-                if fail_fast and not result.is_valid:
-                    logger.error(f"Stopping due to failure in {file_path.name} game {game_index}")
-                    return self.stats
+            if report and not result.is_valid:
+                self.report_failure(result)
+            
+            if fail_fast and not result.is_valid:
+                if report:
+                    logger.error(f"Stopping due to failure in {result.file_name} game {result.game_index}")
+                return False
+        return True
+    
+    def validate_file(self, file_path: Path, fail_fast: bool = False, report: bool = True) -> bool:
+        """Validate one JSONL file, replaying its results from the cache when neither it nor the engine changed."""
+        if self.cache is None:
+            return self.validate_games(self.iter_one_file(file_path), fail_fast, report)
+        
+        tables = sorted((game, table) for (name, game), table in self.dd_tables.items() if name == file_path.name)
+        key = self.cache.key(file_path, json.dumps(tables))
+        cached = self.cache.load(key)
+        if cached is not None:
+            logger.info(f"Processing file: {file_path.name} (cached)")
+            return self.add_results(map(GameResult.from_dict, cached), fail_fast, report, cached=True)
+        
+        results = []
+        
+        def validate():
+            for game in self.iter_one_file(file_path):
+                results.append(self.validate_game(*game))
+                yield results[-1]
+        
+        completed = self.add_results(validate(), fail_fast, report)
+        if completed:
+            self.cache.store(key, [result.to_dict() for result in results])
+        return completed
+    
+    def report_failure(self, result: GameResult):
+        """Print a failed game's errors in verbose mode."""
+        if self.verbose:
+            print(f"\nFAILED: {result.file_name} game {result.game_index}")
+            for error in result.errors:
+                print(f"  - {error}")
+    
+    def work_units(self, file_filter: Optional[str] = None) -> List[Tuple]:
+        """Independent pieces of the input for run_parallel, in validation order."""
+        if self.corpus:
+            with CorpusReader(self.corpus) as reader:
+                count = len(reader)
+            return [('corpus', first, first + CORPUS_CHUNK) for first in range(0, count, CORPUS_CHUNK)]
+        return [('file', file_path) for file_path in self.list_files(file_filter)]
+    
+    def run_parallel(self, file_filter: Optional[str], fail_fast: bool, jobs: int) -> ValidationStats:
+        """Validate work units in a process pool, merging their stats in order."""
+        units = self.work_units(file_filter)
+        if not units:
+            logger.warning(f"No JSONL files found in {self.data_dir}")
+            return self.stats
         
+        logger.info(f"Processing {len(units)} work units with {jobs} workers...")
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                   initargs=(str(self.data_dir), self.dd_tables, self.corpus, self.cache_dir))
+        try:
+            for stats in pool.map(_validate_unit, units, [file_filter] * len(units), [fail_fast] * len(units)):
+                self.stats.merge(stats)
+                for result in stats.failed_games:
+                    self.report_failure(result)
+                if fail_fast and stats.failed_games:
+                    result = stats.failed_games[-1]
+                    logger.error(f"Stopping due to failure in {result.file_name} game {result.game_index}")
+                    break
+        finally:
+            pool.shutdown(cancel_futures=True)
         return self.stats
 
+
+_worker_validator: Optional[BridgeGameValidator] = None
+
+
+def _init_worker(data_dir: str, dd_tables, corpus, cache_dir):
+    global _worker_validator
+    _worker_validator = BridgeGameValidator(data_dir=data_dir, dd_tables=dd_tables, corpus=corpus,
+                                            cache_dir=cache_dir)
+
+
+def _validate_unit(unit: Tuple, file_filter: Optional[str], fail_fast: bool) -> ValidationStats:
+    """Validate one work unit in a pool worker, returns its stats (stopping at the first failure if fail_fast)"""
+    validator = _worker_validator
+    validator.stats = ValidationStats()
+    if unit[0] == 'corpus':
+        games = validator.iter_corpus_games(file_filter, unit[1], unit[2])
+        validator.validate_games(games, fail_fast, report=False)
+    else:
+        validator.validate_file(unit[1], fail_fast, report=False)
+    return validator.stats
+
+
 def main():
     """Main entry point for the test suite."""
     parser = argparse.ArgumentParser(description='Validate Bridge game simulations against PBN data')
@@ -406,6 +614,10 @@ def main():
     parser.add_argument('--filter', help='Filter files by name pattern')
     parser.add_argument('--fail-fast', action='store_true', help='Stop on first failure')
     parser.add_argument('--data-dir', default='parsed-games', help='Directory containing PBN files')
+    parser.add_argument('--dd-tables', help='JSONL of double-dummy tables (bridgeDDTables output) for par comparison')
+    parser.add_argument('--corpus', help='Binary corpus (bridgeCorpus output) to read instead of --data-dir')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes validating files in parallel')
+    parser.add_argument('--cache-dir', help='Reuse per-file results stored here while files and engine are unchanged')
     
     args = parser.parse_args()
     
@@ -414,8 +626,14 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     try:
-        validator = BridgeGameValidator(data_dir=args.data_dir, verbose=args.verbose)
-        stats = validator.run_validation(file_filter=args.filter, fail_fast=args.fail_fast)
+        # Score table, par and codecs must agree with known values before any game is checked
+        for check in SELF_CHECKS:
+            check()
+
+        dd_tables = load_dd_tables(args.dd_tables) if args.dd_tables else None
+        validator = BridgeGameValidator(data_dir=args.data_dir, verbose=args.verbose, dd_tables=dd_tables,
+                                        corpus=args.corpus, cache_dir=args.cache_dir)
+        stats = validator.run_validation(file_filter=args.filter, fail_fast=args.fail_fast, jobs=args.jobs)
         stats.print_summary()
         
         # Exit with error code if there were failures
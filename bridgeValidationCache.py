@@ -0,0 +1,101 @@
+"""
+Persistent cache of per-board validation results.
+
+Entries are keyed by a hash of the input file's bytes, the source of the
+modules that decide the results (the engine) and any extra inputs such
+as double-dummy tables, so a cached entry can only be replayed when none
+of them has changed. Each entry is one JSON file written to a temporary
+name and renamed into place, so concurrent runs never see a partial
+entry; a run that finds an unreadable entry treats it as a miss.
+"""
+
+import os
+import json
+import hashlib
+import importlib.util
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+ENGINE_MODULES = ['bridgeClaudev2', 'bridgeEncoding', 'bridgePar', 'bridgeStream', 'bridgeTestsClaude']
+CACHE_VERSION = 1
+
+
+def file_hash(filepath, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def engine_hash(modules: Iterable[str] = ENGINE_MODULES) -> str:
+    """Hash of the source of every engine module"""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    for name in modules:
+        spec = importlib.util.find_spec(name)
+        if spec is None or not spec.origin:
+            raise ValueError(f"Engine module not found: {name}")
+        digest.update(name.encode())
+        digest.update(Path(spec.origin).read_bytes())
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """Directory of cached result lists, one JSON file per key"""
+
+    def __init__(self, cache_dir: str, engine: Optional[str] = None):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.engine = engine or engine_hash()
+
+    def key(self, filepath, extra: str = '') -> str:
+        """Key for a file's results under the current engine and extra inputs"""
+        return hashlib.sha256(f"{file_hash(filepath)}:{self.engine}:{extra}".encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[List[Dict]]:
+        try:
+            with open(self.dir / f"{key}.json", 'r', encoding='utf-8') as file:
+                return json.load(file)['results']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, key: str, results: List[Dict]):
+        path = self.dir / f"{key}.json"
+        temp = self.dir / f".{key}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp, 'w', encoding='utf-8') as file:
+                json.dump({'results': results}, file, separators=(',', ':'))
+            os.replace(temp, path)
+        except OSError:
+            temp.unlink(missing_ok=True)
+
+
+def verify_validation_cache():
+    """Check that keys change with every input and entries round-trip, raises ValueError on mismatch"""
+    results = [{'game': 0, 'success': True}, {'game': 1, 'success': False, 'error': 'Score mismatch'}]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        source = Path(cache_dir) / 'source.jsonl'
+        source.write_text('{"type":"game"}\n', encoding='utf-8')
+        cache = ValidationCache(cache_dir, engine='engine')
+        key = cache.key(source)
+        missed = cache.load(key)
+        cache.store(key, results)
+        loaded = ValidationCache(cache_dir, engine='engine').load(key)
+        others = [ValidationCache(cache_dir, engine='other').key(source), cache.key(source, 'tables')]
+        source.write_text('{"type":"game"}\n{"type":"game"}\n', encoding='utf-8')
+        others.append(cache.key(source))
+        (Path(cache_dir) / f"{others[0]}.json").write_text('{"results": [', encoding='utf-8')
+        corrupt = cache.load(others[0])
+        leftovers = [p.name for p in Path(cache_dir).iterdir() if p.suffix == '.tmp']
+
+    if missed is not None or loaded != results:
+        raise ValueError(f"Cache entry round trip gave {missed} before storing and {loaded} after")
+    if len({key, *others}) != 4:
+        raise ValueError("Cache key does not change with the engine, the extra inputs and the file")
+    if corrupt is not None or leftovers:
+        raise ValueError(f"Corrupt entry read as {corrupt}, temporary files left: {leftovers}")
+    if engine_hash() != engine_hash() or engine_hash() == engine_hash(ENGINE_MODULES[:-1]):
+        raise ValueError("Engine hash is not stable or does not cover every engine module")
+    return True